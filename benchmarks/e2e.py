@@ -0,0 +1,203 @@
+import  io
+import  os
+import  sys
+import  json
+import  time
+import  asyncio
+import  argparse
+import  tempfile
+import  contextlib
+import  numpy           as np
+import  pandas          as pd
+from    typing          import Any, Dict, List
+from    pathlib         import Path
+
+from    benchmarks.stub_openai import StubOpenAIServer
+
+
+PROJECT_ROOT    = Path(__file__).resolve().parent.parent
+QUESTIONS_PATH  = PROJECT_ROOT / "data" / "raw" / "questions.csv"
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+
+    if not values:
+        return {}
+
+    array = np.asarray(values) * 1000
+
+    return {
+        "p50_ms"   : round(float(np.percentile(array, 50)), 3),
+        "p95_ms"   : round(float(np.percentile(array, 95)), 3),
+        "p99_ms"   : round(float(np.percentile(array, 99)), 3),
+        "media_ms" : round(float(array.mean()), 3),
+    }
+
+
+async def replay(mcp: Any, questions: List[str], concurrency: int) -> Dict[str, Any]:
+
+    ask         = mcp._tools["perguntar"]
+    semaphore   = asyncio.Semaphore(concurrency)
+    timings     = {}
+    totals      = []
+    sources     = {}
+    errors      = []
+    speculative = {"perguntas": 0, "trocas": 0, "tokens_extras": 0, "latencias": []}
+
+    async def run(question: str):
+
+        async with semaphore:
+            started = time.perf_counter()
+
+            try:
+                result = await ask(question)
+            except Exception as e:
+                errors.append(f"{question}: {e}")
+                return
+
+            if not isinstance(result, dict):
+                errors.append(f"{question}: {result}")
+                return
+
+            totals.append(time.perf_counter() - started)
+            sources[result["origem_sql"]] = sources.get(result["origem_sql"], 0) + 1
+
+            for stage, elapsed in result["tempos_etapas"].items():
+                timings.setdefault(stage, []).append(elapsed)
+
+            # Custo e resultado da geração especulativa: base para ajustar SPECULATIVE_MARGIN.
+            if result.get("especulacao"):
+                report                          = result["especulacao"]
+                speculative["perguntas"]       += 1
+                speculative["trocas"]          += report["trocou_intencao"]
+                speculative["tokens_extras"]   += report["tokens_extras"]
+                speculative["latencias"].append(report["latencia_s"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(question) for question in questions))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "perguntas"      : len(questions),
+        "erros"          : len(errors),
+        "exemplos_erros" : errors[:5],
+        "origem_sql"     : sources,
+        "tempo_total_s"  : round(elapsed, 3),
+        "vazao_qps"      : round(len(totals) / elapsed, 2) if elapsed else 0.0,
+        "total"          : summarize(totals),
+        "etapas"         : {stage.removesuffix("_s"): summarize(values) for stage, values in timings.items()},
+        "especulacao"    : {**speculative, "latencias": summarize(speculative["latencias"])},
+    }
+
+
+async def benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+
+    # Importados só aqui: o servidor precisa enxergar o OPENAI_BASE_URL do stub.
+    from src.core               import server
+    from src.llm                import generator
+    from src.llm.sql_cache      import SQLCache
+    from src.database.query_log import QueryLog
+    from src.database.populate_db import create_database
+
+    questions   = pd.read_csv(args.perguntas)["question"].astype(str).tolist()[:args.limite or None]
+    runs        = []
+    workdir     = Path(tempfile.mkdtemp(prefix="e2e_"))
+    logs        = sys.stdout if args.verboso else io.StringIO()
+
+    with contextlib.redirect_stdout(logs):
+        await server.mcp.run_lifespan_startup()
+
+    ctx = server.mcp.get_context()
+    ctx.sql_cache.close()
+    ctx.query_log.close()
+
+    # Por padrão tudo passa pelo LLM (stub); --caminho-rapido mede também templates e respostas locais.
+    if not args.caminho_rapido:
+        ctx.template_min_confidence = 1.1
+        ctx.answer_policy           = "llm"
+
+    try:
+        for n_rows in args.linhas:
+            db_path = workdir / f"automobiles_{n_rows}.db"
+
+            with contextlib.redirect_stdout(logs):
+                load = create_database(n_rows=n_rows, seed=42, db_path=db_path)
+
+            ctx.db_path         = db_path
+            generator.DB_PATH   = db_path
+
+            for concurrency in args.concorrencia:
+                ctx.sql_cache = SQLCache(workdir / f"sql_cache_{n_rows}_{concurrency}.db")
+                ctx.query_log = QueryLog(workdir / f"query_log_{n_rows}_{concurrency}.db")
+
+                with contextlib.redirect_stdout(logs):
+                    # Aquecimento (fora das métricas): espera os modelos e carrega o spaCy.
+                    warmup = await server.mcp._tools["perguntar"](questions[0])
+
+                    if not isinstance(warmup, dict):
+                        raise RuntimeError(warmup)
+
+                    result = await replay(server.mcp, questions, concurrency)
+
+                ctx.sql_cache.close()
+                ctx.query_log.close()
+
+                runs.append({"linhas_banco": n_rows, "concorrencia": concurrency, "carga_banco_s": load["tempo_carga_s"], **result})
+                print(f"linhas={n_rows} concorrência={concurrency}: {result['vazao_qps']} perguntas/s, p95 total {result['total'].get('p95_ms')} ms, {result['erros']} erros", file=sys.stderr)
+
+    finally:
+        ctx.sql_cache = SQLCache(workdir / "shutdown_cache.db")
+        ctx.query_log = QueryLog(workdir / "shutdown_log.db")
+
+        with contextlib.redirect_stdout(logs):
+            await server.mcp.run_lifespan_shutdown()
+
+    return {
+        "config": {
+            "latencia_llm_s"   : args.latencia,
+            "atraso_token_s"   : args.atraso_token,
+            "caminho_rapido"   : args.caminho_rapido,
+            "perguntas"        : str(args.perguntas),
+            "limite"           : args.limite,
+        },
+        "execucoes": runs,
+    }
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Benchmark ponta a ponta do 'perguntar' contra um stub da API da OpenAI.")
+    parser.add_argument("--concorrencia",   type=_int_list, default=[1, 8],   help="Lista separada por vírgulas (ex.: 1,8,32).")
+    parser.add_argument("--linhas",         type=_int_list, default=[1000],   help="Tamanhos do banco, separados por vírgulas.")
+    parser.add_argument("--latencia",       type=float,     default=0.2,      help="Latência de cada chamada ao LLM falso (s).")
+    parser.add_argument("--atraso-token",   type=float,     default=0.0,      help="Atraso entre tokens no streaming (s).")
+    parser.add_argument("--perguntas",      type=Path,      default=QUESTIONS_PATH)
+    parser.add_argument("--limite",         type=int,       default=0,        help="Usa só as N primeiras perguntas (0 = todas).")
+    parser.add_argument("--caminho-rapido", action="store_true",              help="Mantém templates de SQL e respostas locais ativos.")
+    parser.add_argument("--saida",          type=Path,      default=None,     help="Arquivo JSON de saída (padrão: stdout).")
+    parser.add_argument("--verboso",        action="store_true",              help="Mostra os logs do servidor.")
+    args   = parser.parse_args()
+
+    with StubOpenAIServer(args.latencia, args.atraso_token) as stub:
+        os.environ["OPENAI_BASE_URL"]  = stub.base_url
+        os.environ["OPENAI_API_KEY"]   = "stub"
+        os.environ["OPENAI_API_MODEL"] = "stub"
+
+        report = asyncio.run(benchmark(args))
+        report["config"]["chamadas_llm"] = stub.requests
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+
+    if args.saida:
+        args.saida.write_text(output, encoding="utf-8")
+        print(f"Relatório salvo em '{args.saida}'.", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import  os
+import  sys
+import  json
+import  subprocess
+from    pathlib     import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Cada backend roda num processo próprio: o RSS de um não contamina o outro.
+BACKEND_SCRIPT = """
+import json, resource, statistics, time
+import pandas as pd
+from src.nlp.preprocessing import text_processing_func
+
+questions = pd.read_csv("data/raw/questions.csv")["question"].astype(str).tolist()
+text_processing_func(pd.Series(questions))
+baseline  = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+started = time.perf_counter()
+if "{backend}" == "compiled":
+    from src.mlp.compiled import CompiledIntentModel
+    model = CompiledIntentModel()
+else:
+    import joblib
+    model = joblib.load("models/intent_classification_pipeline.joblib")
+    joblib.load("models/intent_label_encoder.joblib")
+load_s = time.perf_counter() - started
+
+timings = []
+for question in questions:
+    started = time.perf_counter()
+    model.predict_proba(pd.Series([question]))
+    timings.append((time.perf_counter() - started) * 1000)
+
+timings.sort()
+print(json.dumps({{
+    "carga_s"       : round(load_s, 4),
+    "p50_ms"        : round(statistics.median(timings), 4),
+    "p95_ms"        : round(timings[int(len(timings) * 0.95) - 1], 4),
+    "rss_extra_mb"  : round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024, 1),
+    "rss_total_mb"  : round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+}}))
+"""
+
+
+def run_backend(backend: str) -> dict:
+
+    completed = subprocess.run(
+        [sys.executable, "-c", BACKEND_SCRIPT.format(backend=backend)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, env=os.environ
+    )
+
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr)
+
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+
+    # O cache de lemas é aquecido antes nos dois processos: a comparação isola o classificador.
+    results = {backend: run_backend(backend) for backend in ("joblib", "compiled")}
+
+    print(f"{'backend':<10} {'carga (s)':>10} {'p50 (ms)':>10} {'p95 (ms)':>10} {'RSS extra (MB)':>15} {'RSS total (MB)':>15}")
+
+    for backend, r in results.items():
+        print(f"{backend:<10} {r['carga_s']:>10.4f} {r['p50_ms']:>10.4f} {r['p95_ms']:>10.4f} {r['rss_extra_mb']:>15.1f} {r['rss_total_mb']:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import  time
+import  statistics
+import  pandas                  as pd
+from    pathlib                 import Path
+from    src.nlp                 import preprocessing
+from    src.nlp.lemma_cache     import LemmaCache
+
+
+DATASET_PATH = Path(__file__).resolve().parent.parent / "data" / "raw" / "questions.csv"
+
+
+def per_question_ms(questions: list) -> list:
+
+    timings = []
+
+    for question in questions:
+        started = time.perf_counter()
+        preprocessing.text_processing_func(pd.Series([question]))
+        timings.append((time.perf_counter() - started) * 1000)
+
+    return timings
+
+
+def report(label: str, timings: list):
+
+    timings = sorted(timings)
+    p95     = timings[int(len(timings) * 0.95) - 1]
+
+    print(f"{label:<28} p50={statistics.median(timings):7.3f} ms   p95={p95:7.3f} ms   n={len(timings)}")
+
+
+def main(sample: int = 500):
+
+    questions = pd.read_csv(DATASET_PATH)["question"].astype(str).tolist()
+    sample    = questions[:sample]
+
+    # Cache só em memória e vazio: a primeira passada mede o spaCy, a segunda o acerto no LRU.
+    preprocessing.lemma_cache = LemmaCache(preprocessing.lemma_cache.model_key, path=None)
+
+    report("frio (spaCy)", per_question_ms(sample))
+    report("quente (cache de frases)", per_question_ms(sample))
+
+    preprocessing.lemma_cache = LemmaCache(preprocessing.lemma_cache.model_key, path=None)
+
+    started = time.perf_counter()
+    preprocessing.text_processing_func(pd.Series(questions))
+    elapsed = time.perf_counter() - started
+
+    print(f"{'lote completo (frio)':<28} {elapsed:.2f} s para {len(questions)} perguntas "
+          f"({len(set(questions))} distintas, {elapsed / len(questions) * 1000:.3f} ms/pergunta)")
+
+
+if __name__ == "__main__":
+    main()
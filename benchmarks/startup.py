@@ -0,0 +1,81 @@
+import  os
+import  sys
+import  time
+import  subprocess
+from    pathlib     import Path
+
+
+PROJECT_ROOT    = Path(__file__).resolve().parent.parent
+TARGET_SECONDS  = 1.0
+TOP_MODULES     = 15
+
+# Mesmo caminho do run_mcp.py até o primeiro prompt: import do servidor e lifespan (modelos seguem em segundo plano).
+STARTUP_SCRIPT = """
+import asyncio, time
+started = time.perf_counter()
+from src.core.server import mcp
+imported = time.perf_counter()
+async def startup():
+    await mcp.run_lifespan_startup()
+    print(f"@@ {imported - started:.3f} {time.perf_counter() - started:.3f}", flush=True)
+    await mcp.run_lifespan_shutdown()
+asyncio.run(startup())
+"""
+
+
+def importtime_report(module: str = "src.core.server") -> list:
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, env=os.environ
+    )
+    modules   = []
+
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|").split("|")]
+        modules.append((int(cumulative_us), int(self_us), name))
+
+    return sorted(modules, reverse=True)[:TOP_MODULES]
+
+
+def time_to_prompt() -> tuple:
+
+    # O relógio para quando o lifespan termina; o encerramento (que espera os modelos) fica de fora.
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        cwd=PROJECT_ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=os.environ
+    )
+
+    for line in process.stdout:
+        if line.startswith("@@"):
+            elapsed = time.perf_counter() - started
+            break
+    else:
+        raise RuntimeError(process.stderr.read())
+
+    process.communicate()
+    _, import_s, ready_s = line.split()
+
+    return float(import_s), float(ready_s), elapsed
+
+
+def main():
+
+    print(f"{'acumulado (ms)':>15} {'próprio (ms)':>13}  módulo")
+
+    for cumulative_us, self_us, name in importtime_report():
+        print(f"{cumulative_us / 1000:15.1f} {self_us / 1000:13.1f}  {name}")
+
+    import_s, ready_s, process_s = time_to_prompt()
+    status                       = "✅" if process_s < TARGET_SECONDS else "❌"
+
+    print(f"\nimport do servidor: {import_s:.3f}s | lifespan pronto: {ready_s:.3f}s | processo até o prompt: {process_s:.3f}s")
+    print(f"{status} meta de partida a frio: < {TARGET_SECONDS:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import  re
+import  json
+import  time
+import  threading
+from    typing          import Dict, Optional
+from    http.server     import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# SQL fixo por intenção: o benchmark mede o pipeline, não a qualidade do modelo.
+CANNED_SQL: Dict[str, str] = {
+    'COUNT'             : "SELECT COUNT(*) AS total FROM automobiles WHERE LOWER(brand) = 'ford';",
+    'LIST_ALL'          : "SELECT * FROM automobiles WHERE LOWER(color) = 'preto';",
+    'CALC_AVG'          : "SELECT AVG(engine_power) AS media_engine_power FROM automobiles WHERE LOWER(fuel_type) = 'flex';",
+    'CALC_SUM'          : "SELECT SUM(mileage) AS soma_mileage FROM automobiles WHERE LOWER(category) = 'suv';",
+    'FIND_MAX'          : "SELECT * FROM automobiles ORDER BY engine_power DESC LIMIT 1;",
+    'FIND_MIN'          : "SELECT * FROM automobiles ORDER BY engine_power ASC LIMIT 1;",
+    'FIND_MAX_MILEAGE'  : "SELECT * FROM automobiles ORDER BY mileage DESC LIMIT 1;",
+    'FIND_MIN_MILEAGE'  : "SELECT * FROM automobiles ORDER BY mileage ASC LIMIT 1;",
+    'GROUP_COUNT'       : "SELECT brand, COUNT(*) AS total FROM automobiles GROUP BY brand;",
+}
+DEFAULT_SQL     = "SELECT COUNT(*) AS total FROM automobiles;"
+CANNED_ANSWER   = "De acordo com os dados consultados, esta é a resposta para a sua pergunta."
+
+_INTENT_RE      = re.compile(r'Intenção:\s*([A-Z_]+)')
+
+
+def _is_sql_request(messages: list) -> bool:
+    return any("SQL" in m.get("content", "") for m in messages if m.get("role") == "system")
+
+
+def _usage(messages: list, completion: str) -> dict:
+
+    prompt_tokens     = sum(len(m.get("content", "")) for m in messages) // 4
+    completion_tokens = max(1, len(completion) // 4)
+
+    return {
+        "prompt_tokens"     : prompt_tokens,
+        "completion_tokens" : completion_tokens,
+        "total_tokens"      : prompt_tokens + completion_tokens,
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    latency_s: float    = 0.0
+    token_delay_s: float = 0.0
+    requests: int       = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+
+        body     = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        messages = body.get("messages", [])
+
+        type(self).requests += 1
+        time.sleep(self.latency_s)
+
+        if _is_sql_request(messages):
+            # O prompt traz um exemplo antes da tarefa: a intenção da tarefa é a última citada.
+            intents = _INTENT_RE.findall(" ".join(m.get("content", "") for m in messages))
+            content = CANNED_SQL.get(intents[-1] if intents else "", DEFAULT_SQL)
+        else:
+            content = CANNED_ANSWER
+
+        if body.get("stream"):
+            self._stream(body, messages, content)
+        else:
+            self._reply(body, messages, content)
+
+    def _reply(self, body: dict, messages: list, content: str):
+
+        payload = json.dumps({
+            "id"      : "stub-completion",
+            "object"  : "chat.completion",
+            "created" : int(time.time()),
+            "model"   : body.get("model", "stub"),
+            "choices" : [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage"   : _usage(messages, content),
+        }).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream(self, body: dict, messages: list, content: str):
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        words = content.split(" ")
+
+        for position, word in enumerate(words):
+            chunk = {
+                "id"      : "stub-completion",
+                "object"  : "chat.completion.chunk",
+                "created" : int(time.time()),
+                "model"   : body.get("model", "stub"),
+                "choices" : [{"index": 0, "delta": {"content": word + (" " if position < len(words) - 1 else "")}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.token_delay_s)
+
+        # Como a API real: com stream_options.include_usage, um chunk final sem choices traz o uso.
+        if (body.get("stream_options") or {}).get("include_usage"):
+            chunk = {
+                "id"      : "stub-completion",
+                "object"  : "chat.completion.chunk",
+                "created" : int(time.time()),
+                "model"   : body.get("model", "stub"),
+                "choices" : [],
+                "usage"   : _usage(messages, content),
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class StubOpenAIServer:
+
+    def __init__(self, latency_s: float = 0.2, token_delay_s: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+
+        handler         = type("ConfiguredStubHandler", (StubHandler,), {"latency_s": latency_s, "token_delay_s": token_delay_s})
+        self.server     = ThreadingHTTPServer((host, port), handler)
+        self.handler    = handler
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def requests(self) -> int:
+        return self.handler.requests
+
+    def __enter__(self) -> "StubOpenAIServer":
+
+        self._thread = threading.Thread(target=self.server.serve_forever, name="stub-openai", daemon=True)
+        self._thread.start()
+
+        return self
+
+    def __exit__(self, *exc):
+
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servidor falso compatível com a API da OpenAI.")
+    parser.add_argument("--porta",      type=int,   default=8765)
+    parser.add_argument("--latencia",   type=float, default=0.2)
+    args   = parser.parse_args()
+
+    with StubOpenAIServer(args.latencia, port=args.porta) as stub:
+        print(f"Stub OpenAI em {stub.base_url} (latência {args.latencia}s). Ctrl+C para sair.")
+
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
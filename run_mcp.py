@@ -1,8 +1,53 @@
 
+import typing
 import asyncio
 import inspect
+import argparse
 from src.core.server import mcp
 
+# Preenchidos pela própria CLI para exibir a resposta em streaming.
+CLI_MANAGED_PARAMS = ("stream", "on_token")
+
+class StreamPrinter:
+    
+    def __init__(self):
+        self.started = False
+    
+    def __call__(self, token: str):
+        
+        if not self.started:
+            print("--- RESPOSTA ---")
+            self.started = True
+            
+        print(token, end="", flush=True)
+
+def parse_param_value(param: inspect.Parameter, raw: str):
+    
+    # Optional[int] -> int; sem anotação, o tipo do próprio padrão decide.
+    annotation = param.annotation
+    candidates = [arg for arg in typing.get_args(annotation) if arg is not type(None)] or [annotation]
+    target     = candidates[0] if candidates[0] is not inspect.Parameter.empty else type(param.default)
+    
+    if target is bool:
+        return raw.lower() in ("1", "s", "sim", "true", "y", "yes")
+    
+    if target in (int, float):
+        return target(raw)
+    
+    return raw
+
+def print_stream_item(item):
+    
+    if not isinstance(item, dict):
+        print(item)
+        return
+    
+    result = item.get("resultado")
+    answer = result.get("resposta_final") if isinstance(result, dict) else result
+    
+    print(f"[{item.get('indice')}] {item.get('pergunta')} ({item.get('intenção')})")
+    print(f"    -> {answer}")
+
 async def main_cli():
 
     await mcp.run_lifespan_startup()
@@ -35,24 +80,51 @@ async def main_cli():
             
             for param_name, param in params.items():
                 
+                if param_name in CLI_MANAGED_PARAMS:
+                    continue
+                
                 if param.default == inspect.Parameter.empty:
                     
                     arg_value = input(f"   -> Digite o valor para '{param_name}': ")
                     
                     args_to_pass[param_name] = arg_value
+                    continue
+                
+                # Parâmetros opcionais também são perguntados: Enter mantém o padrão da ferramenta.
+                arg_value = input(f"   -> Digite o valor para '{param_name}' [padrão: {param.default}]: ").strip()
+                
+                if arg_value:
+                    args_to_pass[param_name] = parse_param_value(param, arg_value)
+            
+            streamed = 'on_token' in params
+            
+            if streamed:
+                args_to_pass['stream']   = True
+                args_to_pass['on_token'] = StreamPrinter()
             
             print("\n--- EXECUTANDO FERRAMENTA ---")
             
+            if inspect.isasyncgenfunction(tool_func):
+                
+                async for item in tool_func(**args_to_pass):
+                    print_stream_item(item)
+                    
+                print("-----------------")
+                continue
+            
             result = await tool_func(**args_to_pass)
             
             print("--- RESULTADO ---")
             
             if isinstance(result, dict):
                 
+                if streamed and args_to_pass['on_token'].started:
+                    print()
+                
                 for key, value in result.items():
                     if key != 'resposta_final':
                         print(f"  {key.replace('_', ' ').capitalize()}: {value}")
-                    else:
+                    elif not (streamed and args_to_pass['on_token'].started):
                         print("--- RESPOSTA ---")
                         print(value)
             else:
@@ -72,10 +144,27 @@ async def main_cli():
 
     await mcp.run_lifespan_shutdown()
 
+def parse_args():
+    
+    parser = argparse.ArgumentParser(description="Gerenciador Híbrido Text-to-SQL.")
+    parser.add_argument("--servidor", choices=["stdio", "sse", "streamable-http"], default=None,
+                        help="Sobe um servidor MCP real em vez do menu interativo.")
+    parser.add_argument("--host",     default=None)
+    parser.add_argument("--porta",    type=int, default=None)
+    
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+    
     try:
         
-        asyncio.run(main_cli())
+        if args.servidor:
+            from src.core.mcp_server import serve, MCP_HOST, MCP_PORT
+            
+            asyncio.run(serve(args.servidor, args.host or MCP_HOST, args.porta or MCP_PORT))
+        else:
+            asyncio.run(main_cli())
         
     except KeyboardInterrupt:
         print("\nAplicação encerrada pelo usuário.")
@@ -0,0 +1,79 @@
+import  os
+import  asyncio
+import  numpy           as np
+import  pandas          as pd
+from    typing          import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Tuple, Union
+from    pathlib         import Path
+
+
+DEFAULT_BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+
+def load_questions(source: Union[str, Path, Iterable[str]]) -> List[str]:
+
+    if isinstance(source, (str, Path)):
+        path = Path(str(source).strip())
+
+        if path.suffix.lower() == ".csv" and path.exists():
+            return pd.read_csv(path)["question"].dropna().astype(str).tolist()
+
+        # Texto livre vindo da CLI: uma pergunta por linha ou separadas por ';'.
+        source = str(source).replace("\n", ";").split(";")
+
+    return [q.strip() for q in source if q and q.strip()]
+
+
+def classify_questions(pipeline: Any, label_encoder: Any, questions: List[str]) -> Tuple[List[str], List[float]]:
+
+    # Uma única chamada: o FunctionTransformer passa a série inteira por nlp.pipe.
+    probabilities   = pipeline.predict_proba(pd.Series(questions))
+    best            = probabilities.argmax(axis=1)
+    intents         = label_encoder.inverse_transform(pipeline.classes_[best])
+
+    return list(intents), probabilities.max(axis=1).tolist()
+
+
+def rank_intents(pipeline: Any, label_encoder: Any, questions: List[str], k: int = 2) -> List[List[Tuple[str, float]]]:
+
+    # As k intenções mais prováveis de cada pergunta, da maior para a menor probabilidade.
+    probabilities   = pipeline.predict_proba(pd.Series(questions))
+    top             = np.argsort(-probabilities, axis=1)[:, :max(1, k)]
+
+    return [
+        list(zip(label_encoder.inverse_transform(pipeline.classes_[columns]), probabilities[row, columns].tolist()))
+        for row, columns in enumerate(top)
+    ]
+
+
+async def answer_questions(
+    questions: List[str],
+    intents: List[str],
+    confidences: List[float],
+    answer_fn: Callable[[str, str, float], Awaitable[Union[Dict[str, Any], str]]],
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY
+) -> AsyncIterator[Dict[str, Any]]:
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(index: int, question: str, intent: str, confidence: float) -> Dict[str, Any]:
+
+        async with semaphore:
+            try:
+                result = await answer_fn(question, intent, confidence)
+            except Exception as e:
+                result = f"❌ Erro: {e}"
+
+        return {"indice": index, "pergunta": question, "intenção": intent, "resultado": result}
+
+    tasks = [
+        asyncio.create_task(run_one(index, question, intent, confidence))
+        for index, (question, intent, confidence) in enumerate(zip(questions, intents, confidences))
+    ]
+
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,303 @@
+import  os
+import  sys
+import  json
+import  asyncio
+import  inspect
+import  numpy                      as np
+import  pandas                     as pd
+from    typing                     import Any, Awaitable, Callable, Dict, Optional
+from    pathlib                    import Path
+from    src.core.server            import mcp as app
+from    src.database.results       import QueryResult
+
+
+MCP_TRANSPORTS          = ("stdio", "sse", "streamable-http")
+MCP_HOST                = os.getenv("MCP_HOST", "127.0.0.1")
+MCP_PORT                = int(os.getenv("MCP_PORT", "8000"))
+
+# Por padrão cabem tantas chamadas simultâneas quantas conexões o cliente da OpenAI abre:
+# acima disso os pedidos esperam na fila (backpressure) e, com a fila cheia, são recusados.
+MCP_MAX_CONCURRENCY     = int(os.getenv("MCP_MAX_CONCURRENCY", os.getenv("OPENAI_MAX_CONNECTIONS", "32")))
+MCP_MAX_QUEUE           = int(os.getenv("MCP_MAX_QUEUE", "64"))
+MCP_REQUEST_TIMEOUT     = float(os.getenv("MCP_REQUEST_TIMEOUT", "120"))
+MCP_ADMIN_TIMEOUT       = float(os.getenv("MCP_ADMIN_TIMEOUT", "3600"))
+MCP_SHUTDOWN_TIMEOUT    = float(os.getenv("MCP_SHUTDOWN_TIMEOUT", "30"))
+
+# Carga do banco e treinos completos passam do timeout normal de uma pergunta.
+ADMIN_TOOLS             = {"popular_banco", "treinar_modelo", "treinar_incremental", "criar_indices"}
+HIDDEN_PARAMS           = {"stream", "on_token"}
+
+TOOL_DESCRIPTIONS       = {
+    "popular_banco"       : "Cria e popula o banco SQLite de automóveis.",
+    "treinar_modelo"      : "Treina o classificador de intenção com busca de hiperparâmetros e o carrega na sessão.",
+    "treinar_incremental" : "Atualiza o classificador incremental com as linhas novas de perguntas e feedback.",
+    "registrar_feedback"  : "Registra uma pergunta rotulada com a intenção correta.",
+    "estatisticas_cache"  : "Estatísticas dos caches de schema, lemas, SQL, pool SQLite e log de consultas.",
+    "metricas"            : "Resumo das métricas por etapa do pipeline.",
+    "metricas_prometheus" : "Métricas no formato texto do Prometheus.",
+    "sugerir_indices"     : "Propõe índices a partir das consultas registradas que varreram a tabela inteira.",
+    "criar_indices"       : "Cria os índices propostos e mede as consultas antes/depois.",
+    "perguntar"           : "Responde uma pergunta em português consultando o banco de automóveis.",
+    "perguntar_lote"      : "Responde várias perguntas (CSV ou separadas por ';') com concorrência limitada.",
+}
+
+
+class ToolDispatcher:
+
+    def __init__(
+        self,
+        max_concurrency: int    = MCP_MAX_CONCURRENCY,
+        max_queue: int          = MCP_MAX_QUEUE,
+        timeout_s: float        = MCP_REQUEST_TIMEOUT,
+        admin_timeout_s: float  = MCP_ADMIN_TIMEOUT
+    ):
+
+        self.max_concurrency    = max(1, max_concurrency)
+        self.max_queue          = max(0, max_queue)
+        self.timeout_s          = timeout_s
+        self.admin_timeout_s    = admin_timeout_s
+        self._slots             = asyncio.Semaphore(self.max_concurrency)
+        self._idle              = asyncio.Event()
+        self._closing           = False
+        self.running            = 0
+        self.waiting            = 0
+        self.completed          = 0
+        self.rejected           = 0
+        self.timed_out          = 0
+
+        self._idle.set()
+
+    async def submit(self, name: str, call: Callable[[], Awaitable[Any]]) -> Any:
+
+        if self._closing:
+            self.rejected += 1
+            return "❌ ERRO: Servidor em encerramento. Tente novamente mais tarde."
+
+        # Fila limitada: quem chega com todos os slots ocupados e a fila cheia é recusado na hora.
+        if self.running + self.waiting >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            return f"❌ ERRO: Servidor ocupado ({self.running} em execução, {self.waiting} na fila). Tente novamente."
+
+        timeout     = self.admin_timeout_s if name in ADMIN_TOOLS else self.timeout_s
+        acquired    = False
+
+        self.waiting += 1
+        self._idle.clear()
+
+        try:
+            # O timeout cobre a espera na fila e a execução.
+            async with asyncio.timeout(timeout):
+                await self._slots.acquire()
+
+                acquired      = True
+                self.waiting -= 1
+                self.running += 1
+                result        = await call()
+
+            self.completed += 1
+            return result
+
+        except TimeoutError:
+            self.timed_out += 1
+            return f"❌ ERRO: '{name}' excedeu o tempo limite de {timeout:.0f}s."
+
+        finally:
+            if acquired:
+                self.running -= 1
+                self._slots.release()
+            else:
+                self.waiting -= 1
+
+            if self.running == 0 and self.waiting == 0:
+                self._idle.set()
+
+    async def drain(self, timeout_s: float = MCP_SHUTDOWN_TIMEOUT) -> bool:
+
+        # Encerramento gracioso: recusa pedidos novos e espera os que já entraram.
+        self._closing = True
+
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout_s)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "em_execucao"       : self.running,
+            "na_fila"           : self.waiting,
+            "concluidas"        : self.completed,
+            "recusadas"         : self.rejected,
+            "expiradas"         : self.timed_out,
+            "max_concorrencia"  : self.max_concurrency,
+            "max_fila"          : self.max_queue,
+        }
+
+
+def to_jsonable(value: Any) -> Any:
+
+    # Os resultados das ferramentas carregam DataFrames, QueryResult e tipos NumPy: o protocolo só aceita JSON.
+    if isinstance(value, QueryResult):
+        return {
+            "colunas"       : value.columns,
+            "total_linhas"  : value.row_count,
+            "truncado"      : value.truncated,
+            "linhas"        : to_jsonable(value.frame),
+        }
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient="records", force_ascii=False))
+    if isinstance(value, dict):
+        return {str(key): to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, Path):
+        return str(value)
+
+    return value
+
+
+def _context_class() -> type:
+
+    try:
+        from mcp.server.mcpserver import Context
+        return Context
+    except ImportError:
+        from mcp.server.fastmcp import Context
+        return Context
+
+
+def _wrap_tool(name: str, func: Callable, dispatcher: ToolDispatcher) -> Callable:
+
+    signature = inspect.signature(func)
+    params    = [param for param in signature.parameters.values() if param.name not in HIDDEN_PARAMS]
+    context   = _context_class()
+
+    async def call(mcp_context: Any, **kwargs) -> Any:
+
+        if not inspect.isasyncgenfunction(func):
+            return await func(**kwargs)
+
+        # perguntar_lote é um gerador assíncrono: cada item sai na hora como notificação de progresso
+        # (para clientes que mandaram progressToken) e a resposta final traz a lista completa.
+        items = []
+
+        async for item in func(**kwargs):
+            items.append(item)
+
+            if mcp_context is None:
+                continue
+
+            try:
+                await mcp_context.report_progress(len(items), None, json.dumps(to_jsonable(item), ensure_ascii=False, default=str))
+            except ValueError:
+                # Chamada fora de uma requisição MCP (ex.: call_tool direto): não há para onde notificar.
+                mcp_context = None
+
+        return items
+
+    async def tool(mcp_context: Any = None, **kwargs) -> Any:
+        return to_jsonable(await dispatcher.submit(name, lambda: call(mcp_context, **kwargs)))
+
+    # O schema de entrada é gerado a partir da assinatura: callbacks como on_token ficam de fora, e o
+    # parâmetro anotado com Context é preenchido pelo servidor MCP.
+    params.append(inspect.Parameter("mcp_context", inspect.Parameter.KEYWORD_ONLY, default=None, annotation=context))
+
+    tool.__name__           = func.__name__
+    tool.__signature__      = signature.replace(parameters=params, return_annotation=inspect.Signature.empty)
+    tool.__annotations__    = {"mcp_context": context}
+
+    return tool
+
+
+def _server_class():
+
+    # mcp 2.x renomeou FastMCP para MCPServer; o pyproject ainda aceita a série 1.x.
+    try:
+        from mcp.server.mcpserver import MCPServer
+        return MCPServer
+    except ImportError:
+        from mcp.server.fastmcp import FastMCP
+        return FastMCP
+
+
+def build_server(dispatcher: Optional[ToolDispatcher] = None) -> Any:
+
+    dispatcher  = dispatcher or ToolDispatcher()
+    server      = _server_class()(name=app.name)
+
+    for name, func in app._tools.items():
+        server.add_tool(_wrap_tool(name, func, dispatcher), name=name, description=TOOL_DESCRIPTIONS.get(name, name))
+
+    async def server_state_tool() -> Dict[str, Any]:
+        return dispatcher.stats()
+
+    server.add_tool(server_state_tool, name="estado_servidor", description="Fila, execução e recusas do despachante de ferramentas.")
+
+    return server
+
+
+class _StdoutToStderr:
+
+    # No stdio o stdout é o canal JSON-RPC: os print() vão para o stderr e o transporte
+    # continua escrevendo no stdout real através de .buffer.
+    def __init__(self, stdout, stderr):
+        self._stdout = stdout
+        self._stderr = stderr
+
+    def write(self, text: str) -> int:
+        return self._stderr.write(text)
+
+    def flush(self):
+        self._stderr.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stdout, name)
+
+
+async def _run_transport(server: Any, transport: str, host: str, port: int):
+
+    if transport == "stdio":
+        await server.run_stdio_async()
+        return
+
+    runner = server.run_sse_async if transport == "sse" else server.run_streamable_http_async
+
+    # 2.x recebe host/porta na chamada; 1.x lê das settings do servidor.
+    if "host" in inspect.signature(runner).parameters:
+        await runner(host=host, port=port)
+    else:
+        server.settings.host = host
+        server.settings.port = port
+        await runner()
+
+
+async def serve(transport: str = "stdio", host: str = MCP_HOST, port: int = MCP_PORT):
+
+    if transport not in MCP_TRANSPORTS:
+        raise ValueError(f"Transporte inválido: '{transport}'. Use um de {MCP_TRANSPORTS}.")
+
+    dispatcher  = ToolDispatcher()
+    server      = build_server(dispatcher)
+    stdout      = sys.stdout
+
+    if transport == "stdio":
+        sys.stdout = _StdoutToStderr(stdout, sys.stderr)
+
+    # O lifespan da aplicação roda uma vez por processo, não por sessão MCP.
+    try:
+        await app.run_lifespan_startup()
+
+        try:
+            print(f"🚀 Servidor MCP ({transport}) com até {dispatcher.max_concurrency} chamadas simultâneas e fila de {dispatcher.max_queue}.")
+            await _run_transport(server, transport, host, port)
+
+        finally:
+            if not await dispatcher.drain():
+                print(f"⚠️ {dispatcher.running} chamadas ainda em execução após {MCP_SHUTDOWN_TIMEOUT:.0f}s; encerrando assim mesmo.")
+
+            await app.run_lifespan_shutdown()
+
+    finally:
+        sys.stdout = stdout
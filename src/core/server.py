@@ -1,15 +1,36 @@
 import  os
+import  time
+import  asyncio
 import  sqlite3
+import  threading
 import  joblib
-import  pandas                    as pd
-from    typing                    import Dict, Any, Optional
-from    pathlib                   import Path
-from    contextlib                import asynccontextmanager
-from    dataclasses               import dataclass
-from    collections.abc           import AsyncIterator
-from    src.llm.generator         import generate_sql_query, generate_natural_language_response
-from    src.mlp.train             import train_model     as tool_train_model
-from    src.database.populate_db  import create_database as tool_populate_db
+from    typing                     import Dict, Any, Optional, Union, Iterable, Callable
+from    pathlib                    import Path
+from    contextlib                 import asynccontextmanager
+from    concurrent.futures         import Future
+from    dataclasses                import dataclass, field
+from    collections.abc            import AsyncIterator
+from    src.core.batch             import load_questions, classify_questions, rank_intents, answer_questions, DEFAULT_BATCH_CONCURRENCY
+from    src.core.speculation       import SPECULATIVE_MARGIN, SPECULATIVE_TOP_K, Speculation, speculate, speculation_candidates
+from    src.llm.generator          import (
+    schema_catalog,
+    generate_sql_query_async,
+    generate_natural_language_response_async,
+    stream_natural_language_response_async
+)
+from    src.llm.sql_cache          import SQLCache
+from    src.nlp.sql_templates      import build_template_sql, TEMPLATE_MIN_CONFIDENCE
+from    src.nlp.preprocessing      import lemma_cache, get_nlp
+from    src.nlp.value_index        import get_value_index, format_matches
+from    src.nlp.answer_rendering   import render_answer, ANSWER_RENDER_POLICY, ANSWER_POLICIES
+from    src.database.pool          import get_pool
+from    src.database.guard         import QueryRejected
+from    src.database.executor      import get_sql_executor, shutdown_sql_executor
+from    src.database.result_cache  import get_result_cache
+from    src.database.query_log     import QueryLog
+from    src.database.index_advisor import advise
+from    src.database.results       import QueryResult, summarize_for_prompt
+from    src.core.tracing           import span, trace, count, annotate, current_trace, registry
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
@@ -50,27 +71,99 @@ class FastMCP:
 
 @dataclass
 class AppContext:
-    mlp_pipeline: Optional[Any]  = None
-    label_encoder: Optional[Any] = None
-    db_path: Path                = DB_PATH
-    openai_available: bool       = False
+    mlp_pipeline: Optional[Any]            = None
+    label_encoder: Optional[Any]           = None
+    db_path: Path                          = DB_PATH
+    openai_available: bool                 = False
+    sql_cache: Optional[SQLCache]          = None
+    query_log: Optional[QueryLog]          = None
+    models_loading: Optional[Future]       = None
+    template_min_confidence: float         = TEMPLATE_MIN_CONFIDENCE
+    speculative_margin: float              = SPECULATIVE_MARGIN
+    answer_policy: str                     = ANSWER_RENDER_POLICY
+    _model_lock: Any                       = field(default_factory=threading.Lock, repr=False)
+    
+    def model_snapshot(self) -> tuple[Any, Any]:
+        
+        # Pipeline e encoder saem juntos: uma troca no meio de 'perguntar' não mistura modelos.
+        with self._model_lock:
+            return self.mlp_pipeline, self.label_encoder
+    
+    def swap_model(self, pipeline: Any, label_encoder: Any):
+        
+        with self._model_lock:
+            self.mlp_pipeline  = pipeline
+            self.label_encoder = label_encoder
 
-@asynccontextmanager
-async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
+
+def _load_models(context: AppContext):
     
-    print("\n--- INICIALIZANDO RECURSOS DA APLICAÇÃO ---")
+    from src.mlp.compiled import INTENT_MODEL_BACKEND, COMPILED_MODEL_DIR, CompiledIntentModel
     
-    context      = AppContext()
     mlp_path     = MODELS_DIR / "intent_classification_pipeline.joblib"
     encoder_path = MODELS_DIR / "intent_label_encoder.joblib"
     
     try:
-        context.mlp_pipeline  = joblib.load(mlp_path)
-        context.label_encoder = joblib.load(encoder_path)
-        print("   ✅ Modelo MLP e codificador carregados.")
+        # O backend compilado lê só arrays NumPy (mmap): nem o sklearn é importado.
+        if INTENT_MODEL_BACKEND == "compiled" and COMPILED_MODEL_DIR.exists():
+            compiled = CompiledIntentModel(COMPILED_MODEL_DIR)
+            context.swap_model(compiled, compiled.labels)
+            print("   ✅ Modelo de intenção compilado (mmap) carregado.")
+            get_nlp()
+            return
+        
+        from src.mlp.online import ONLINE_MODEL_PATH, load_online_model
+        
+        # O modelo incremental só vale se foi atualizado depois do último treino completo.
+        if ONLINE_MODEL_PATH.exists() and (
+            not mlp_path.exists() or ONLINE_MODEL_PATH.stat().st_mtime > mlp_path.stat().st_mtime
+        ):
+            artifact = load_online_model(ONLINE_MODEL_PATH)
+            context.swap_model(artifact["pipeline"], artifact["label_encoder"])
+            print("   ✅ Modelo incremental de intenção carregado.")
+        else:
+            context.swap_model(joblib.load(mlp_path), joblib.load(encoder_path))
+            print("   ✅ Modelo MLP e codificador carregados.")
+        
+        get_nlp()
         
     except FileNotFoundError:
         print("   ⚠️ AVISO: Modelos MLP não encontrados. Execute 'treinar_modelo'.")
+
+
+def _start_loading_models(context: AppContext) -> Future:
+    
+    # Future de thread (e não Task): pode ser aguardado de qualquer event loop, inclusive o da CLI.
+    future = Future()
+    
+    def run():
+        try:
+            _load_models(context)
+            future.set_result(None)
+        except BaseException as e:
+            print(f"   ❌ Erro ao carregar os modelos: {e}")
+            future.set_exception(e)
+    
+    threading.Thread(target=run, name="carregar-modelos", daemon=True).start()
+    
+    return future
+
+
+async def _wait_for_models(ctx: AppContext):
+    
+    if ctx.models_loading is not None:
+        await asyncio.gather(asyncio.wrap_future(ctx.models_loading), return_exceptions=True)
+
+
+@asynccontextmanager
+async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
+    
+    print("\n--- INICIALIZANDO RECURSOS DA APLICAÇÃO ---")
+    
+    context      = AppContext()
+    
+    # Modelos e spaCy carregam em segundo plano: o prompt aparece antes e só 'perguntar' espera por eles.
+    context.models_loading = _start_loading_models(context)
     
     if os.getenv("OPENAI_API_KEY"):
         
@@ -80,10 +173,20 @@ async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
     else:
         print("   ⚠️ AVISO: Chave 'OPENAI_API_KEY' não encontrada.")
     
+    context.sql_cache = SQLCache()
+    print(f"   ✅ Cache de SQL aberto em '{context.sql_cache.path}'.")
+    
+    context.query_log = QueryLog()
+    print(f"   ✅ Log de consultas aberto em '{context.query_log.path}'.")
+    
     try:
         yield context
         
     finally:
+        await _wait_for_models(context)
+        context.sql_cache.close()
+        context.query_log.close()
+        shutdown_sql_executor()
         print("\n--- RECURSOS ENCERRADOS ---")
 
 
@@ -94,77 +197,488 @@ mcp = FastMCP(
 
 @mcp.tool(name="popular_banco")
 
-async def populate_database_tool():
+async def populate_database_tool(linhas: Optional[int] = None, semente: Optional[int] = None):
+    
+    from src.database.populate_db import create_database as tool_populate_db
+    
+    ctx = mcp.get_context()
     
     try:
-        tool_populate_db()
-        return f"✅ Banco de dados criado com sucesso em '{DB_PATH}'!"
+        # A carga em massa bloqueia por minutos em volumes grandes: roda fora do event loop.
+        options = {"n_rows": int(linhas)} if linhas else {}
+        report  = await asyncio.to_thread(tool_populate_db, seed=semente, db_path=ctx.db_path, **options)
+        get_pool(ctx.db_path).reset()
+        get_result_cache(ctx.db_path).clear()
+        schema_catalog.invalidate(ctx.db_path)
+        return (
+            f"✅ Banco de dados criado com sucesso em '{ctx.db_path}'! "
+            f"{report['linhas']:,} linhas ({report['linhas_por_segundo']:,} linhas/s)."
+        )
     
     except Exception as e: return f"❌ Erro: {e}"
 
 @mcp.tool(name="treinar_modelo")
-async def train_model_tool():
+async def train_model_tool(modo_busca: Optional[str] = None):
    
+    from src.mlp.train      import train_model as tool_train_model, TRAIN_SEARCH_MODE, PIPELINE_PATH, LABEL_ENCODER_PATH
+    from src.mlp.online     import ONLINE_MODEL_PATH, reset_online_model
+    from src.mlp.compiled   import INTENT_MODEL_BACKEND, COMPILED_MODEL_DIR, CompiledIntentModel
+    
+    ctx = mcp.get_context()
+    
+    # O carregamento em segundo plano não pode sobrescrever o modelo recém-treinado.
+    await _wait_for_models(ctx)
+    
     print("\nIniciando treinamento do modelo...")
     try:
         
-        tool_train_model()
+        # A busca de hiperparâmetros leva minutos: fora do event loop, as outras chamadas do servidor seguem.
+        report            = await asyncio.to_thread(tool_train_model, modo_busca or TRAIN_SEARCH_MODE)
         
-        ctx               = mcp.get_context()
-        mlp_path          = MODELS_DIR / "intent_classification_pipeline.joblib"
-        encoder_path      = MODELS_DIR / "intent_label_encoder.joblib"
+        reset_online_model(ONLINE_MODEL_PATH)
         
-        ctx.mlp_pipeline  = joblib.load(mlp_path)
-        ctx.label_encoder = joblib.load(encoder_path)
+        # O treino também exporta o artefato compilado: a sessão fica no mesmo backend da partida.
+        if INTENT_MODEL_BACKEND == "compiled" and COMPILED_MODEL_DIR.exists():
+            compiled          = await asyncio.to_thread(CompiledIntentModel, COMPILED_MODEL_DIR)
+            ctx.swap_model(compiled, compiled.labels)
+        else:
+            pipeline, encoder = await asyncio.to_thread(lambda: (joblib.load(PIPELINE_PATH), joblib.load(LABEL_ENCODER_PATH)))
+            ctx.swap_model(pipeline, encoder)
         
-        return "✅ Treinamento concluído e modelos carregados na sessão!"
+        return (
+            "✅ Treinamento concluído e modelos carregados na sessão! "
+            f"Busca '{report['modo_busca']}': {report['fits']} fits em {report['tempo_busca_s']:.1f}s."
+        )
 
     except Exception as e:
         return f"❌ Erro durante o treinamento: {e}"
 
 
-@mcp.tool(name="perguntar")
-async def ask_question_tool(pergunta: str):
+@mcp.tool(name="treinar_incremental")
+async def train_incremental_tool():
     
-    ctx             = mcp.get_context()
+    from src.mlp.online     import ONLINE_MODEL_PATH, train_incremental
+    from src.mlp.compiled   import INTENT_MODEL_BACKEND
     
-    if not ctx.mlp_pipeline: return "❌ ERRO: Modelo MLP não carregado. Execute 'treinar_modelo'."
-    if not ctx.openai_available: return "❌ ERRO: Chave da OpenAI não configurada."
-   
-    print(f"\n[Passo 1/4] Classificando intenção com MLP para: '{pergunta}'")
+    ctx = mcp.get_context()
     
-    predicted_code  = ctx.mlp_pipeline.predict(pd.Series([pergunta]))
-    intent          = ctx.label_encoder.inverse_transform(predicted_code)[0]
+    await _wait_for_models(ctx)
     
-    print(f"    -> Intenção prevista: {intent}")
+    try:
+        report = await asyncio.to_thread(train_incremental, model_path=ONLINE_MODEL_PATH)
+        
+        # Chamadas em andamento seguem com o snapshot que já pegaram; as próximas usam o modelo novo.
+        # O HashingVectorizer não tem vocabulário para exportar: com INTENT_MODEL_BACKEND=compiled a sessão
+        # passa a usar o pipeline sklearn, e a próxima partida volta ao artefato compilado do último treino completo.
+        ctx.swap_model(report["pipeline"], report["label_encoder"])
+        
+        aviso = " Backend compilado substituído pelo pipeline sklearn até o próximo 'treinar_modelo'." if INTENT_MODEL_BACKEND == "compiled" else ""
+        
+        return (
+            f"✅ Modelo incremental atualizado ({report['modo']}): "
+            f"{report['linhas_treinadas']} linhas em {report['tempo_s']:.2f}s.{aviso}"
+        )
+    
+    except Exception as e:
+        return f"❌ Erro durante o treinamento incremental: {e}"
+
 
-    print("[Passo 2/4] Gerando consulta SQL com LLM (guiado pelo MLP)...")
+@mcp.tool(name="registrar_feedback")
+async def register_feedback_tool(pergunta: str, intencao: str):
     
-    sql_query       = generate_sql_query(pergunta, intent)
+    from src.mlp.online import append_feedback
     
-    print(f"    -> SQL Gerado: {sql_query}")
+    try:
+        await asyncio.to_thread(append_feedback, pergunta, intencao.strip().upper())
+        return "✅ Feedback registrado. Execute 'treinar_incremental' para atualizar o modelo."
     
-    if "ERRO" in sql_query: return f"❌ {sql_query}"
+    except Exception as e: return f"❌ Erro: {e}"
+
+
+@mcp.tool(name="estatisticas_cache")
+async def cache_stats_tool():
+
+    ctx = mcp.get_context()
+
+    return {
+        "catalogo_schema"  : schema_catalog.stats(),
+        "indice_valores"   : get_value_index(ctx.db_path).stats(),
+        "cache_lemas"      : lemma_cache.stats(),
+        "cache_sql"        : ctx.sql_cache.stats() if ctx.sql_cache else None,
+        "cache_resultados" : get_result_cache(ctx.db_path).stats(),
+        "pool_sqlite"      : get_pool(ctx.db_path).stats(),
+        "executor_sql"     : get_sql_executor().stats(),
+        "log_consultas"    : ctx.query_log.stats() if ctx.query_log else None
+    }
+
+
+def _refresh_cache_gauges(ctx: AppContext):
+    
+    caches = {
+        "schema"     : schema_catalog.stats(),
+        "lemas"      : lemma_cache.stats(),
+        "sql"        : ctx.sql_cache.stats() if ctx.sql_cache else {},
+        "resultados" : get_result_cache(ctx.db_path).stats(),
+    }
+    
+    for cache, stats in caches.items():
+        for result in ("hits", "misses"):
+            if result in stats:
+                registry.set_gauge("cache_consultas", stats[result], cache=cache, resultado=result)
+    
+    executor = get_sql_executor().stats()
+    
+    for state in ("na_fila", "em_execucao"):
+        registry.set_gauge("executor_sql", executor[state], estado=state)
+
 
-    print("[Passo 3/4] Executando consulta no banco de dados...")
+@mcp.tool(name="metricas")
+async def metrics_tool():
     
+    _refresh_cache_gauges(mcp.get_context())
+    
+    return registry.snapshot()
+
+
+@mcp.tool(name="metricas_prometheus")
+async def prometheus_metrics_tool():
+    
+    _refresh_cache_gauges(mcp.get_context())
+    
+    return registry.to_prometheus()
+
+
+@mcp.tool(name="sugerir_indices")
+async def suggest_indexes_tool():
+
+    ctx = mcp.get_context()
+
+    if not ctx.query_log: return "❌ ERRO: Log de consultas não inicializado."
+
     try:
-        with sqlite3.connect(ctx.db_path) as conn:
-            db_result = pd.read_sql_query(sql_query, conn)
-            
-        print(f"    -> Resultado: {db_result.shape[0]} linhas retornadas.")
+        return await asyncio.to_thread(advise, ctx.query_log, ctx.db_path)
+
+    except Exception as e: return f"❌ Erro: {e}"
+
+
+@mcp.tool(name="criar_indices")
+async def create_indexes_tool():
+
+    ctx = mcp.get_context()
+
+    if not ctx.query_log: return "❌ ERRO: Log de consultas não inicializado."
+
+    try:
+        report = await asyncio.to_thread(advise, ctx.query_log, ctx.db_path, True)
+        schema_catalog.invalidate(ctx.db_path)
+        return report
+
+    except Exception as e: return f"❌ Erro: {e}"
+
+
+def _classify_intent(pipeline: Any, label_encoder: Any, pergunta: str) -> tuple[str, float, list]:
+    
+    # As alternativas alimentam a geração especulativa quando a margem entre as primeiras é pequena.
+    ranked = rank_intents(pipeline, label_encoder, [pergunta], SPECULATIVE_TOP_K)[0]
+    
+    return ranked[0][0], ranked[0][1], ranked
+
+
+def _lookup_cached_sql(ctx: AppContext, pergunta: str, intent: str) -> tuple[str, str, Optional[str]]:
+    
+    schema_fp = schema_catalog.fingerprint(ctx.db_path)
+    cache_key = SQLCache.make_key(pergunta, intent, schema_fp)
+    sql_query = ctx.sql_cache.get(cache_key) if ctx.sql_cache else None
+    
+    return cache_key, schema_fp, sql_query
+
+
+def _resolve_values(ctx: AppContext, pergunta: str) -> str:
+    
+    with span("valores") as values:
+        matches = get_value_index(ctx.db_path).resolve(pergunta)
+        values.attributes["valores"] = len(matches)
+    
+    return format_matches(matches)
+
+
+def _execute_query(ctx: AppContext, sql_query: str, params: tuple = (), source: str = "") -> QueryResult:
+    
+    # Perguntas diferentes costumam gerar o mesmo SQL: enquanto o arquivo do banco não muda, o resultado sai da memória.
+    cache   = get_result_cache(ctx.db_path)
+    key     = cache.key(sql_query, params)
+    cached  = cache.get(key)
+    
+    annotate(cache_resultados="hit" if cached is not None else "miss")
+    
+    if cached is not None:
+        return cached
+    
+    pool    = get_pool(ctx.db_path)
+    started = time.perf_counter()
+    result  = pool.fetch(sql_query, params)
+    elapsed = time.perf_counter() - started
+    
+    cache.put(key, result)
+    
+    # O plano é registrado junto com o tempo para o sugerir_indices encontrar as varreduras completas.
+    # O EXPLAIN extra só roda para as consultas amostradas pelo log.
+    if ctx.query_log and ctx.query_log.sampled(elapsed):
+        try:
+            ctx.query_log.record(sql_query, params, elapsed, result.row_count, pool.explain(sql_query, params), source)
+        except sqlite3.Error as e:
+            print(f"    -> ⚠️ Falha ao registrar a consulta no log: {e}")
+    
+    return result
+
+
+async def _speculate_sql(ctx: AppContext, pergunta: str, ranked: list, resolved: str) -> Speculation:
+    
+    async def generate(intent: str) -> tuple[str, str]:
+        _, _, sql_query = await get_sql_executor().run(_lookup_cached_sql, ctx, pergunta, intent)
         
-    except Exception as e:
-        db_result = f"Erro ao executar a consulta SQL: {e}"
-        print(f"    -> {db_result}")
+        if sql_query is not None:
+            return sql_query, "cache"
+        
+        return await generate_sql_query_async(pergunta, intent, resolved), "llm"
+    
+    async def execute(sql_query: str) -> QueryResult:
+        return await get_sql_executor().run(_execute_query, ctx, sql_query, (), "especulacao")
+    
+    return await speculate(ranked, generate, execute)
+
+
+async def _answer_question(
+    ctx: AppContext,
+    pergunta: str,
+    intent: str,
+    confidence: float                           = 0.0,
+    stream: bool                                = False,
+    on_token: Optional[Callable[[str], None]]   = None,
+    answer_policy: Optional[str]                = None,
+    alternatives: Optional[list]                = None
+) -> Dict[str, Any] | str:
+
+    predicted_intent                        = intent
+    query_result: Optional[QueryResult]     = None
+    speculation: Optional[Speculation]      = None
+
+    # Caminho rápido: intenção confiável e filtros reconhecidos dispensam o LLM.
+    with span("geracao_sql") as generation:
+        template        = build_template_sql(pergunta, intent) if confidence >= ctx.template_min_confidence else None
+        sql_params      = template.params if template else ()
+        
+        if template:
+            sql_query   = template.sql
+            sql_source  = "template"
+        
+        else:
+            cache_key, schema_fp, sql_query = await get_sql_executor().run(_lookup_cached_sql, ctx, pergunta, intent)
+            sql_source  = "cache"
+        
+            if sql_query is None:
+                resolved    = await get_sql_executor().run(_resolve_values, ctx, pergunta)
+                candidates  = speculation_candidates(alternatives, ctx.speculative_margin)
+                
+                if candidates:
+                    # Classificador em dúvida: SQL das k intenções em paralelo, fica o que executou com o formato esperado.
+                    speculation                     = await _speculate_sql(ctx, pergunta, candidates, resolved)
+                    winner                          = speculation.winner
+                    intent, sql_query, sql_source   = winner.intent, winner.sql, winner.source
+                    query_result                    = winner.result
+                    cache_key                       = SQLCache.make_key(pergunta, intent, schema_fp)
+                    
+                    generation.attributes.update(especulacao=len(candidates), escolhida=intent)
+                
+                else:
+                    sql_query   = await generate_sql_query_async(pergunta, intent, resolved)
+                    sql_source  = "llm"
+        
+        generation.attributes.update(origem=sql_source, sql=sql_query)
+        count("sql_origem_total", origem=sql_source)
+    
+    if "ERRO" in sql_query: return f"❌ {sql_query}"
+    
+    query_error: Optional[Dict[str, Any]]   = None
+    
+    with span("execucao") as execution:
+        try:
+            # O vencedor da especulação já foi executado; sem nenhum candidato válido, o erro sai daqui.
+            if query_result is None:
+                query_result = await get_sql_executor().run(_execute_query, ctx, sql_query, sql_params, sql_source)
+            
+            db_result    = query_result.frame
+            prompt_data  = summarize_for_prompt(query_result)
+            
+            execution.attributes.update(linhas=query_result.row_count, materializadas=len(db_result))
+            count("linhas_retornadas_total", query_result.row_count)
+            
+            # Só é memorizado o SQL que executou sem erro.
+            if sql_source == "llm" and ctx.sql_cache:
+                await asyncio.to_thread(ctx.sql_cache.put, cache_key, pergunta, intent, schema_fp, sql_query)
+            
+        except QueryRejected as e:
+            # SQL recusado na validação ou abortado pelo orçamento: só esta pergunta falha.
+            query_error = e.to_dict()
+            db_result   = f"Consulta SQL recusada: {e}"
+            prompt_data = db_result
+            execution.attributes["erro"] = e.code
+            count("consultas_recusadas_total", motivo=e.code)
+            
+        except Exception as e:
+            query_error = {"codigo": "execucao", "mensagem": str(e)}
+            db_result   = f"Erro ao executar a consulta SQL: {e}"
+            prompt_data = db_result
+            execution.attributes["erro"] = str(e)
+            count("erros_execucao_total")
     
-    print("[Passo 4/4] Gerando resposta final em linguagem natural...")
+    with span("resposta") as answer:
+        time_to_first_token = None
+        local_answer        = render_answer(
+            intent,
+            db_result,
+            answer_policy or ctx.answer_policy,
+            total_rows =query_result.row_count if query_result else None,
+            sql        =sql_query
+        )
+        answer_source       = "local" if local_answer is not None else "llm"
+        
+        if local_answer is not None:
+            final_response      = local_answer
+            time_to_first_token = time.perf_counter() - answer.started if stream else None
+            
+            if stream and on_token: on_token(local_answer)
+        
+        elif stream:
+            tokens = []
+            
+            async for token in stream_natural_language_response_async(pergunta, prompt_data):
+                if time_to_first_token is None:
+                    time_to_first_token = time.perf_counter() - answer.started
+                
+                tokens.append(token)
+                
+                if on_token: on_token(token)
+            
+            final_response = "".join(tokens).strip()
+        
+        else:
+            final_response = await generate_natural_language_response_async(pergunta, prompt_data)
+        
+        answer.attributes["origem"] = answer_source
+        count("resposta_origem_total", origem=answer_source)
     
-    final_response = generate_natural_language_response(pergunta, db_result)
+    current = current_trace()
 
     return {
-        "pergunta_original"     : pergunta,
-        "intenção_prevista_mlp" : intent,
-        "sql_gerado_llm"        : sql_query,
-        "resposta_final"        : final_response
-    }
\ No newline at end of file
+        "pergunta_original"      : pergunta,
+        "intenção_prevista_mlp"  : predicted_intent,
+        "intenção_usada"         : intent,
+        "confiança_mlp"          : round(float(confidence), 3),
+        "sql_gerado_llm"         : template.rendered if template else sql_query,
+        "origem_sql"             : sql_source,
+        "origem_resposta"        : answer_source,
+        "linhas_resultado"       : query_result.row_count if query_result else 0,
+        "erro_consulta"          : query_error,
+        "resultado_consulta"     : query_result,
+        "tempo_primeiro_token_s" : round(time_to_first_token, 3) if time_to_first_token is not None else None,
+        "tempo_total_resposta_s" : round(answer.duration_s, 3),
+        "tempos_etapas"          : {f"{name}_s": round(elapsed, 4) for name, elapsed in current.durations().items()} if current else {},
+        "especulacao"            : speculation.report() if speculation else None,
+        "resposta_final"         : final_response
+    }
+
+
+@mcp.tool(name="perguntar")
+async def ask_question_tool(
+    pergunta: str,
+    stream: bool                                = False,
+    on_token: Optional[Callable[[str], None]]   = None,
+    modo_resposta: Optional[str]                = None
+):
+    
+    ctx             = mcp.get_context()
+    
+    await _wait_for_models(ctx)
+    
+    pipeline, label_encoder = ctx.model_snapshot()
+    
+    if not pipeline: return "❌ ERRO: Modelo MLP não carregado. Execute 'treinar_modelo'."
+    if not ctx.openai_available: return "❌ ERRO: Chave da OpenAI não configurada."
+    if modo_resposta and modo_resposta not in ANSWER_POLICIES:
+        return f"❌ ERRO: modo_resposta deve ser um de {ANSWER_POLICIES}."
+   
+    print(f"\n[perguntar] '{pergunta}'")
+    
+    with trace("perguntar"):
+        
+        # spaCy/sklearn e SQLite bloqueiam: rodam em threads para não travar o event loop.
+        with span("classificacao") as classification:
+            intent, confidence, ranked = await asyncio.to_thread(_classify_intent, pipeline, label_encoder, pergunta)
+            classification.attributes.update(intencao=intent, confianca=round(float(confidence), 2))
+        
+        return await _answer_question(
+            ctx,
+            pergunta,
+            intent,
+            confidence,
+            stream        =stream,
+            on_token      =on_token,
+            answer_policy =modo_resposta,
+            alternatives  =ranked
+        )
+
+
+async def _traced_answer(ctx: AppContext, pergunta: str, intent: str, confidence: float) -> Dict[str, Any] | str:
+    
+    with trace("perguntar_lote"):
+        return await _answer_question(ctx, pergunta, intent, confidence)
+
+
+async def answer_questions_batch(
+    perguntas: Union[str, Path, Iterable[str]],
+    concorrencia: int = DEFAULT_BATCH_CONCURRENCY
+) -> AsyncIterator[Dict[str, Any]]:
+    
+    ctx       = mcp.get_context()
+    questions = load_questions(perguntas)
+    
+    if not questions: return
+    
+    print(f"\n[Lote] Classificando {len(questions)} perguntas com MLP...")
+    
+    pipeline, label_encoder = ctx.model_snapshot()
+    
+    with span("classificacao_lote", perguntas=len(questions)):
+        intents, confidences = await asyncio.to_thread(classify_questions, pipeline, label_encoder, questions)
+    
+    print(f"[Lote] Gerando e executando SQL com até {concorrencia} perguntas simultâneas...")
+    
+    async for item in answer_questions(
+        questions,
+        intents,
+        confidences,
+        lambda pergunta, intent, confidence: _traced_answer(ctx, pergunta, intent, confidence),
+        concurrency =int(concorrencia)
+    ):
+        yield item
+
+
+@mcp.tool(name="perguntar_lote")
+async def ask_questions_batch_tool(perguntas: str, concorrencia: int = DEFAULT_BATCH_CONCURRENCY):
+    
+    ctx = mcp.get_context()
+    
+    await _wait_for_models(ctx)
+    
+    pipeline, _ = ctx.model_snapshot()
+    
+    if not pipeline:
+        yield "❌ ERRO: Modelo MLP não carregado. Execute 'treinar_modelo'."
+        return
+    if not ctx.openai_available:
+        yield "❌ ERRO: Chave da OpenAI não configurada."
+        return
+    
+    async for item in answer_questions_batch(perguntas, concorrencia):
+        yield item
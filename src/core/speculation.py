@@ -0,0 +1,142 @@
+import  os
+import  time
+import  asyncio
+from    typing                  import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from    dataclasses             import dataclass, field
+from    src.core.tracing        import span, count
+from    src.database.results    import QueryResult
+
+
+SPECULATIVE_MARGIN  = float(os.getenv("SPECULATIVE_MARGIN", "0.15"))
+SPECULATIVE_TOP_K   = int(os.getenv("SPECULATIVE_TOP_K", "2"))
+
+SCALAR_INTENTS      = {"COUNT", "CALC_AVG", "CALC_SUM"}
+
+Ranked = List[Tuple[str, float]]
+
+
+@dataclass
+class Candidate:
+    intent: str
+    probability: float
+    sql: str                                = ""
+    source: str                             = ""
+    result: Optional[QueryResult]           = None
+    error: Optional[str]                    = None
+    score: float                            = 0.0
+    latency_s: float                        = 0.0
+    tokens: int                             = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "intencao"      : self.intent,
+            "probabilidade" : round(self.probability, 3),
+            "origem_sql"    : self.source,
+            "sql"           : self.sql,
+            "linhas"        : self.result.row_count if self.result else None,
+            "erro"          : self.error,
+            "pontuacao"     : round(self.score, 3),
+            "latencia_s"    : round(self.latency_s, 3),
+            "tokens"        : self.tokens,
+        }
+
+
+@dataclass
+class Speculation:
+    candidates: List[Candidate]
+    winner: Candidate
+    latency_s: float
+    margin: float                           = 0.0
+    extra_tokens: int                       = field(init=False)
+
+    def __post_init__(self):
+        self.extra_tokens = sum(c.tokens for c in self.candidates if c is not self.winner)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "margem"            : round(self.margin, 3),
+            "escolhida"         : self.winner.intent,
+            "trocou_intencao"   : self.winner is not self.candidates[0],
+            "latencia_s"        : round(self.latency_s, 3),
+            "tokens_extras"     : self.extra_tokens,
+            "candidatos"        : [c.to_dict() for c in self.candidates],
+        }
+
+
+def speculation_candidates(ranked: Optional[Ranked], margin: float = SPECULATIVE_MARGIN) -> Ranked:
+
+    # Só vale gastar chamadas extras ao LLM quando as duas intenções mais prováveis estão quase empatadas.
+    if not ranked or len(ranked) < 2 or ranked[0][1] - ranked[1][1] >= margin:
+        return []
+
+    return ranked
+
+
+def matches_shape(intent: str, result: QueryResult) -> bool:
+
+    columns = len(result.columns)
+
+    if intent in SCALAR_INTENTS:
+        return result.row_count == 1 and columns == 1
+    if intent.startswith("FIND_"):
+        return result.row_count == 1
+    if intent == "GROUP_COUNT":
+        return columns >= 2
+    if intent == "LIST_ALL":
+        return columns > 1
+
+    return True
+
+
+def score_candidate(candidate: Candidate) -> float:
+
+    # Regra barata: executou, trouxe linhas e tem o formato que a intenção pede. A probabilidade
+    # do classificador (< 1) só desempata.
+    if candidate.result is None:
+        return 0.0
+
+    result = candidate.result
+
+    return 1.0 + (result.row_count > 0) + matches_shape(candidate.intent, result) + candidate.probability
+
+
+async def speculate(
+    ranked: Ranked,
+    generate: Callable[[str], Awaitable[Tuple[str, str]]],
+    execute: Callable[[str], Awaitable[QueryResult]]
+) -> Speculation:
+
+    started = time.perf_counter()
+
+    async def run(intent: str, probability: float) -> Candidate:
+
+        candidate = Candidate(intent, probability)
+
+        # Cada candidato gera e já executa o seu SQL: a execução de um sobrepõe a geração do outro.
+        with span("candidato_sql", intencao=intent) as current:
+            candidate.sql, candidate.source = await generate(intent)
+
+            if "ERRO" in candidate.sql:
+                candidate.error = candidate.sql
+            else:
+                try:
+                    candidate.result = await execute(candidate.sql)
+                except Exception as e:
+                    candidate.error = str(e)
+
+        candidate.latency_s = current.duration_s
+        candidate.tokens    = current.attributes.get("tokens_prompt", 0) + current.attributes.get("tokens_resposta", 0)
+        candidate.score     = score_candidate(candidate)
+
+        return candidate
+
+    candidates = list(await asyncio.gather(*(run(intent, probability) for intent, probability in ranked)))
+
+    # max mantém o primeiro em empate: sem nenhum candidato válido fica a intenção do classificador.
+    winner      = max(candidates, key=lambda c: c.score)
+    speculation = Speculation(candidates, winner, time.perf_counter() - started, ranked[0][1] - ranked[1][1])
+
+    count("especulacao_total", resultado="trocou" if winner is not candidates[0] else "manteve")
+    count("especulacao_tokens_extras_total", speculation.extra_tokens)
+
+    return speculation
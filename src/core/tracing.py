@@ -0,0 +1,314 @@
+import  os
+import  json
+import  time
+import  threading
+from    typing          import Any, Dict, Iterator, List, Optional, Tuple
+from    pathlib         import Path
+from    contextlib      import contextmanager
+from    contextvars     import ContextVar
+from    collections     import deque
+from    dataclasses     import dataclass, field
+
+
+METRICS_PREFIX      = "text_to_sql"
+TRACE_EXPORTERS     = os.getenv("TRACE_EXPORTERS", "console")
+TRACE_JSONL_PATH    = Path(os.getenv("TRACE_JSONL_PATH", Path(__file__).resolve().parent.parent.parent / "data" / "traces.jsonl"))
+DURATION_BUCKETS    = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RESERVOIR_SIZE      = 2048
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class Span:
+    name: str
+    started: float                        = field(default_factory=time.perf_counter)
+    duration_s: Optional[float]           = None
+    attributes: Dict[str, Any]            = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"etapa": self.name, "duracao_ms": round((self.duration_s or 0.0) * 1000, 3), **self.attributes}
+
+
+@dataclass
+class Trace:
+    name: str
+    attributes: Dict[str, Any]            = field(default_factory=dict)
+    spans: List[Span]                     = field(default_factory=list)
+    started: float                        = field(default_factory=time.perf_counter)
+    duration_s: Optional[float]           = None
+
+    def durations(self) -> Dict[str, float]:
+
+        # Uma etapa pode se repetir (ex.: duas chamadas ao LLM): as durações são somadas.
+        totals: Dict[str, float] = {}
+
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + (span.duration_s or 0.0)
+
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace"      : self.name,
+            "duracao_ms" : round((self.duration_s or 0.0) * 1000, 3),
+            **self.attributes,
+            "etapas"     : [span.to_dict() for span in self.spans],
+        }
+
+
+class Exporter:
+
+    # Ponto de extensão: sobrescreva um dos dois ganchos (ambos são chamados fora de qualquer lock).
+    def on_span_end(self, trace: Optional[Trace], span: Span):
+        pass
+
+    def on_trace_end(self, trace: Trace):
+        pass
+
+
+class ConsoleExporter(Exporter):
+
+    def on_span_end(self, trace: Optional[Trace], span: Span):
+
+        details = " | ".join(f"{key}={value}" for key, value in span.attributes.items())
+        print(f"    [{span.name}] {span.duration_s * 1000:.1f} ms" + (f" | {details}" if details else ""))
+
+    def on_trace_end(self, trace: Trace):
+        print(f"    [{trace.name}] total {trace.duration_s * 1000:.1f} ms")
+
+
+class JsonLinesExporter(Exporter):
+
+    def __init__(self, path: Path = TRACE_JSONL_PATH):
+
+        self.path   = Path(path)
+        self._lock  = threading.Lock()
+
+    def on_trace_end(self, trace: Trace):
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(trace.to_dict(), ensure_ascii=False, default=str)
+
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _label_key(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _series_name(name: str, labels: Labels) -> str:
+    return name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else "")
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+
+        self._lock                                            = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float]       = {}
+        self._gauges: Dict[Tuple[str, Labels], float]         = {}
+        self._histograms: Dict[str, List[int]]                = {}
+        self._sums: Dict[str, float]                          = {}
+        self._counts: Dict[str, int]                          = {}
+        self._recent: Dict[str, deque]                        = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any):
+
+        key = (name, _label_key(labels))
+
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any):
+
+        key = (name, _label_key(labels))
+
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, stage: str, duration_s: float):
+
+        with self._lock:
+            buckets = self._histograms.setdefault(stage, [0] * len(DURATION_BUCKETS))
+
+            for position, bound in enumerate(DURATION_BUCKETS):
+                if duration_s <= bound:
+                    buckets[position] += 1
+
+            self._sums[stage]   = self._sums.get(stage, 0.0) + duration_s
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+            self._recent.setdefault(stage, deque(maxlen=RESERVOIR_SIZE)).append(duration_s)
+
+    def reset(self):
+
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self._sums.clear()
+            self._counts.clear()
+            self._recent.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+
+        with self._lock:
+            stages = {}
+
+            # Percentis sobre as últimas RESERVOIR_SIZE observações de cada etapa.
+            for stage, recent in self._recent.items():
+                ordered = sorted(recent)
+                stages[stage] = {
+                    "chamadas" : self._counts[stage],
+                    "total_s"  : round(self._sums[stage], 4),
+                    "media_ms" : round(self._sums[stage] / self._counts[stage] * 1000, 3),
+                    "p50_ms"   : round(ordered[int(0.50 * (len(ordered) - 1))] * 1000, 3),
+                    "p95_ms"   : round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 3),
+                }
+
+            counters = {_series_name(name, labels): value for (name, labels), value in sorted(self._counters.items())}
+            gauges   = {_series_name(name, labels): value for (name, labels), value in sorted(self._gauges.items())}
+
+        return {"etapas": stages, "contadores": counters, "medidores": gauges}
+
+    def to_prometheus(self) -> str:
+
+        lines = []
+
+        with self._lock:
+            histogram = f"{METRICS_PREFIX}_stage_duration_seconds"
+            lines    += [f"# HELP {histogram} Duração de cada etapa do pipeline.", f"# TYPE {histogram} histogram"]
+
+            for stage, buckets in sorted(self._histograms.items()):
+                for bound, count in zip(DURATION_BUCKETS, buckets):
+                    lines.append(f'{histogram}_bucket{{etapa="{stage}",le="{bound}"}} {count}')
+
+                lines.append(f'{histogram}_bucket{{etapa="{stage}",le="+Inf"}} {self._counts[stage]}')
+                lines.append(f'{histogram}_sum{{etapa="{stage}"}} {self._sums[stage]}')
+                lines.append(f'{histogram}_count{{etapa="{stage}"}} {self._counts[stage]}')
+
+            declared = set()
+
+            for kind, series in (("counter", self._counters), ("gauge", self._gauges)):
+                for (name, labels), value in sorted(series.items()):
+                    metric = f"{METRICS_PREFIX}_{name}"
+
+                    if metric not in declared:
+                        lines.append(f"# TYPE {metric} {kind}")
+                        declared.add(metric)
+
+                    rendered = ",".join(f'{k}="{v}"' for k, v in labels)
+                    lines.append(f"{metric}{{{rendered}}} {value}" if rendered else f"{metric} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry                                  = MetricsRegistry()
+_exporters: List[Exporter]                = []
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]]   = ContextVar("current_span", default=None)
+
+
+def add_exporter(exporter: Exporter) -> Exporter:
+    _exporters.append(exporter)
+    return exporter
+
+
+def remove_exporter(exporter: Exporter):
+    if exporter in _exporters:
+        _exporters.remove(exporter)
+
+
+def exporters() -> List[Exporter]:
+    return list(_exporters)
+
+
+def configure_exporters(spec: str = TRACE_EXPORTERS):
+
+    # TRACE_EXPORTERS="console,jsonl" | "none"
+    _exporters.clear()
+    names = {name.strip() for name in spec.split(",") if name.strip()}
+
+    if "console" in names:
+        add_exporter(ConsoleExporter())
+    if "jsonl" in names:
+        add_exporter(JsonLinesExporter())
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def annotate(**attributes: Any):
+
+    # Anota a etapa corrente (ou o trace, fora de qualquer etapa).
+    target = _current_span.get() or _current_trace.get()
+
+    if target is not None:
+        target.attributes.update(attributes)
+
+
+def count(name: str, value: float = 1.0, **labels: Any):
+    registry.inc(name, value, **labels)
+
+
+def record_tokens(usage: Any):
+
+    if usage is None:
+        return
+
+    prompt_tokens       = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens   = getattr(usage, "completion_tokens", 0) or 0
+
+    annotate(tokens_prompt=prompt_tokens, tokens_resposta=completion_tokens)
+    count("llm_tokens_total", prompt_tokens,     tipo="prompt")
+    count("llm_tokens_total", completion_tokens, tipo="completion")
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+
+    # asyncio.to_thread copia o contexto: etapas abertas dentro de threads caem no trace certo.
+    current = Span(name, attributes=dict(attributes))
+    token   = _current_span.set(current)
+
+    try:
+        yield current
+
+    finally:
+        current.duration_s = time.perf_counter() - current.started
+        _current_span.reset(token)
+
+        trace = _current_trace.get()
+
+        if trace is not None:
+            trace.spans.append(current)
+
+        registry.observe(name, current.duration_s)
+
+        for exporter in list(_exporters):
+            exporter.on_span_end(trace, current)
+
+
+@contextmanager
+def trace(name: str, **attributes: Any) -> Iterator[Trace]:
+
+    current = Trace(name, attributes=dict(attributes))
+    token   = _current_trace.set(current)
+
+    try:
+        yield current
+
+    finally:
+        current.duration_s = time.perf_counter() - current.started
+        _current_trace.reset(token)
+
+        registry.observe(name, current.duration_s)
+        count("traces_total", trace=name)
+
+        for exporter in list(_exporters):
+            exporter.on_trace_end(current)
+
+
+configure_exporters()
@@ -0,0 +1,122 @@
+import  os
+import  time
+import  asyncio
+import  threading
+import  contextvars
+from    typing                      import Any, Callable, Dict, Optional, TypeVar
+from    concurrent.futures          import ThreadPoolExecutor
+from    src.core.tracing            import annotate, registry
+from    src.database.pool           import POOL_SIZE, pin_thread_connections
+
+
+SQL_EXECUTOR_WORKERS = int(os.getenv("SQL_EXECUTOR_WORKERS", str(POOL_SIZE)))
+
+T = TypeVar("T")
+
+
+class SQLExecutor:
+
+    def __init__(self, workers: int = SQL_EXECUTOR_WORKERS):
+
+        self.workers        = max(1, workers)
+        self._executor      = ThreadPoolExecutor(
+            max_workers         =self.workers,
+            thread_name_prefix  ="sql",
+            initializer         =pin_thread_connections
+        )
+        self._lock          = threading.Lock()
+        self.queued         = 0
+        self.running        = 0
+        self.completed      = 0
+        self.wait_total_s   = 0.0
+        self.wait_max_s     = 0.0
+
+    def _work(self, func: Callable[..., T], submitted: float, claimed: list, args: tuple, kwargs: dict) -> Optional[T]:
+
+        waited = time.perf_counter() - submitted
+
+        with self._lock:
+            # Quem esperava desistiu (cancelamento/timeout) antes de a chamada sair da fila: nada a fazer.
+            if claimed[0]:
+                return None
+
+            claimed[0]          = True
+            self.queued        -= 1
+            self.running       += 1
+            self.wait_total_s  += waited
+            self.wait_max_s     = max(self.wait_max_s, waited)
+
+        try:
+            annotate(espera_executor_ms=round(waited * 1000, 3))
+            registry.observe("espera_executor_sql", waited)
+
+            return func(*args, **kwargs)
+
+        finally:
+            with self._lock:
+                self.running   -= 1
+                self.completed += 1
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+
+        # Como o asyncio.to_thread, o contexto vai junto: o trabalho entra no span aberto pela corrotina.
+        context = contextvars.copy_context()
+        claimed = [False]
+
+        with self._lock:
+            self.queued += 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, context.run, self._work, func, time.perf_counter(), claimed, args, kwargs
+            )
+
+        finally:
+            with self._lock:
+                if not claimed[0]:
+                    claimed[0]   = True
+                    self.queued -= 1
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+
+        with self._lock:
+            started = self.completed + self.running
+
+            return {
+                "workers"           : self.workers,
+                "na_fila"           : self.queued,
+                "em_execucao"       : self.running,
+                "concluidas"        : self.completed,
+                "espera_media_ms"   : round(self.wait_total_s / started * 1000, 3) if started else 0.0,
+                "espera_max_ms"     : round(self.wait_max_s * 1000, 3),
+            }
+
+
+_executor: Optional[SQLExecutor] = None
+_executor_lock                   = threading.Lock()
+
+
+def get_sql_executor() -> SQLExecutor:
+
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = SQLExecutor()
+
+        return _executor
+
+
+def shutdown_sql_executor():
+
+    global _executor
+
+    # O próximo get_sql_executor cria um executor novo (ex.: lifespan reiniciado nos testes).
+    with _executor_lock:
+        executor, _executor = _executor, None
+
+    if executor is not None:
+        executor.shutdown()
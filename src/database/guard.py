@@ -0,0 +1,136 @@
+import  os
+import  time
+import  sqlite3
+import  threading
+from    typing      import Any, Dict, Iterator, Optional
+from    contextlib  import contextmanager
+
+
+QUERY_TIMEOUT_S         = float(os.getenv("QUERY_TIMEOUT_S", "5"))
+QUERY_MAX_VM_STEPS      = int(os.getenv("QUERY_MAX_VM_STEPS", "200000000"))
+PROGRESS_HANDLER_STEPS  = 10000
+
+# Só leitura: SELECT, leitura de colunas, funções e CTE recursiva. PRAGMA, ATTACH e escrita
+# são negados já na compilação, antes de qualquer passo da VM.
+READ_ONLY_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_RECURSIVE,
+}
+
+
+_guard_state = threading.local()
+
+
+class QueryRejected(Exception):
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"codigo": self.code, "mensagem": str(self)}
+
+
+def _read_only_authorizer(action: int, *_) -> int:
+
+    # Fora de uma consulta protegida (schema, PRAGMA do pool, EXPLAIN QUERY PLAN) tudo é permitido.
+    if not getattr(_guard_state, "active", False):
+        return sqlite3.SQLITE_OK
+
+    return sqlite3.SQLITE_OK if action in READ_ONLY_ACTIONS else sqlite3.SQLITE_DENY
+
+
+def install_guard(conn: sqlite3.Connection):
+
+    # Instalado uma vez por conexão: trocar o authorizer expira o cache de statements do SQLite
+    # e cada consulta voltaria a ser compilada.
+    conn.set_authorizer(_read_only_authorizer)
+
+
+def validate_statement(conn: sqlite3.Connection, sql: str, params: tuple = ()):
+
+    statement = sql.strip().rstrip(";").strip()
+
+    if not statement:
+        raise QueryRejected("vazia", "A consulta SQL está vazia.")
+
+    # complete_statement pega strings e comentários abertos (SQL cortado pelo LLM).
+    if not sqlite3.complete_statement(statement + ";"):
+        raise QueryRejected("incompleta", "A consulta SQL está incompleta.")
+
+    # EXPLAIN compila sem executar: erro de sintaxe, tabela inexistente e ação negada aparecem aqui.
+    try:
+        conn.execute(f"EXPLAIN {statement}", params).fetchone()
+    except sqlite3.ProgrammingError as e:
+        if "one statement" in str(e):
+            raise QueryRejected("multiplas_instrucoes", "Apenas uma instrução SQL é permitida por consulta.") from e
+        raise QueryRejected("invalida", f"Consulta SQL inválida: {e}") from e
+    except sqlite3.DatabaseError as e:
+        if "not authorized" in str(e):
+            raise QueryRejected("somente_leitura", "Apenas consultas de leitura (SELECT) são permitidas.") from e
+        raise QueryRejected("invalida", f"Consulta SQL inválida: {e}") from e
+
+
+class QueryBudget:
+
+    def __init__(self, timeout_s: float = QUERY_TIMEOUT_S, max_steps: int = QUERY_MAX_VM_STEPS):
+
+        self.timeout_s              = timeout_s
+        self.max_steps              = max_steps
+        self.started                = time.perf_counter()
+        self.deadline               = self.started + timeout_s if timeout_s > 0 else None
+        self.steps                  = 0
+        self.reason: Optional[str]  = None
+
+    def check(self) -> int:
+
+        # Chamado pelo SQLite a cada PROGRESS_HANDLER_STEPS instruções: não zero interrompe a consulta.
+        self.steps += PROGRESS_HANDLER_STEPS
+
+        if self.max_steps > 0 and self.steps > self.max_steps:
+            self.reason = "passos_esgotados"
+        elif self.deadline is not None and time.perf_counter() > self.deadline:
+            self.reason = "tempo_esgotado"
+
+        return 1 if self.reason else 0
+
+    def rejection(self) -> QueryRejected:
+
+        if self.reason == "passos_esgotados":
+            return QueryRejected(self.reason, f"Consulta abortada após {self.max_steps} passos da VM do SQLite.")
+
+        return QueryRejected(self.reason, f"Consulta abortada após {self.timeout_s:.1f}s de execução.")
+
+
+@contextmanager
+def guarded_query(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: tuple       = (),
+    timeout_s: float    = QUERY_TIMEOUT_S,
+    max_steps: int      = QUERY_MAX_VM_STEPS
+) -> Iterator[QueryBudget]:
+
+    # A conexão precisa ter passado por install_guard. O authorizer só nega durante a consulta e o
+    # progress handler é removido no fim: a conexão volta limpa ao pool.
+    _guard_state.active = True
+
+    try:
+        validate_statement(conn, sql, params)
+
+        budget = QueryBudget(timeout_s, max_steps)
+        conn.set_progress_handler(budget.check, PROGRESS_HANDLER_STEPS)
+
+        try:
+            yield budget
+        except sqlite3.OperationalError as e:
+            if budget.reason:
+                raise budget.rejection() from e
+            raise
+        finally:
+            conn.set_progress_handler(None, 0)
+
+    finally:
+        _guard_state.active = False
@@ -0,0 +1,188 @@
+import  os
+import  re
+import  time
+import  sqlite3
+from    typing                  import Any, Dict, List, Optional, Tuple
+from    pathlib                 import Path
+from    contextlib              import closing
+from    collections             import defaultdict
+from    dataclasses             import dataclass, field
+from    src.database.pool       import get_pool
+from    src.database.query_log  import QueryLog
+
+
+TABLE_NAME              = "automobiles"
+ADVISOR_MAX_INDEXES     = int(os.getenv("INDEX_ADVISOR_MAX_INDEXES", "5"))
+ADVISOR_SAMPLE_QUERIES  = 3
+ADVISOR_REPEAT          = 3
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_COLUMN         = r"(?:\w+\.)?\"?(\w+)\"?"
+_LOWER_FILTER   = re.compile(rf"LOWER\s*\(\s*{_COLUMN}\s*\)\s*(?:=|IN\b)", re.IGNORECASE)
+_PLAIN_FILTER   = re.compile(rf"(?<![\w.]){_COLUMN}\s*(?:=|IN\b|<=|>=|<|>|BETWEEN\b)", re.IGNORECASE)
+_WHERE          = re.compile(r"\bWHERE\b(.*?)(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\bHAVING\b|$)", re.IGNORECASE | re.DOTALL)
+_GROUP_BY       = re.compile(r"\bGROUP\s+BY\b(.*?)(?=\bHAVING\b|\bORDER\s+BY\b|\bLIMIT\b|$)", re.IGNORECASE | re.DOTALL)
+_ORDER_LIMIT    = re.compile(rf"\bORDER\s+BY\s+{_COLUMN}(?:\s+(?:ASC|DESC))?\s+LIMIT\b", re.IGNORECASE)
+_LOWER_TERM     = re.compile(rf"^LOWER\s*\(\s*{_COLUMN}\s*\)$", re.IGNORECASE)
+_PLAIN_TERM     = re.compile(rf"^{_COLUMN}$")
+
+
+@dataclass
+class IndexProposal:
+    column: str
+    lowered: bool
+    consultas: int                              = 0
+    tempo_total_ms: float                       = 0.0
+    exemplos: List[Tuple[str, tuple]]           = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return f"idx_{TABLE_NAME}_{'lower_' if self.lowered else ''}{self.column}"
+
+    @property
+    def ddl(self) -> str:
+        target = f"LOWER({self.column})" if self.lowered else self.column
+        return f"CREATE INDEX IF NOT EXISTS {self.name} ON {TABLE_NAME}({target})"
+
+
+def extract_candidates(sql: str, columns: set) -> set:
+
+    # Literais saem antes: "WHERE color = 'preto'" não pode virar candidato pela palavra do valor.
+    text        = _STRING_LITERAL.sub("?", sql)
+    candidates  = set()
+
+    for where in _WHERE.findall(text):
+        candidates.update((col, True) for col in _LOWER_FILTER.findall(where))
+        candidates.update((col, False) for col in _PLAIN_FILTER.findall(where))
+
+    for group in _GROUP_BY.findall(text):
+        for term in group.split(","):
+            term = term.strip()
+
+            if (match := _LOWER_TERM.match(term)):
+                candidates.add((match.group(1), True))
+            elif (match := _PLAIN_TERM.match(term)):
+                candidates.add((match.group(1), False))
+
+    # ORDER BY ... LIMIT (maior/menor X) vira busca no fim do índice em vez de ordenar a tabela.
+    candidates.update((col, False) for col in _ORDER_LIMIT.findall(text))
+
+    return {(col, lowered) for col, lowered in candidates if col in columns}
+
+
+def _table_columns(conn: sqlite3.Connection) -> set:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({TABLE_NAME})")}
+
+
+def _existing_indexes(conn: sqlite3.Connection) -> set:
+    return {row[1] for row in conn.execute(f"PRAGMA index_list({TABLE_NAME})")}
+
+
+def propose_indexes(query_log: QueryLog, db_path: Path, max_indexes: int = ADVISOR_MAX_INDEXES) -> List[IndexProposal]:
+
+    with get_pool(db_path).connection() as conn:
+        columns   = _table_columns(conn)
+        existing  = _existing_indexes(conn)
+
+    proposals: Dict[Tuple[str, bool], IndexProposal] = {}
+    samples: Dict[Tuple[str, bool], set]             = defaultdict(set)
+
+    # Só consultas que varreram a tabela inteira contam: as demais já usam algum índice.
+    for entry in query_log.entries():
+        if not entry["full_scan"]:
+            continue
+
+        for key in extract_candidates(entry["sql"], columns):
+            proposal                 = proposals.setdefault(key, IndexProposal(*key))
+            proposal.consultas      += 1
+            proposal.tempo_total_ms += entry["duration_ms"]
+
+            sample = (entry["sql"], entry["params"])
+
+            if sample not in samples[key] and len(samples[key]) < ADVISOR_SAMPLE_QUERIES:
+                samples[key].add(sample)
+                proposal.exemplos.append(sample)
+
+    ranked = sorted(
+        (p for p in proposals.values() if p.name not in existing),
+        key     =lambda p: (p.tempo_total_ms, p.consultas),
+        reverse =True
+    )
+
+    return ranked[:max_indexes]
+
+
+def _time_query(db_path: Path, sql: str, params: tuple, repeat: int = ADVISOR_REPEAT) -> float:
+
+    pool  = get_pool(db_path)
+    best  = float("inf")
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pool.fetch(sql, params)
+        best    = min(best, time.perf_counter() - started)
+
+    return best * 1000
+
+
+def apply_indexes(proposals: List[IndexProposal], db_path: Path) -> List[Dict[str, Any]]:
+
+    queries = list(dict.fromkeys(sample for p in proposals for sample in p.exemplos))
+    before  = {}
+
+    for sql, params in queries:
+        try:
+            before[(sql, params)] = _time_query(db_path, sql, params)
+        except sqlite3.Error:
+            continue
+
+    # O pool é somente leitura: a criação usa uma conexão de escrita própria. O "with conn" só faz
+    # commit; closing() fecha a conexão.
+    with closing(sqlite3.connect(db_path, timeout=30)) as conn, conn:
+        for proposal in proposals:
+            conn.execute(proposal.ddl)
+
+        conn.execute(f"ANALYZE {TABLE_NAME}")
+
+    # Statements EXPLAIN em cache não revalidam o schema: as conexões do pool são reabertas.
+    get_pool(db_path).reset()
+
+    report = []
+
+    for (sql, params), before_ms in before.items():
+        after_ms = _time_query(db_path, sql, params)
+
+        report.append({
+            "sql"        : sql,
+            "antes_ms"   : round(before_ms, 3),
+            "depois_ms"  : round(after_ms, 3),
+            "plano"      : get_pool(db_path).explain(sql, params),
+        })
+
+    return report
+
+
+def describe(proposal: IndexProposal) -> Dict[str, Any]:
+
+    return {
+        "indice"         : proposal.name,
+        "ddl"            : proposal.ddl,
+        "consultas"      : proposal.consultas,
+        "tempo_total_ms" : round(proposal.tempo_total_ms, 3),
+    }
+
+
+def advise(
+    query_log: QueryLog,
+    db_path: Path,
+    apply: bool                 = False,
+    max_indexes: Optional[int]  = None
+) -> Dict[str, Any]:
+
+    proposals = propose_indexes(query_log, db_path, max_indexes or ADVISOR_MAX_INDEXES)
+    result    = {"propostas": [describe(p) for p in proposals]}
+
+    if apply and proposals:
+        result["tempos"] = apply_indexes(proposals, db_path)
+
+    return result
@@ -0,0 +1,259 @@
+import  os
+import  queue
+import  sqlite3
+import  threading
+import  pandas                      as pd
+from    typing                      import Any, Dict, Iterator, List, Optional, Tuple
+from    pathlib                     import Path
+from    contextlib                  import contextmanager
+from    src.database.guard          import QUERY_TIMEOUT_S, QUERY_MAX_VM_STEPS, guarded_query, install_guard
+from    src.database.results        import (
+    QueryResult,
+    RESULT_MAX_ROWS,
+    RESULT_CHUNK_SIZE,
+    aggregate_sql,
+    local_aggregates
+)
+
+
+POOL_SIZE           = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+STATEMENT_CACHE     = int(os.getenv("SQLITE_STATEMENT_CACHE", "256"))
+MMAP_SIZE           = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+CACHE_SIZE_KIB      = int(os.getenv("SQLITE_CACHE_SIZE_KIB", str(64 * 1024)))
+
+READ_PRAGMAS = [
+    f"PRAGMA mmap_size = {MMAP_SIZE}",
+    f"PRAGMA cache_size = -{CACHE_SIZE_KIB}",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA query_only = ON",
+]
+
+
+_thread_state = threading.local()
+
+
+def pin_thread_connections():
+
+    # Inicializador dos workers do executor de SQL: a thread passa a ter a sua própria conexão
+    # por banco, aberta uma vez e mantida enquanto a thread viver.
+    _thread_state.pinned = True
+
+
+def _inode(db_path: Path) -> Optional[Tuple[int, int]]:
+
+    try:
+        st = os.stat(db_path)
+    except FileNotFoundError:
+        return None
+
+    return st.st_dev, st.st_ino
+
+
+class ReadOnlyPool:
+
+    def __init__(self, db_path: Path, size: int = POOL_SIZE):
+
+        self.db_path                                = Path(db_path)
+        self.size                                   = size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock                                  = threading.Lock()
+        self._slots                                 = threading.BoundedSemaphore(size)
+        self._generation                            = 0
+        self._identity: Optional[Tuple[int, int]]   = None
+        self._local                                 = threading.local()
+        self.opened                                 = 0
+
+    def _open(self) -> sqlite3.Connection:
+
+        conn = sqlite3.connect(
+            f"file:{self.db_path}?mode=ro",
+            uri                 =True,
+            check_same_thread   =False,
+            cached_statements   =STATEMENT_CACHE
+        )
+
+        for pragma in READ_PRAGMAS:
+            conn.execute(pragma)
+
+        install_guard(conn)
+
+        self.opened += 1
+
+        return conn
+
+    def _check_identity(self):
+
+        # popular_banco pode recriar o arquivo (novo inode): conexões antigas apontariam para o arquivo apagado.
+        identity = _inode(self.db_path)
+
+        if identity is None:
+            raise FileNotFoundError(f"Banco de dados não encontrado em '{self.db_path}'.")
+
+        with self._lock:
+            if identity == self._identity:
+                return
+
+            # O pool só lê: o modo WAL é definido por quem escreve o banco (popular_banco). Um arquivo
+            # em outro modo, ou numa mídia somente leitura, é lido como está.
+            self._drain()
+            self._identity = identity
+
+    def _drain(self):
+
+        self._generation += 1
+
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def reset(self):
+
+        with self._lock:
+            self._drain()
+            self._identity = None
+
+    def _thread_connection(self) -> sqlite3.Connection:
+
+        local = self._local
+
+        # Depois de um reset a conexão fixa da thread é trocada no próximo uso.
+        if getattr(local, "generation", None) != self._generation:
+            if getattr(local, "conn", None) is not None:
+                local.conn.close()
+
+            local.conn          = self._open()
+            local.generation    = self._generation
+
+        return local.conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+
+        self._check_identity()
+
+        # Workers do executor não disputam o pool: o número de workers já limita as conexões.
+        if getattr(_thread_state, "pinned", False):
+            yield self._thread_connection()
+            return
+
+        self._slots.acquire()
+
+        generation = self._generation
+
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+
+            try:
+                yield conn
+            finally:
+                if generation == self._generation:
+                    self._idle.put(conn)
+                else:
+                    conn.close()
+        finally:
+            self._slots.release()
+
+    def read_dataframe(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+
+        with self.connection() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def fetch_page(
+        self,
+        sql: str,
+        params: tuple       = (),
+        offset: int         = 0,
+        limit: int          = RESULT_CHUNK_SIZE,
+        timeout_s: float    = QUERY_TIMEOUT_S,
+        max_steps: int      = QUERY_MAX_VM_STEPS
+    ) -> List[tuple]:
+
+        # Uma página por chamada, com o mesmo guard do fetch: a conexão volta ao pool entre as páginas.
+        page_sql = f"SELECT * FROM ({sql.strip().rstrip(';')}) LIMIT ? OFFSET ?"
+        args     = tuple(params) + (limit, offset)
+
+        with self.connection() as conn, guarded_query(conn, page_sql, args, timeout_s, max_steps):
+            return conn.execute(page_sql, args).fetchall()
+
+    def fetch(
+        self,
+        sql: str,
+        params: tuple       = (),
+        max_rows: int       = RESULT_MAX_ROWS,
+        chunk_size: int     = RESULT_CHUNK_SIZE,
+        timeout_s: float    = QUERY_TIMEOUT_S,
+        max_steps: int      = QUERY_MAX_VM_STEPS
+    ) -> QueryResult:
+
+        rows: List[tuple] = []
+
+        # Validação, só leitura e orçamento de tempo/passos: uma consulta ruim vira erro, não trava o pool.
+        with self.connection() as conn, guarded_query(conn, sql, params, timeout_s, max_steps):
+            cursor    = conn.execute(sql, params)
+            columns   = [d[0] for d in cursor.description] if cursor.description else []
+
+            while len(rows) < max_rows:
+                chunk = cursor.fetchmany(min(chunk_size, max_rows - len(rows)))
+
+                if not chunk:
+                    break
+
+                rows.extend(chunk)
+
+            truncated = len(rows) >= max_rows and cursor.fetchone() is not None
+            cursor.close()
+
+            frame     = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+            if not truncated:
+                return QueryResult(sql, params, columns, frame, len(rows), False, local_aggregates(frame), self)
+
+            # Resultado cortado: total e agregados saem do próprio SQLite, sem trazer as linhas.
+            summary_sql, layout = aggregate_sql(sql, frame)
+
+            try:
+                values = conn.execute(summary_sql, params).fetchone()
+            except sqlite3.Error:
+                return QueryResult(sql, params, columns, frame, len(rows), True, local_aggregates(frame), self)
+
+        aggregates: Dict[str, Dict[str, Any]] = {}
+
+        for (column, name), value in zip(layout, values[1:]):
+            aggregates.setdefault(str(column), {})[name] = value
+
+        return QueryResult(sql, params, columns, frame, values[0], True, aggregates, self)
+
+    def explain(self, sql: str, params: tuple = ()) -> str:
+
+        with self.connection() as conn:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql.strip().rstrip(';')}", params).fetchall()
+
+        return "\n".join(row[-1] for row in rows)
+
+    def stats(self) -> Dict[str, int]:
+
+        return {
+            "tamanho"           : self.size,
+            "conexoes_ociosas"  : self._idle.qsize(),
+            "conexoes_abertas"  : self.opened,
+        }
+
+
+_pools: Dict[str, ReadOnlyPool] = {}
+_pools_lock                     = threading.Lock()
+
+
+def get_pool(db_path: Path) -> ReadOnlyPool:
+
+    key = str(Path(db_path).resolve())
+
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ReadOnlyPool(Path(db_path))
+
+        return _pools[key]
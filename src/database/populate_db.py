@@ -1,40 +1,163 @@
+import      os
+import      time
 import      sqlite3
 import      random
-from        pathlib import Path
-from        faker   import Faker
+import      argparse
+from        typing                      import Iterator, List, Optional
+from        pathlib                     import Path
+from        collections                 import deque
+from        concurrent.futures          import ProcessPoolExecutor
+from        faker                       import Faker
+from        src.database.pool           import get_pool
+from        src.database.index_advisor  import IndexProposal
+from        src.database.vocabulary     import (
+    brands,
+    models_by_brand,
+    colors,
+    categories,
+    fuel_types,
+    transmissions,
+    steering_types
+)
 
 DATA_DIR    = Path(__file__).resolve().parent.parent.parent / "data"
 DB_PATH     = DATA_DIR / "automobiles.db"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
- 
+
 fake        = Faker('pt_BR')
 
-brands = ['Toyota', 'Honda', 'Ford', 'Chevrolet', 'Volkswagen', 'Nissan', 'Hyundai', 'BMW', 'Mercedes-Benz', 'Audi', 'Fiat']
-models_by_brand = {
-    'Audi':          ['A4', 'A6', 'Q5', 'A3', 'Q3'],
-    'BMW':           ['Série 3', 'Série 5', 'X3', 'X1', 'X5'],
-    'Fiat':          ['Uno', 'Mobi', 'Argo', 'Cronos', 'Toro'],
-    'Ford':          ['Focus', 'Fusion', 'Explorer', 'Ranger', 'Ka'],
-    'Honda':         ['Civic', 'Accord', 'CR-V', 'HR-V', 'Fit'],
-    'Nissan':        ['Sentra', 'Altima', 'Rogue', 'Kicks', 'Versa'],
-    'Toyota':        ['Corolla', 'Camry', 'RAV4', 'Hilux', 'Yaris'],
-    'Hyundai':       ['Elantra', 'Sonata', 'Tucson', 'Creta', 'HB20'],
-    'Chevrolet':     ['Cruze', 'Malibu', 'Equinox', 'Onix', 'S10'],
-    'Volkswagen':    ['Golf', 'Jetta', 'Tiguan', 'Polo', 'Virtus'],
-    'Mercedes-Benz': ['Classe C', 'Classe E', 'GLC', 'Classe A', 'GLE'],
-}
-
-colors          = ['Preto', 'Branco', 'Prata', 'Cinza', 'Azul', 'Vermelho', 'Marrom', 'Verde', 'Amarelo', 'Laranja']
-categories      = ['Sedan', 'SUV', 'Hatchback', 'Picape', 'Cupê']
-fuel_types      = ['Gasolina', 'Etanol', 'Diesel', 'Híbrido', 'Elétrico']
-transmissions   = ['Automática', 'Manual']
-steering_types  = ['Hidráulica', 'Mecânica', 'Elétrica']
-
-def create_database():
-    conn    = sqlite3.connect(DB_PATH)
+DEFAULT_ROWS        = int(os.getenv("POPULATE_ROWS", "100"))
+DEFAULT_CHUNK_SIZE  = int(os.getenv("POPULATE_CHUNK_SIZE", "50000"))
+DEFAULT_WORKERS     = int(os.getenv("POPULATE_WORKERS", str(os.cpu_count() or 1)))
+
+# Índices criados depois da carga: construir a árvore uma vez é muito mais barato que mantê-la a cada INSERT.
+BULK_INDEXES = [
+    IndexProposal('brand',          lowered=True),
+    IndexProposal('model',          lowered=True),
+    IndexProposal('color',          lowered=True),
+    IndexProposal('category',       lowered=True),
+    IndexProposal('fuel_type',      lowered=True),
+    IndexProposal('engine_power',   lowered=False),
+    IndexProposal('mileage',        lowered=False),
+]
+
+BULK_LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA locking_mode = EXCLUSIVE",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",
+]
+
+INSERT_SQL = '''
+INSERT INTO automobiles (
+        brand,
+        model,
+        license_plate,
+        color, doors,
+        category,
+        seats,
+        steering,
+        air_conditioning,
+        power_windows,
+        fuel_type,
+        engine_power,
+        mileage,
+        transmission
+    )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def generate_chunk(size: int, seed: int) -> List[tuple]:
+
+    # Cada bloco tem sua própria semente: o resultado não depende de quantos processos geraram os dados.
+    rng = random.Random(seed)
+    fake.seed_instance(seed)
+
+    choice, uniform, randint = rng.choice, rng.uniform, rng.randint
+    rows                     = []
+
+    for _ in range(size):
+        brand = choice(brands)
+
+        rows.append((
+            brand,
+            choice(models_by_brand[brand]),
+            fake.license_plate(),
+            choice(colors),
+            choice((2, 4)),
+            choice(categories),
+            choice((2, 5, 7)),
+            choice(steering_types),
+            choice((0, 1)),
+            choice((0, 1)),
+            choice(fuel_types),
+            round(uniform(1.0, 4.0), 1),
+            randint(0, 200000),
+            choice(transmissions)
+        ))
+
+    return rows
+
+
+def iter_chunks(n_rows: int, seed: int, chunk_size: int, workers: int) -> Iterator[List[tuple]]:
+
+    sizes = [min(chunk_size, n_rows - start) for start in range(0, n_rows, chunk_size)]
+    seeds = [seed * 1_000_003 + index for index in range(len(sizes))]
+
+    if workers <= 1 or len(sizes) == 1:
+        for size, chunk_seed in zip(sizes, seeds):
+            yield generate_chunk(size, chunk_seed)
+        return
+
+    # Janela limitada de blocos em voo: a geração não se adianta à escrita e a memória fica constante.
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        jobs    = iter(zip(sizes, seeds))
+
+        def submit_next():
+            job = next(jobs, None)
+
+            if job is not None:
+                pending.append(executor.submit(generate_chunk, *job))
+
+        for _ in range(workers * 2):
+            submit_next()
+
+        while pending:
+            rows = pending.popleft().result()
+            submit_next()
+
+            yield rows
+
+
+def _remove_database_files(db_path: Path):
+
+    # Um -wal antigo seria reaplicado sobre o arquivo novo: banco, -wal e -shm saem juntos.
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+
+def create_database(
+    n_rows: int             = DEFAULT_ROWS,
+    seed: Optional[int]     = None,
+    chunk_size: int         = DEFAULT_CHUNK_SIZE,
+    workers: int            = DEFAULT_WORKERS,
+    build_indexes: bool     = True,
+    db_path: Path           = DB_PATH
+) -> dict:
+
+    seed = random.randrange(2**31) if seed is None else int(seed)
+
+    get_pool(db_path).reset()
+    _remove_database_files(db_path)
+
+    conn    = sqlite3.connect(db_path, isolation_level=None)
     cursor  = conn.cursor()
-    
-    cursor.execute('DROP TABLE IF EXISTS automobiles')
+
+    for pragma in BULK_LOAD_PRAGMAS:
+        cursor.execute(pragma)
 
     cursor.execute('''
     CREATE TABLE automobiles (
@@ -48,7 +171,7 @@ def create_database():
         seats INTEGER,
         steering TEXT,
         air_conditioning INTEGER,
-        power_windows INTEGER, 
+        power_windows INTEGER,
         fuel_type TEXT,
         engine_power REAL,
         mileage INTEGER,
@@ -56,51 +179,57 @@ def create_database():
     )
     ''')
 
-    for _ in range(100):
-        brand = random.choice(brands)
-        model = random.choice(models_by_brand[brand])
-        
-        car_data = (
-            brand,
-            model,
-            fake.license_plate(), 
-            random.choice(colors),
-            random.choice([2, 4]),
-            random.choice(categories),
-            random.choice([2, 5, 7]),
-            random.choice(steering_types),
-            random.choice([0, 1]), 
-            random.choice([0, 1]), 
-            random.choice(fuel_types),
-            round(random.uniform(1.0, 4.0), 1),
-            random.randint(0, 200000),
-            random.choice(transmissions)
-        )
-        
-        cursor.execute('''
-        INSERT INTO automobiles (
-                brand, 
-                model, 
-                license_plate, 
-                color, doors, 
-                category, 
-                seats, 
-                steering, 
-                air_conditioning, 
-                power_windows, 
-                fuel_type, 
-                engine_power, 
-                mileage, 
-                transmission
-            )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', 
-            car_data
-        )
-
-    conn.commit()
+    started  = time.perf_counter()
+    inserted = 0
+
+    for rows in iter_chunks(n_rows, seed, chunk_size, workers):
+        cursor.execute("BEGIN")
+        cursor.executemany(INSERT_SQL, rows)
+        cursor.execute("COMMIT")
+
+        inserted += len(rows)
+
+    load_elapsed = time.perf_counter() - started
+    started      = time.perf_counter()
+
+    if build_indexes:
+        for index in BULK_INDEXES:
+            cursor.execute(index.ddl)
+
+        cursor.execute("ANALYZE automobiles")
+
+    index_elapsed = time.perf_counter() - started
+
+    # De volta ao modo normal: o pool de leitura espera WAL.
+    cursor.execute("PRAGMA locking_mode = NORMAL")
+    cursor.execute("PRAGMA synchronous = NORMAL")
+    cursor.execute("PRAGMA journal_mode = WAL")
     conn.close()
 
+    report = {
+        "linhas"              : inserted,
+        "semente"             : seed,
+        "processos"           : workers,
+        "tempo_carga_s"       : round(load_elapsed, 3),
+        "tempo_indices_s"     : round(index_elapsed, 3),
+        "linhas_por_segundo"  : round(inserted / load_elapsed) if load_elapsed > 0 else inserted,
+    }
+
+    print(
+        f"   ✅ {inserted:,} linhas em {load_elapsed:.1f}s ({report['linhas_por_segundo']:,} linhas/s); "
+        f"índices em {index_elapsed:.1f}s."
+    )
+
+    return report
+
+
 if __name__ == '__main__':
-    create_database()
+    parser = argparse.ArgumentParser(description="Cria e popula o banco de automóveis.")
+    parser.add_argument("--linhas",    type=int, default=DEFAULT_ROWS)
+    parser.add_argument("--semente",   type=int, default=None)
+    parser.add_argument("--bloco",     type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--processos", type=int, default=DEFAULT_WORKERS)
+    args   = parser.parse_args()
+
+    create_database(args.linhas, args.semente, args.bloco, args.processos)
     print(f"Banco de dados 'automobiles.db' criado e populado em '{DB_PATH}'!")
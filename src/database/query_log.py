@@ -0,0 +1,154 @@
+import  os
+import  json
+import  time
+import  random
+import  sqlite3
+import  threading
+from    typing      import Any, Dict, List
+from    pathlib     import Path
+
+
+PROJECT_ROOT    = Path(__file__).resolve().parent.parent.parent
+QUERY_LOG_PATH  = PROJECT_ROOT / "data" / "query_log.db"
+
+QUERY_LOG_MAX_ROWS      = int(os.getenv("QUERY_LOG_MAX_ROWS", "50000"))
+QUERY_LOG_SAMPLE_RATE   = float(os.getenv("QUERY_LOG_SAMPLE_RATE", "0.2"))
+QUERY_LOG_SLOW_MS       = float(os.getenv("QUERY_LOG_SLOW_MS", "50"))
+QUERY_LOG_BATCH_SIZE    = int(os.getenv("QUERY_LOG_BATCH_SIZE", "32"))
+
+
+def is_full_scan(plan: str) -> bool:
+
+    # "SCAN automobiles" sem índice; "SCAN automobiles USING COVERING INDEX" já é servido por índice.
+    return any(
+        line.strip().startswith("SCAN") and "INDEX" not in line
+        for line in plan.splitlines()
+    )
+
+
+class QueryLog:
+
+    def __init__(
+        self,
+        path: Path          = QUERY_LOG_PATH,
+        max_rows: int       = QUERY_LOG_MAX_ROWS,
+        sample_rate: float  = QUERY_LOG_SAMPLE_RATE,
+        slow_ms: float      = QUERY_LOG_SLOW_MS,
+        batch_size: int     = QUERY_LOG_BATCH_SIZE
+    ):
+
+        self.path               = Path(path)
+        self.max_rows           = max_rows
+        self.sample_rate        = sample_rate
+        self.slow_ms            = slow_ms
+        self.batch_size         = max(1, batch_size)
+        self._lock              = threading.Lock()
+        self._pending: List[tuple] = []
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS query_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            executed_at REAL NOT NULL,
+            sql TEXT NOT NULL,
+            params TEXT NOT NULL,
+            source TEXT,
+            duration_ms REAL NOT NULL,
+            row_count INTEGER,
+            plan TEXT NOT NULL,
+            full_scan INTEGER NOT NULL
+        )
+        ''')
+        self._conn.commit()
+
+    def sampled(self, duration_s: float) -> bool:
+
+        # Consultas lentas entram sempre; as rápidas por amostragem. Quem chama só paga o EXPLAIN
+        # (plan de record) quando a consulta vai para o log.
+        return duration_s * 1000 >= self.slow_ms or random.random() < self.sample_rate
+
+    def record(self, sql: str, params: tuple, duration_s: float, row_count: int, plan: str, source: str = ""):
+
+        row = (time.time(), sql, json.dumps(list(params), default=str), source,
+               duration_s * 1000, row_count, plan, int(is_full_scan(plan)))
+
+        # As linhas se acumulam em memória e vão ao disco em lote: um commit a cada batch_size consultas.
+        with self._lock:
+            self._pending.append(row)
+
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def _flush(self):
+
+        if not self._pending:
+            return
+
+        rows, self._pending = self._pending, []
+
+        self._conn.executemany('''
+            INSERT INTO query_log (
+                    executed_at,
+                    sql,
+                    params,
+                    source,
+                    duration_ms,
+                    row_count,
+                    plan,
+                    full_scan
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''',
+            rows
+        )
+
+        # Retenção: só as max_rows consultas mais recentes ficam (os ids crescem com a inserção).
+        if self.max_rows > 0:
+            self._conn.execute(
+                "DELETE FROM query_log WHERE id <= (SELECT MAX(id) FROM query_log) - ?", (self.max_rows,)
+            )
+
+        self._conn.commit()
+
+    def flush(self):
+
+        with self._lock:
+            self._flush()
+
+    def entries(self, limit: int = 10000) -> List[Dict[str, Any]]:
+
+        with self._lock:
+            self._flush()
+
+            cursor = self._conn.execute(
+                "SELECT sql, params, source, duration_ms, row_count, plan, full_scan "
+                "FROM query_log ORDER BY id DESC LIMIT ?", (limit,)
+            )
+            columns = [d[0] for d in cursor.description]
+            rows    = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        for row in rows:
+            row["params"] = tuple(json.loads(row["params"]))
+
+        return rows
+
+    def stats(self) -> Dict[str, int]:
+
+        with self._lock:
+            self._flush()
+
+            total, scans = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(full_scan), 0) FROM query_log"
+            ).fetchone()
+
+        return {"consultas": total, "full_scans": scans}
+
+    def close(self):
+
+        with self._lock:
+            self._flush()
+            self._conn.close()
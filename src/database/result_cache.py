@@ -0,0 +1,205 @@
+import  os
+import  re
+import  sys
+import  threading
+import  numpy                       as np
+import  pandas                      as pd
+from    typing                      import Any, Dict, List, Optional, Tuple
+from    pathlib                     import Path
+from    collections                 import OrderedDict
+from    dataclasses                 import dataclass
+from    src.database.results        import QueryResult
+from    src.database.schema_catalog import file_identity
+
+
+RESULT_CACHE_MAX_BYTES          = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESULT_CACHE_MAX_ENTRY_BYTES    = int(os.getenv("RESULT_CACHE_MAX_ENTRY_BYTES", str(8 * 1024 * 1024)))
+
+# Trechos entre aspas simples ou duplas preservam maiúsculas e espaços; o resto do SQL é normalizado.
+# O SQLite aceita "Ford" como literal quando não existe coluna com esse nome.
+_QUOTED             = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+_WHITESPACE         = re.compile(r"\s+")
+_PUNCTUATION_SPACE  = re.compile(r"\s*([(),=<>])\s*")
+
+CacheKey = Tuple[str, str, Any]
+
+
+@dataclass
+class _Entry:
+    sql: str
+    params: tuple
+    columns: List[str]
+    arrays: List[Tuple[np.ndarray, Optional[np.ndarray]]]
+    row_count: int
+    truncated: bool
+    aggregates: Dict[str, Dict[str, Any]]
+    pool: Any
+    nbytes: int
+
+
+def canonical_sql(sql: str) -> str:
+
+    parts = _QUOTED.split(sql.strip().rstrip(";").strip())
+
+    for i in range(0, len(parts), 2):
+        text     = _WHITESPACE.sub(" ", parts[i].lower())
+        parts[i] = _PUNCTUATION_SPACE.sub(r"\1", text)
+
+    return "".join(parts).strip()
+
+
+def _encode_column(series: pd.Series) -> Tuple[np.ndarray, Optional[np.ndarray], int]:
+
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        values = series.to_numpy(copy=True)
+        return values, None, values.nbytes
+
+    # Texto vira códigos inteiros + valores distintos: marcas e cores repetidas ocupam um int16.
+    codes, uniques  = pd.factorize(series, use_na_sentinel=True)
+    uniques         = np.asarray(uniques, dtype=object)
+    codes           = codes.astype(np.int16 if len(uniques) < np.iinfo(np.int16).max else np.int32)
+    nbytes          = codes.nbytes + uniques.nbytes + sum(sys.getsizeof(value) for value in uniques)
+
+    return codes, uniques, nbytes
+
+
+def _decode_column(values: np.ndarray, uniques: Optional[np.ndarray]) -> np.ndarray:
+
+    if uniques is None:
+        return values.copy()
+
+    decoded             = np.full(len(values), None, dtype=object)
+    present             = values >= 0
+    decoded[present]    = uniques[values[present]]
+
+    return decoded
+
+
+class ResultCache:
+
+    def __init__(
+        self,
+        db_path: Path,
+        max_bytes: int          = RESULT_CACHE_MAX_BYTES,
+        max_entry_bytes: int    = RESULT_CACHE_MAX_ENTRY_BYTES
+    ):
+
+        self.db_path                                = Path(db_path)
+        self.max_bytes                              = max_bytes
+        self.max_entry_bytes                        = min(max_entry_bytes, max_bytes)
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._lock                                  = threading.Lock()
+        self._identity                              = None
+        self.bytes                                  = 0
+        self.hits                                   = 0
+        self.misses                                 = 0
+        self.evictions                              = 0
+        self.invalidations                          = 0
+        self.rejected                               = 0
+
+    def _clear(self):
+
+        if self._entries:
+            self.invalidations += 1
+
+        self._entries.clear()
+        self.bytes = 0
+
+    def clear(self):
+
+        with self._lock:
+            self._clear()
+            self._identity = None
+
+    def key(self, sql: str, params: tuple = ()) -> CacheKey:
+        return canonical_sql(sql), repr(tuple(params)), file_identity(self.db_path)
+
+    def get(self, key: CacheKey) -> Optional[QueryResult]:
+
+        identity = key[2]
+
+        with self._lock:
+            # Arquivo do banco mudou (popular_banco, criar_indices, escrita externa): tudo o que havia é velho.
+            if identity != self._identity:
+                self._clear()
+                self._identity = identity
+
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        frame           = pd.DataFrame({i: _decode_column(values, uniques) for i, (values, uniques) in enumerate(entry.arrays)})
+        frame.columns   = entry.columns
+
+        return QueryResult(entry.sql, entry.params, entry.columns, frame, entry.row_count, entry.truncated, entry.aggregates, entry.pool)
+
+    def put(self, key: CacheKey, result: QueryResult) -> bool:
+
+        # A chave leva a identidade lida antes da execução: se o banco mudou no meio, o resultado não entra.
+        if key[2] is None or file_identity(self.db_path) != key[2]:
+            return False
+
+        arrays, nbytes = [], 0
+
+        for position in range(result.frame.shape[1]):
+            values, uniques, size = _encode_column(result.frame.iloc[:, position])
+            arrays.append((values, uniques))
+            nbytes += size
+
+        entry = _Entry(result.sql, result.params, list(result.columns), arrays, result.row_count, result.truncated, result.aggregates, result.pool, nbytes)
+
+        with self._lock:
+            if key[2] != self._identity:
+                return False
+
+            if nbytes > self.max_entry_bytes:
+                self.rejected += 1
+                return False
+
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key).nbytes
+
+            # LRU por bytes: sai o menos usado até a entrada nova caber no orçamento.
+            while self._entries and self.bytes + nbytes > self.max_bytes:
+                _, evicted          = self._entries.popitem(last=False)
+                self.bytes         -= evicted.nbytes
+                self.evictions     += 1
+
+            self._entries[key] = entry
+            self.bytes        += nbytes
+
+        return True
+
+    def stats(self) -> Dict[str, int]:
+
+        with self._lock:
+            return {
+                "hits"          : self.hits,
+                "misses"        : self.misses,
+                "entradas"      : len(self._entries),
+                "bytes"         : self.bytes,
+                "max_bytes"     : self.max_bytes,
+                "despejos"      : self.evictions,
+                "invalidacoes"  : self.invalidations,
+                "recusadas"     : self.rejected,
+            }
+
+
+_caches: Dict[str, ResultCache] = {}
+_caches_lock                    = threading.Lock()
+
+
+def get_result_cache(db_path: Path) -> ResultCache:
+
+    key = str(Path(db_path).resolve())
+
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = ResultCache(Path(db_path))
+
+        return _caches[key]
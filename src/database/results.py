@@ -0,0 +1,141 @@
+import  os
+import  pandas      as pd
+from    typing      import Any, Dict, Iterator, List, Optional
+from    dataclasses import dataclass, field
+
+
+RESULT_MAX_ROWS                 = int(os.getenv("RESULT_MAX_ROWS", "1000"))
+RESULT_CHUNK_SIZE               = int(os.getenv("RESULT_CHUNK_SIZE", "256"))
+ANSWER_PROMPT_TOKEN_BUDGET      = int(os.getenv("ANSWER_PROMPT_TOKEN_BUDGET", "1200"))
+CHARS_PER_TOKEN                 = 4
+AGGREGATE_MAX_DISTINCT_RATIO    = float(os.getenv("AGGREGATE_MAX_DISTINCT_RATIO", "0.5"))
+
+
+@dataclass
+class QueryResult:
+    sql: str
+    params: tuple
+    columns: List[str]
+    frame: pd.DataFrame
+    row_count: int
+    truncated: bool
+    aggregates: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    pool: Optional[Any]                   = field(default=None, repr=False)
+
+    def pages(self, page_size: int = RESULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+
+        # As páginas que cabem nas linhas já lidas saem da memória; o resto é buscado página a página
+        # (LIMIT/OFFSET, com guard), sem segurar uma conexão do pool enquanto o gerador vive.
+        start = 0
+
+        while start + page_size <= len(self.frame):
+            yield self.frame.iloc[start:start + page_size]
+            start += page_size
+
+        if not self.truncated or self.pool is None:
+            if start < len(self.frame):
+                yield self.frame.iloc[start:]
+            return
+
+        while True:
+            rows = self.pool.fetch_page(self.sql, self.params, start, page_size)
+
+            if rows:
+                yield pd.DataFrame.from_records(rows, columns=self.columns)
+
+            if len(rows) < page_size:
+                return
+
+            start += page_size
+
+    def __repr__(self) -> str:
+        return f"<QueryResult {len(self.frame)}/{self.row_count} linhas{' (truncado)' if self.truncated else ''}>"
+
+
+def _low_cardinality(series: pd.Series) -> bool:
+
+    # Placas e outros identificadores (quase um valor por linha) não dizem nada contados: só categorias.
+    return series.nunique() <= AGGREGATE_MAX_DISTINCT_RATIO * len(series)
+
+
+def aggregate_sql(sql: str, frame: pd.DataFrame) -> tuple[str, List[tuple[str, str]]]:
+
+    inner       = sql.strip().rstrip(";")
+    selects     = ["COUNT(*)"]
+    layout      = []
+
+    for position, column in enumerate(frame.columns):
+        quoted = '"' + str(column).replace('"', '""') + '"'
+
+        # Colunas duplicadas (ex.: SELECT * com JOIN) não podem ser referenciadas pelo nome.
+        if list(frame.columns).count(column) > 1:
+            continue
+
+        if pd.api.types.is_numeric_dtype(frame.iloc[:, position]):
+            selects += [f"MIN({quoted})", f"MAX({quoted})", f"AVG({quoted})"]
+            layout  += [(column, "min"), (column, "max"), (column, "media")]
+        elif _low_cardinality(frame.iloc[:, position]):
+            selects.append(f"COUNT(DISTINCT {quoted})")
+            layout.append((column, "distintos"))
+
+    return f"SELECT {', '.join(selects)} FROM ({inner})", layout
+
+
+def local_aggregates(frame: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+
+    aggregates: Dict[str, Dict[str, Any]] = {}
+
+    for position, column in enumerate(frame.columns):
+        series = frame.iloc[:, position]
+
+        if pd.api.types.is_numeric_dtype(series):
+            aggregates[str(column)] = {"min": series.min(), "max": series.max(), "media": series.mean()}
+        elif _low_cardinality(series):
+            aggregates[str(column)] = {"distintos": series.nunique()}
+
+    return aggregates
+
+
+def _format_value(value: Any) -> str:
+
+    if isinstance(value, float):
+        return f"{value:.2f}"
+
+    return str(value)
+
+
+def summarize_for_prompt(result: QueryResult, token_budget: int = ANSWER_PROMPT_TOKEN_BUDGET) -> str:
+
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    lines        = [f"Total de linhas: {result.row_count}"]
+
+    if result.aggregates and result.row_count > 1:
+        parts = [
+            f"{column} (" + ", ".join(f"{name}={_format_value(value)}" for name, value in stats.items()) + ")"
+            for column, stats in result.aggregates.items()
+        ]
+        lines.append("Agregados por coluna: " + "; ".join(parts))
+
+    header    = ",".join(str(c) for c in result.columns)
+    used      = sum(len(line) + 1 for line in lines) + len(header) + 1
+    rows      = []
+
+    # Linhas iniciais entram até estourar o orçamento de tokens do prompt.
+    for record in result.frame.itertuples(index=False):
+        line = ",".join(_format_value(v) for v in record)
+
+        if used + len(line) + 1 > budget_chars:
+            break
+
+        rows.append(line)
+        used += len(line) + 1
+
+    if rows:
+        lines.append(f"Primeiras {len(rows)} linhas:")
+        lines.append(header)
+        lines.extend(rows)
+
+    if len(rows) < result.row_count:
+        lines.append(f"(... {result.row_count - len(rows)} linhas omitidas)")
+
+    return "\n".join(lines)
@@ -0,0 +1,102 @@
+import  os
+import  hashlib
+import  threading
+from    typing      import Callable, Dict, Optional, Tuple
+from    pathlib     import Path
+from    dataclasses import dataclass
+
+
+FileIdentity = Tuple[int, ...]
+
+
+def file_identity(db_path: Path) -> Optional[FileIdentity]:
+
+    # Inode + tamanho + mtime do arquivo principal e do WAL: qualquer escrita
+    # (inclusive o DROP/CREATE do popular_banco) altera ao menos um deles.
+    try:
+        st = os.stat(db_path)
+    except FileNotFoundError:
+        return None
+
+    identity = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+    try:
+        wal       = os.stat(f"{db_path}-wal")
+        identity += (wal.st_size, wal.st_mtime_ns)
+    except FileNotFoundError:
+        pass
+
+    return identity
+
+
+@dataclass
+class CatalogEntry:
+    identity: FileIdentity
+    context: str
+    fingerprint: str
+
+
+class SchemaCatalog:
+
+    def __init__(self, loader: Callable[[Path], str]):
+
+        self._loader                              = loader
+        self._entries: Dict[str, CatalogEntry]    = {}
+        self._lock                                = threading.Lock()
+        self.hits                                 = 0
+        self.misses                               = 0
+        self.invalidations                        = 0
+
+    def get(self, db_path: Path) -> str:
+        return self.get_entry(db_path).context
+
+    def fingerprint(self, db_path: Path) -> str:
+        return self.get_entry(db_path).fingerprint
+
+    def get_entry(self, db_path: Path) -> CatalogEntry:
+
+        key      = str(db_path)
+        identity = file_identity(db_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and identity is not None and entry.identity == identity:
+                self.hits += 1
+                return entry
+
+            self.misses += 1
+
+        context = self._loader(db_path)
+        entry   = CatalogEntry(
+            identity    =identity,
+            context     =context,
+            fingerprint =hashlib.sha256(context.encode("utf-8")).hexdigest()[:16]
+        )
+
+        # Erros (banco ausente, tabela inexistente) não são memorizados.
+        if identity is not None and "ERRO" not in context:
+            with self._lock:
+                self._entries[key] = entry
+
+        return entry
+
+    def invalidate(self, db_path: Optional[Path] = None):
+
+        with self._lock:
+            if db_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(db_path), None)
+
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+
+        with self._lock:
+            return {
+                "hits"          : self.hits,
+                "misses"        : self.misses,
+                "invalidations" : self.invalidations,
+                "entradas"      : len(self._entries),
+            }
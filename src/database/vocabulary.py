@@ -0,0 +1,20 @@
+brands = ['Toyota', 'Honda', 'Ford', 'Chevrolet', 'Volkswagen', 'Nissan', 'Hyundai', 'BMW', 'Mercedes-Benz', 'Audi', 'Fiat']
+models_by_brand = {
+    'Audi':          ['A4', 'A6', 'Q5', 'A3', 'Q3'],
+    'BMW':           ['Série 3', 'Série 5', 'X3', 'X1', 'X5'],
+    'Fiat':          ['Uno', 'Mobi', 'Argo', 'Cronos', 'Toro'],
+    'Ford':          ['Focus', 'Fusion', 'Explorer', 'Ranger', 'Ka'],
+    'Honda':         ['Civic', 'Accord', 'CR-V', 'HR-V', 'Fit'],
+    'Nissan':        ['Sentra', 'Altima', 'Rogue', 'Kicks', 'Versa'],
+    'Toyota':        ['Corolla', 'Camry', 'RAV4', 'Hilux', 'Yaris'],
+    'Hyundai':       ['Elantra', 'Sonata', 'Tucson', 'Creta', 'HB20'],
+    'Chevrolet':     ['Cruze', 'Malibu', 'Equinox', 'Onix', 'S10'],
+    'Volkswagen':    ['Golf', 'Jetta', 'Tiguan', 'Polo', 'Virtus'],
+    'Mercedes-Benz': ['Classe C', 'Classe E', 'GLC', 'Classe A', 'GLE'],
+}
+
+colors          = ['Preto', 'Branco', 'Prata', 'Cinza', 'Azul', 'Vermelho', 'Marrom', 'Verde', 'Amarelo', 'Laranja']
+categories      = ['Sedan', 'SUV', 'Hatchback', 'Picape', 'Cupê']
+fuel_types      = ['Gasolina', 'Etanol', 'Diesel', 'Híbrido', 'Elétrico']
+transmissions   = ['Automática', 'Manual']
+steering_types  = ['Hidráulica', 'Mecânica', 'Elétrica']
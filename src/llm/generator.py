@@ -1,26 +1,43 @@
+from __future__ import annotations
+
 import os
+import asyncio
+import threading
 import pandas as pd
-import sqlite3
-from openai import OpenAI
+from typing import AsyncIterator, TYPE_CHECKING
 from pathlib import Path
 from dotenv import load_dotenv
+from src.database.pool import get_pool
+from src.database.executor import get_sql_executor
+from src.database.schema_catalog import SchemaCatalog
+from src.core.tracing import span, annotate, record_tokens
+from src.llm.prompts import build_sql_prompt
+
+if TYPE_CHECKING:
+    from openai import OpenAI, AsyncOpenAI
 
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"),
-    base_url=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
-)
+# O SDK da OpenAI (e o httpx) levam quase um segundo para importar: os clientes nascem no primeiro uso.
+_client: OpenAI | None      = None
+_client_lock                = threading.Lock()
+_async_client: tuple | None = None
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 DB_PATH      = PROJECT_ROOT / "data" / "automobiles.db"
 
-def get_db_schema_and_values(db_path: Path) -> str:
+# Modelos e outras colunas longas não entram no schema: os valores citados chegam resolvidos pelo índice de valores.
+SCHEMA_SAMPLE_VALUES = 12
+
+def _read_db_schema_and_values(db_path: Path) -> str:
  
+    annotate(cache="miss")
+    
     if not db_path.exists():
         return "ERRO: Arquivo do banco de dados não encontrado."
     
     try:
-        with sqlite3.connect(db_path) as conn:
+        with get_pool(db_path).connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute("PRAGMA table_info(automobiles);")
@@ -28,86 +45,104 @@ def get_db_schema_and_values(db_path: Path) -> str:
             if not columns:
                 return "ERRO: Nenhuma tabela 'automobiles' encontrada no banco."
 
-            schema_str     = "Tabela 'automobiles' com as seguintes colunas:\n"
-            column_names   = []
-            for col in columns:
-                schema_str += f"- {col[1]} (tipo: {col[2]})\n"
-                column_names.append(col[1])
+            # Codificação compacta: uma linha por tabela e uma por coluna amostrada.
+            column_names   = [col[1] for col in columns]
+            schema_str     = "automobiles(" + ", ".join(
+                f"{col[1]} {col[2]}" + (" PK" if col[5] else "") for col in columns
+            ) + ")"
 
-            value_examples_str  = "\n### Exemplos de Valores em Colunas Importantes:\n"
-            cols_to_sample      = ['body-style', 'transmission', 'fuel-type', 'drive-wheels', 'color']
+            value_examples_str  = ""
+            cols_to_sample      = ['brand', 'category', 'fuel_type', 'transmission', 'steering', 'color']
             
             for col_name in cols_to_sample:
                 if col_name in column_names:
-                    cursor.execute(f'SELECT DISTINCT "{col_name}" FROM automobiles LIMIT 10')
-                    values              = [row[0] for row in cursor.fetchall()]
-                    value_examples_str += f"- Valores possíveis para a coluna \"{col_name}\": {values}\n"
+                    cursor.execute(f'SELECT DISTINCT "{col_name}" FROM automobiles LIMIT {SCHEMA_SAMPLE_VALUES}')
+                    values              = [str(row[0]) for row in cursor.fetchall()]
+                    value_examples_str += f"\n{col_name}: {'|'.join(values)}"
 
-            return schema_str + value_examples_str
+            return schema_str + ("\n\nValores:" + value_examples_str if value_examples_str else "")
             
     except Exception as e:
         return f"ERRO ao ler o schema do banco de dados: {e}"
 
 
-def generate_sql_query(question: str, intent: str) -> str:
-   
-    db_context = get_db_schema_and_values(DB_PATH)
+schema_catalog = SchemaCatalog(_read_db_schema_and_values)
+
+def get_db_schema_and_values(db_path: Path) -> str:
+    return schema_catalog.get(db_path)
+
+
+def get_client() -> OpenAI:
+
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            from openai import OpenAI
+
+            _client = OpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                base_url=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+            )
+
+    return _client
+
+
+def get_async_client() -> AsyncOpenAI:
+
+    global _async_client
+
+    # O pool HTTP fica preso ao event loop que o criou; um loop novo recebe um cliente novo.
+    loop = asyncio.get_running_loop()
+
+    if _async_client is None or _async_client[0] is not loop:
+        from httpx  import Limits, Timeout
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        http_client = DefaultAsyncHttpxClient(
+            limits  = Limits(
+                max_connections           = int(os.getenv("OPENAI_MAX_CONNECTIONS", "32")),
+                max_keepalive_connections = int(os.getenv("OPENAI_MAX_KEEPALIVE", "16")),
+                keepalive_expiry          = 30
+            ),
+            timeout = Timeout(float(os.getenv("OPENAI_TIMEOUT", "60")), connect=5.0)
+        )
+        # O SDK também aplica o timeout por requisição e espera um número, não o Timeout do httpx.
+        _async_client = (loop, AsyncOpenAI(
+            api_key     =os.getenv("OPENAI_API_KEY"),
+            base_url    =os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+            timeout     =float(os.getenv("OPENAI_TIMEOUT", "60")),
+            http_client =http_client
+        ))
+
+    return _async_client[1]
+
+
+def _build_sql_messages(question: str, intent: str, db_context: str, resolved_values: str = "") -> list[dict]:
     
-    if "ERRO" in db_context:
-        return f"SELECT '{db_context}';"
+    prompt = build_sql_prompt(question, intent, db_context, resolved_values=resolved_values)
     
-    prompt = f"""
-        Você é um gerador de código SQL para SQLite. Sua única função é traduzir a pergunta de um usuário em uma única e válida consulta SQL, usando o conhecimento e as regras fornecidas.
-
-        ### Conhecimento do Banco de Dados
-        {db_context}
-
-        ---
-        ### Exemplo de Tarefa Perfeita
-        - **Pergunta do Usuário:** "quais carros são da audi?"
-        - **Intenção Principal (do MLP):** "LIST_ALL"
-        - **SQL Gerado:** SELECT * FROM automobiles WHERE LOWER(make) = 'audi';
-        ---
-
-        ### Sua Tarefa Atual
-        - **Pergunta do Usuário:** "{question}"
-        - **Intenção Principal (do MLP):** "{intent}"
-
-        ### Regras Obrigatórias
-        1.  **Regra de Ouro: O resultado DEVE ser uma string de texto SQL, e NADA MAIS.** Não use JSON, Markdown, ou qualquer outro formato.
-        2.  **Use a Intenção do MLP:** A "Intenção Principal" DEVE definir a operação principal da sua consulta. Se for 'COUNT', use `COUNT(*)`. Se for 'AVG_PRICE', use `AVG(price)`. Se for 'LIST_ALL', use `SELECT *`.
-        3.  **Foco na Pergunta:** A cláusula `WHERE` deve ser construída para filtrar com base nos detalhes da "Pergunta do Usuário" atual.
-        4.  **Sintaxe Correta:** A consulta deve ser sintaticamente perfeita para SQLite.
-        5.  **Ignorar Maiúsculas/Minúsculas:** Sempre use `LOWER()` em colunas de texto para comparações na cláusula `WHERE`.
-        
-        ### SQL Gerado:
-    """
+    annotate(tokens_prompt_estimados=prompt.tokens, tokens_prefixo=prompt.prefix_tokens)
     
-    try:
-        response = client.chat.completions.create(
-            model=os.getenv("OPENAI_API_MODEL", "gpt-4o"), 
-            messages=[
-                {"role": "system", "content": "Você é um especialista em gerar consultas SQLite. Responda APENAS com a string SQL crua."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature = 0,
-            max_tokens  = 300
-        )
-        
-        sql_query = response.choices[0].message.content.strip()
-        
-        if sql_query.startswith("```sql"):
-            sql_query = sql_query[6:-3].strip()
-        if sql_query.startswith("`"):
-            sql_query = sql_query[1:-1].strip()
-            
-        return sql_query
+    if prompt.omitted:
+        annotate(secoes_omitidas=",".join(prompt.omitted))
     
-    except Exception as e:
-        return f"SELECT 'ERRO ao chamar a API da OpenAI: {e}';"
+    return prompt.messages
 
 
-def generate_natural_language_response(question: str, db_result: pd.DataFrame | str) -> str:
+def _clean_sql_output(content: str) -> str:
+    
+    sql_query = content.strip()
+    
+    if sql_query.startswith("```sql"):
+        sql_query = sql_query[6:-3].strip()
+    if sql_query.startswith("`"):
+        sql_query = sql_query[1:-1].strip()
+        
+    return sql_query
+
+
+def _build_answer_messages(question: str, db_result: pd.DataFrame | str) -> list[dict]:
     
     prompt = f"""
         Sua tarefa é responder à pergunta original de um usuário de forma amigável e direta, com base nos dados que foram retornados de uma consulta ao banco de dados.
@@ -125,17 +160,124 @@ def generate_natural_language_response(question: str, db_result: pd.DataFrame |
 
         ### Resposta:
     """
+    
+    return [
+        {"role": "system", "content": "Você é um assistente prestativo que explica resultados de banco de dados."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def generate_sql_query(question: str, intent: str, resolved_values: str = "") -> str:
+   
+    with span("schema", cache="hit"):
+        db_context = get_db_schema_and_values(DB_PATH)
+    
+    if "ERRO" in db_context:
+        return f"SELECT '{db_context}';"
+    
     try:
-        response = client.chat.completions.create(
+        messages = _build_sql_messages(question, intent, db_context, resolved_values)
+    except ValueError as e:
+        return f"SELECT 'ERRO: {e}';"
+    
+    try:
+        response = get_client().chat.completions.create(
             model=os.getenv("OPENAI_API_MODEL", "gpt-4o"), 
-            messages=[
-                {"role": "system", "content": "Você é um assistente prestativo que explica resultados de banco de dados."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=messages,
+            temperature = 0,
+            max_tokens  = 300
+        )
+        
+        record_tokens(response.usage)
+        
+        return _clean_sql_output(response.choices[0].message.content)
+    
+    except Exception as e:
+        return f"SELECT 'ERRO ao chamar a API da OpenAI: {e}';"
+
+
+async def generate_sql_query_async(question: str, intent: str, resolved_values: str = "") -> str:
+   
+    # O loader do catálogo só roda em cache miss e sobrescreve o atributo.
+    with span("schema", cache="hit"):
+        db_context = await get_sql_executor().run(get_db_schema_and_values, DB_PATH)
+    
+    if "ERRO" in db_context:
+        return f"SELECT '{db_context}';"
+    
+    try:
+        messages = _build_sql_messages(question, intent, db_context, resolved_values)
+    except ValueError as e:
+        return f"SELECT 'ERRO: {e}';"
+    
+    try:
+        response = await get_async_client().chat.completions.create(
+            model=os.getenv("OPENAI_API_MODEL", "gpt-4o"), 
+            messages=messages,
+            temperature = 0,
+            max_tokens  = 300
+        )
+        
+        record_tokens(response.usage)
+        
+        return _clean_sql_output(response.choices[0].message.content)
+    
+    except Exception as e:
+        return f"SELECT 'ERRO ao chamar a API da OpenAI: {e}';"
+
+
+def generate_natural_language_response(question: str, db_result: pd.DataFrame | str) -> str:
+    
+    try:
+        response = get_client().chat.completions.create(
+            model=os.getenv("OPENAI_API_MODEL", "gpt-4o"), 
+            messages=_build_answer_messages(question, db_result),
+            temperature = 0.7,
+            max_tokens  = 200
+        )
+        record_tokens(response.usage)
+        
+        return response.choices[0].message.content.strip()
+    
+    except Exception as e:
+        return f"Ocorreu um erro ao gerar a resposta final: {e}"
+
+
+async def generate_natural_language_response_async(question: str, db_result: pd.DataFrame | str) -> str:
+    
+    try:
+        response = await get_async_client().chat.completions.create(
+            model=os.getenv("OPENAI_API_MODEL", "gpt-4o"), 
+            messages=_build_answer_messages(question, db_result),
             temperature = 0.7,
             max_tokens  = 200
         )
+        record_tokens(response.usage)
+        
         return response.choices[0].message.content.strip()
     
     except Exception as e:
         return f"Ocorreu um erro ao gerar a resposta final: {e}"
+
+
+async def stream_natural_language_response_async(question: str, db_result: pd.DataFrame | str) -> AsyncIterator[str]:
+    
+    try:
+        stream = await get_async_client().chat.completions.create(
+            model=os.getenv("OPENAI_API_MODEL", "gpt-4o"), 
+            messages=_build_answer_messages(question, db_result),
+            temperature     = 0.7,
+            max_tokens      = 200,
+            stream          = True,
+            stream_options  = {"include_usage": True}
+        )
+        
+        # Com include_usage o último chunk vem sem choices e traz o uso de tokens da resposta inteira.
+        async for chunk in stream:
+            record_tokens(getattr(chunk, "usage", None))
+            
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    except Exception as e:
+        yield f"Ocorreu um erro ao gerar a resposta final: {e}"
@@ -0,0 +1,135 @@
+import  os
+import  math
+import  threading
+from    typing          import Any, Dict, List, Optional, Tuple
+from    functools       import lru_cache
+from    dataclasses     import dataclass
+
+
+SQL_PROMPT_TOKEN_BUDGET = int(os.getenv("SQL_PROMPT_TOKEN_BUDGET", "1200"))
+TOKENIZER_ENCODING      = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+CHARS_PER_TOKEN         = 4
+TOKENS_PER_MESSAGE      = 4
+
+SQL_RULES = """Você é um gerador de SQL para SQLite. Traduza a pergunta do usuário em UMA consulta SQL válida.
+Regras:
+1. Responda APENAS com o SQL cru: sem JSON, Markdown ou explicações.
+2. A intenção do MLP define a operação principal: COUNT -> COUNT(*); CALC_AVG -> AVG(coluna); CALC_SUM -> SUM(coluna); LIST_ALL -> SELECT *; FIND_MAX/FIND_MIN -> ORDER BY coluna DESC/ASC LIMIT 1; FIND_MAX_MILEAGE/FIND_MIN_MILEAGE -> ORDER BY mileage DESC/ASC LIMIT 1; GROUP_COUNT -> COUNT(*) com GROUP BY.
+3. O WHERE filtra pelos detalhes da pergunta.
+4. Compare colunas de texto com LOWER(coluna) = 'valor em minúsculas'.
+5. Quando houver "Valores reconhecidos", use essas colunas e valores: as comparações já vêm no formato LOWER(coluna) = 'valor'."""
+
+SQL_EXAMPLES: Tuple[Tuple[str, str, str], ...] = (
+    ("quais carros são da audi?",        "LIST_ALL", "SELECT * FROM automobiles WHERE LOWER(brand) = 'audi';"),
+    ("quantos carros a diesel existem?", "COUNT",    "SELECT COUNT(*) FROM automobiles WHERE LOWER(fuel_type) = 'diesel';"),
+)
+
+# Ordem de descarte quando o prompt passa do orçamento: exemplos primeiro, depois os valores de colunas.
+OPTIONAL_SECTIONS = ("exemplos", "valores")
+
+_encoder: Any       = None
+_encoder_loaded     = False
+_encoder_lock       = threading.Lock()
+
+
+@dataclass
+class SQLPrompt:
+    messages: List[Dict[str, str]]
+    tokens: int
+    prefix_tokens: int
+    omitted: Tuple[str, ...]
+
+
+def _get_encoder() -> Any:
+
+    global _encoder, _encoder_loaded
+
+    # tiktoken é opcional: sem ele a contagem cai para a aproximação de 4 caracteres por token.
+    with _encoder_lock:
+        if not _encoder_loaded:
+            try:
+                import tiktoken
+                _encoder = tiktoken.get_encoding(TOKENIZER_ENCODING)
+            except Exception:
+                _encoder = None
+
+            _encoder_loaded = True
+
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+
+    encoder = _get_encoder()
+
+    if encoder is not None:
+        return len(encoder.encode(text))
+
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(count_tokens(message["content"]) + TOKENS_PER_MESSAGE for message in messages)
+
+
+def split_schema_context(schema_context: str) -> Dict[str, str]:
+
+    # O catálogo entrega "tabela\n\nvalores": os blocos podem ser descartados separadamente.
+    table, _, values = schema_context.partition("\n\n")
+
+    return {"schema": table.strip(), "valores": values.strip()}
+
+
+def _examples_block() -> str:
+    return "Exemplos:\n" + "\n".join(
+        f"Intenção: {intent} | Pergunta: {question}\n{sql}" for question, intent, sql in SQL_EXAMPLES
+    )
+
+
+@lru_cache(maxsize=32)
+def _sql_prefix(schema_context: str, omitted: Tuple[str, ...]) -> Tuple[str, int]:
+
+    # Tudo que não depende da pergunta fica no system: o prefixo é idêntico entre chamadas e
+    # aproveita o cache de prompt do provedor. Só muda quando o schema muda.
+    sections    = split_schema_context(schema_context)
+    blocks      = [SQL_RULES, f"Schema:\n{sections['schema']}"]
+
+    if "valores" not in omitted and sections["valores"]:
+        blocks.append(sections["valores"])
+    if "exemplos" not in omitted:
+        blocks.append(_examples_block())
+
+    prefix = "\n\n".join(blocks)
+
+    return prefix, count_tokens(prefix) + TOKENS_PER_MESSAGE
+
+
+def build_sql_prompt(
+    question: str,
+    intent: str,
+    schema_context: str,
+    budget: Optional[int]   = None,
+    resolved_values: str    = ""
+) -> SQLPrompt:
+
+    budget          = SQL_PROMPT_TOKEN_BUDGET if budget is None else budget
+    values_line     = f"Valores reconhecidos: {resolved_values}\n" if resolved_values else ""
+    request         = f"Intenção: {intent}\n{values_line}Pergunta: {question}\nSQL:"
+    request_tokens  = count_tokens(request) + TOKENS_PER_MESSAGE
+    omitted: Tuple[str, ...] = ()
+
+    for section in (None,) + OPTIONAL_SECTIONS:
+        if section:
+            omitted += (section,)
+
+        prefix, prefix_tokens = _sql_prefix(schema_context, omitted)
+
+        if prefix_tokens + request_tokens <= budget:
+            return SQLPrompt(
+                messages        =[{"role": "system", "content": prefix}, {"role": "user", "content": request}],
+                tokens          =prefix_tokens + request_tokens,
+                prefix_tokens   =prefix_tokens,
+                omitted         =omitted
+            )
+
+    raise ValueError(f"Prompt de SQL com {prefix_tokens + request_tokens} tokens excede o orçamento de {budget}.")
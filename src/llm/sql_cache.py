@@ -0,0 +1,148 @@
+import  os
+import  time
+import  sqlite3
+import  hashlib
+import  threading
+from    typing                  import Dict, Optional
+from    pathlib                 import Path
+from    src.nlp.preprocessing   import normalize_text
+
+
+PROJECT_ROOT    = Path(__file__).resolve().parent.parent.parent
+SQL_CACHE_PATH  = PROJECT_ROOT / "data" / "sql_cache.db"
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("SQL_CACHE_MAX_ENTRIES", "5000"))
+DEFAULT_TTL_SECONDS = float(os.getenv("SQL_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+class SQLCache:
+
+    def __init__(
+        self,
+        path: Path          = SQL_CACHE_PATH,
+        max_entries: int    = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float  = DEFAULT_TTL_SECONDS
+    ):
+
+        self.path           = Path(path)
+        self.max_entries    = max_entries
+        self.ttl_seconds    = ttl_seconds
+        self.hits           = 0
+        self.misses         = 0
+        self._lock          = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS sql_cache (
+            key TEXT PRIMARY KEY,
+            question TEXT NOT NULL,
+            intent TEXT NOT NULL,
+            schema_fingerprint TEXT NOT NULL,
+            sql TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sql_cache_last_access ON sql_cache(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(question: str, intent: str, schema_fingerprint: str) -> str:
+
+        # Os dígitos são mantidos: "os 5 carros" e "os 10 carros" geram SQLs diferentes.
+        normalized = normalize_text(question, strip_digits=False)
+        raw        = "\x1f".join([normalized, intent, schema_fingerprint])
+
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sql, created_at FROM sql_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            sql, created_at = row
+
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM sql_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE sql_cache SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+            return sql
+
+    def put(self, key: str, question: str, intent: str, schema_fingerprint: str, sql: str):
+
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute('''
+            INSERT OR REPLACE INTO sql_cache (
+                    key,
+                    question,
+                    intent,
+                    schema_fingerprint,
+                    sql,
+                    created_at,
+                    last_access
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''',
+                (key, question, intent, schema_fingerprint, sql, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+
+        self._conn.execute("DELETE FROM sql_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM sql_cache").fetchone()
+        overflow = count - self.max_entries
+
+        if overflow > 0:
+            self._conn.execute('''
+            DELETE FROM sql_cache WHERE key IN (
+                SELECT key FROM sql_cache ORDER BY last_access ASC LIMIT ?
+            )
+            ''', (overflow,))
+
+    def clear(self):
+
+        with self._lock:
+            self._conn.execute("DELETE FROM sql_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM sql_cache").fetchone()
+
+            return {
+                "hits"      : self.hits,
+                "misses"    : self.misses,
+                "entradas"  : count,
+            }
+
+    def close(self):
+
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,183 @@
+import os
+import re
+import json
+import numpy                          as np
+import pandas                         as pd
+
+from typing                           import Any, Dict, List, Tuple
+from contextlib                       import contextmanager
+from pathlib                          import Path
+from src.nlp.preprocessing            import text_processing_func
+
+
+MODELS_DIR              = Path(__file__).resolve().parent.parent.parent / "models"
+COMPILED_MODEL_DIR      = MODELS_DIR / "intent_compiled"
+INTENT_MODEL_BACKEND    = os.getenv("INTENT_MODEL_BACKEND", "joblib")
+
+
+def _multi_class_mode(classifier: Any) -> str:
+
+    # SGDClassifier, liblinear (sempre um-contra-todos) e LogisticRegression antigas com multi_class='ovr'
+    # normalizam sigmoides; o resto usa softmax.
+    if len(classifier.classes_) == 2:
+        return "binary"
+    if (
+        getattr(classifier, "multi_class", None) == "ovr"
+        or getattr(classifier, "solver", None) == "liblinear"
+        or classifier.__class__.__name__ == "SGDClassifier"
+    ):
+        return "ovr"
+
+    return "multinomial"
+
+
+@contextmanager
+def _replacing(path: Path, mode: str = "w"):
+
+    # Arquivo novo + os.replace: um modelo carregado com mmap segue lendo o inode antigo em vez de
+    # ver o arquivo truncado no meio do treino (o servidor recarrega o backend compilado depois).
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    with open(tmp_path, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+        yield f
+
+    os.replace(tmp_path, path)
+
+
+def _save_array(path: Path, array: np.ndarray):
+
+    with _replacing(path, "wb") as f:
+        np.save(f, array)
+
+
+def export_compiled_model(pipeline: Any, label_encoder: Any, output_dir: Path = COMPILED_MODEL_DIR) -> Path:
+
+    vectorizer  = pipeline.named_steps['preprocessor'].named_steps['vectorizer']
+    classifier  = pipeline.named_steps['classifier']
+    params      = vectorizer.get_params()
+
+    if params["analyzer"] != "word" or params["tokenizer"] or params["preprocessor"] or params["stop_words"]:
+        raise ValueError("Só o TfidfVectorizer com analyzer='word' e tokenização padrão pode ser compilado.")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    vocabulary = {term: int(index) for term, index in vectorizer.vocabulary_.items()}
+
+    # Matriz transposta (termo x classe): cada termo da pergunta lê uma linha contígua do mmap.
+    _save_array(output_dir / "idf.npy",         vectorizer.idf_.astype(np.float32))
+    _save_array(output_dir / "coef.npy",        np.ascontiguousarray(classifier.coef_.T, dtype=np.float32))
+    _save_array(output_dir / "intercept.npy",   np.asarray(classifier.intercept_, dtype=np.float32))
+
+    with _replacing(output_dir / "vocabulary.json") as f:
+        json.dump(vocabulary, f, ensure_ascii=False)
+
+    with _replacing(output_dir / "meta.json") as f:
+        json.dump({
+            "classes"       : [str(c) for c in label_encoder.inverse_transform(classifier.classes_)],
+            "mode"          : _multi_class_mode(classifier),
+            "ngram_range"   : list(params["ngram_range"]),
+            "lowercase"     : params["lowercase"],
+            "token_pattern" : params["token_pattern"],
+            "norm"          : params["norm"],
+            "sublinear_tf"  : params["sublinear_tf"],
+            "binary"        : params["binary"],
+        }, f, ensure_ascii=False)
+
+    return output_dir
+
+
+class CompiledLabels:
+
+    # Mesmo contrato do LabelEncoder usado por classify_questions, sem importar o sklearn.
+    def __init__(self, classes: List[str]):
+        self.classes_ = np.asarray(classes, dtype=object)
+
+    def inverse_transform(self, encoded) -> np.ndarray:
+        return self.classes_[np.asarray(encoded, dtype=int)]
+
+
+class CompiledIntentModel:
+
+    def __init__(self, model_dir: Path = COMPILED_MODEL_DIR):
+
+        with open(model_dir / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        with open(model_dir / "vocabulary.json", encoding="utf-8") as f:
+            self.vocabulary: Dict[str, int] = json.load(f)
+
+        self.idf            = np.load(model_dir / "idf.npy",       mmap_mode="r")
+        self.coef           = np.load(model_dir / "coef.npy",      mmap_mode="r")
+        self.intercept      = np.load(model_dir / "intercept.npy")
+        self.mode           = meta["mode"]
+        self.ngram_range    = tuple(meta["ngram_range"])
+        self.lowercase      = meta["lowercase"]
+        self.token_re       = re.compile(meta["token_pattern"])
+        self.norm           = meta["norm"]
+        self.sublinear_tf   = meta["sublinear_tf"]
+        self.binary         = meta["binary"]
+        self.labels         = CompiledLabels(meta["classes"])
+        self.classes_       = np.arange(len(meta["classes"]))
+
+    def _features(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+
+        tokens  = self.token_re.findall(text.lower() if self.lowercase else text)
+        low, hi = self.ngram_range
+        counts: Dict[int, float] = {}
+
+        for n in range(low, hi + 1):
+            for start in range(len(tokens) - n + 1):
+                index = self.vocabulary.get(" ".join(tokens[start:start + n]))
+
+                if index is not None:
+                    counts[index] = counts.get(index, 0.0) + 1.0
+
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values  = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+
+        if self.binary:
+            values[:] = 1.0
+        elif self.sublinear_tf:
+            values = 1.0 + np.log(values)
+
+        values = values * self.idf[indices]
+
+        if self.norm == "l2" and len(values):
+            values /= np.sqrt(np.dot(values, values))
+        elif self.norm == "l1" and len(values):
+            values /= np.abs(values).sum()
+
+        return indices, values
+
+    def _probabilities(self, scores: np.ndarray) -> np.ndarray:
+
+        if self.mode == "binary":
+            positive = 1.0 / (1.0 + np.exp(-scores[0]))
+            return np.array([1.0 - positive, positive])
+
+        if self.mode == "ovr":
+            sigmoid = 1.0 / (1.0 + np.exp(-scores))
+            return sigmoid / sigmoid.sum()
+
+        exp = np.exp(scores - scores.max())
+        return exp / exp.sum()
+
+    def predict_proba(self, questions) -> np.ndarray:
+
+        lemmas = text_processing_func(pd.Series(list(questions)))
+        rows   = []
+
+        # Produto esparso: só as linhas da matriz dos termos presentes na pergunta são lidas.
+        for text in lemmas:
+            indices, values = self._features(text)
+            scores          = values @ self.coef[indices] + self.intercept
+            rows.append(self._probabilities(np.atleast_1d(scores)))
+
+        return np.vstack(rows)
+
+    def top_k(self, question: str, k: int = 3) -> List[Tuple[str, float]]:
+
+        probabilities = self.predict_proba([question])[0]
+        best          = np.argsort(probabilities)[::-1][:k]
+
+        return [(str(self.labels.classes_[i]), float(probabilities[i])) for i in best]
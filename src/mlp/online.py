@@ -0,0 +1,175 @@
+import os
+import csv
+import time
+import joblib
+import threading
+import numpy                          as np
+import pandas                         as pd
+
+from typing                           import Any, Dict, Optional, Tuple
+from pathlib                          import Path
+from sklearn.pipeline                 import Pipeline
+from sklearn.linear_model             import SGDClassifier
+from sklearn.preprocessing            import LabelEncoder, FunctionTransformer
+from sklearn.feature_extraction.text  import HashingVectorizer
+from src.nlp.preprocessing            import text_processing_func
+
+
+BASE_DIR            = Path(__file__).resolve().parent.parent.parent
+DATA_DIR            = BASE_DIR / "data"
+MODELS_DIR          = BASE_DIR / "models"
+
+DATASET_PATH        = DATA_DIR / "raw" / "questions.csv"
+FEEDBACK_PATH       = DATA_DIR / "feedback.csv"
+ONLINE_MODEL_PATH   = MODELS_DIR / "intent_online_model.joblib"
+
+ONLINE_N_FEATURES   = 2 ** 18
+ONLINE_EPOCHS       = int(os.getenv("ONLINE_EPOCHS", "5"))
+
+_training_lock      = threading.Lock()
+
+
+def build_online_pipeline() -> Pipeline:
+
+    # Vetorizador sem estado (hashing): linhas novas nunca exigem reconstruir o vocabulário.
+    return Pipeline([
+
+        ('preprocessor', Pipeline([
+            ('text_processing', FunctionTransformer(text_processing_func)),
+            ('vectorizer', HashingVectorizer(
+                n_features      =ONLINE_N_FEATURES,
+                ngram_range     =(1, 2),
+                alternate_sign  =False
+            ))
+        ])),
+        ('classifier', SGDClassifier(
+            loss            ='log_loss',
+            alpha           =1e-4,
+            max_iter        =50,
+            random_state    =42
+        ))
+
+    ])
+
+
+def append_feedback(question: str, intent: str, feedback_path: Path = FEEDBACK_PATH):
+
+    new_file = not feedback_path.exists()
+    feedback_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(feedback_path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+
+        if new_file:
+            writer.writerow(["question", "intent"])
+
+        writer.writerow([question, intent])
+
+
+def _read_rows(path: Path) -> pd.DataFrame:
+
+    if not path.exists():
+        return pd.DataFrame(columns=["question", "intent"])
+
+    return pd.read_csv(path)[["question", "intent"]].dropna()
+
+
+def load_online_model(model_path: Path = ONLINE_MODEL_PATH) -> Optional[Dict[str, Any]]:
+
+    try:
+        return joblib.load(model_path)
+    except FileNotFoundError:
+        return None
+
+
+def _save_atomically(artifact: Dict[str, Any], model_path: Path):
+
+    # Escreve ao lado e renomeia: quem carregar o arquivo nunca vê um pickle pela metade.
+    tmp_path = model_path.with_suffix(".tmp")
+    joblib.dump(artifact, tmp_path)
+    os.replace(tmp_path, model_path)
+
+
+def _bootstrap(questions: pd.DataFrame, feedback: pd.DataFrame) -> Tuple[Pipeline, LabelEncoder]:
+
+    rows            = pd.concat([questions, feedback], ignore_index=True)
+    label_encoder   = LabelEncoder().fit(rows["intent"])
+    pipeline        = build_online_pipeline()
+
+    pipeline.fit(rows["question"], label_encoder.transform(rows["intent"]))
+
+    return pipeline, label_encoder
+
+
+def _partial_fit(pipeline: Pipeline, label_encoder: LabelEncoder, rows: pd.DataFrame):
+
+    features    = pipeline.named_steps['preprocessor'].transform(rows["question"])
+    targets     = label_encoder.transform(rows["intent"])
+    classifier  = pipeline.named_steps['classifier']
+    rng         = np.random.default_rng(42)
+
+    for _ in range(ONLINE_EPOCHS):
+        order = rng.permutation(len(targets))
+        classifier.partial_fit(features[order], targets[order], classes=classifier.classes_)
+
+
+def train_incremental(
+    dataset_path: Path  = DATASET_PATH,
+    feedback_path: Path = FEEDBACK_PATH,
+    model_path: Path    = ONLINE_MODEL_PATH
+) -> Dict[str, Any]:
+
+    with _training_lock:
+        started     = time.perf_counter()
+        questions   = _read_rows(dataset_path)
+        feedback    = _read_rows(feedback_path)
+        artifact    = load_online_model(model_path)
+        state       = artifact["state"] if artifact else None
+
+        new_rows    = None
+        mode        = "bootstrap"
+
+        # Só é incremental se os arquivos cresceram desde o último treino e não surgiram intenções novas.
+        if state and len(questions) >= state["questions_rows"] and len(feedback) >= state["feedback_rows"]:
+            new_rows = pd.concat([
+                questions.iloc[state["questions_rows"]:],
+                feedback.iloc[state["feedback_rows"]:]
+            ], ignore_index=True)
+
+            if not set(new_rows["intent"]) <= set(artifact["label_encoder"].classes_):
+                new_rows = None
+
+        if new_rows is not None:
+            pipeline, label_encoder = artifact["pipeline"], artifact["label_encoder"]
+            mode                    = "incremental"
+
+            if len(new_rows):
+                _partial_fit(pipeline, label_encoder, new_rows)
+        else:
+            pipeline, label_encoder = _bootstrap(questions, feedback)
+
+        trained_rows = len(new_rows) if new_rows is not None else len(questions) + len(feedback)
+
+        _save_atomically({
+            "pipeline"       : pipeline,
+            "label_encoder"  : label_encoder,
+            "state"          : {
+                "questions_rows" : len(questions),
+                "feedback_rows"  : len(feedback),
+                "updated_at"     : time.time(),
+            },
+        }, model_path)
+
+        return {
+            "modo"             : mode,
+            "linhas_treinadas" : trained_rows,
+            "tempo_s"          : round(time.perf_counter() - started, 3),
+            "pipeline"         : pipeline,
+            "label_encoder"    : label_encoder,
+        }
+
+
+def reset_online_model(model_path: Path = ONLINE_MODEL_PATH):
+
+    # Depois de um treino completo, o próximo incremental recomeça de todas as linhas.
+    model_path.unlink(missing_ok=True)
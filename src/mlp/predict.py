@@ -1,26 +1,44 @@
 import joblib
 from pathlib                import Path
-from src.nlp.preprocessing  import preprocess_pipeline
 
 
 MODELS_DIR = Path(__file__).resolve().parent.parent.parent / "models"
 MODEL_PATH = MODELS_DIR / "mlp_intent_classifier.pkl"
 
-try:
-    model  = joblib.load(MODEL_PATH)
-    print("Modelo MLP de intenção carregado com sucesso.")
-    
-except FileNotFoundError:
-    print(f"Erro: Arquivo do modelo não encontrado em {MODEL_PATH}.")
-    print("Por favor, execute o script 'src/mlp/train.py' primeiro.")
-    model = None
+_model  = None
+_loaded = False
+
+
+def get_model():
+
+    global _model, _loaded
+
+    # Carregado na primeira previsão: importar o módulo não custa o unpickle do sklearn.
+    if not _loaded:
+        try:
+            _model = joblib.load(MODEL_PATH)
+            print("Modelo MLP de intenção carregado com sucesso.")
+
+        except FileNotFoundError:
+            print(f"Erro: Arquivo do modelo não encontrado em {MODEL_PATH}.")
+            print("Por favor, execute o script 'src/mlp/train.py' primeiro.")
+            _model = None
+
+        _loaded = True
+
+    return _model
+
 
 def predict_intent(question: str) -> str:
-   
+
+    model = get_model()
+
     if model is None:
         return "ERRO: Modelo não carregado."
-        
+
+    from src.nlp.preprocessing import preprocess_pipeline
+
     processed_question  = preprocess_pipeline(question)
     prediction          = model.predict([processed_question])
-    
-    return prediction[0]
\ No newline at end of file
+
+    return prediction[0]
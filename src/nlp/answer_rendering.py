@@ -0,0 +1,248 @@
+import  os
+import  re
+import  math
+import  pandas                  as pd
+from    typing                  import Any, Optional
+from    src.nlp.sql_templates   import INTENT_METRICS
+
+
+ANSWER_RENDER_POLICY    = os.getenv("ANSWER_RENDER_POLICY", "auto")
+ANSWER_POLICIES         = ("auto", "local", "llm")
+MAX_LOCAL_LIST_ROWS     = int(os.getenv("ANSWER_MAX_LOCAL_ROWS", "5"))
+MAX_LOCAL_GROUP_ROWS    = 15
+
+_STRING_LITERAL         = re.compile(r"'(?:[^']|'')*'")
+_COUNT_NOT_STAR         = re.compile(r"\bCOUNT\s*\(\s*(?!\*\s*\))", re.IGNORECASE)
+_DISTINCT               = re.compile(r"\bDISTINCT\b", re.IGNORECASE)
+_ORDER_BY               = re.compile(r"\bORDER\s+BY\s+(?:\w+\.)?\"?(\w+)\"?(?:\s+(ASC|DESC))?", re.IGNORECASE)
+
+METRIC_LABELS = {
+    'engine_power'  : 'potência do motor',
+    'mileage'       : 'quilometragem',
+    'doors'         : 'portas',
+    'seats'         : 'assentos',
+}
+
+COLUMN_LABELS = {
+    'brand'         : 'marca',
+    'model'         : 'modelo',
+    'color'         : 'cor',
+    'category'      : 'categoria',
+    'fuel_type'     : 'combustível',
+    'transmission'  : 'transmissão',
+    'steering'      : 'direção',
+    'doors'         : 'número de portas',
+    'seats'         : 'número de assentos',
+}
+
+
+def format_number(value: Any) -> str:
+
+    if isinstance(value, float) and not value.is_integer():
+        text = f"{value:,.2f}"
+    else:
+        text = f"{int(value):,}"
+
+    # Padrão brasileiro: ponto para milhar, vírgula para decimal.
+    return text.replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def _plain(value: Any) -> Any:
+    return value.item() if hasattr(value, "item") else value
+
+
+def _metric_label(column: str) -> Optional[str]:
+
+    for key, label in METRIC_LABELS.items():
+        if key in column.lower():
+            return label
+
+    return None
+
+
+def _scalar(db_result: pd.DataFrame) -> Optional[Any]:
+
+    if db_result.shape != (1, 1):
+        return None
+
+    value = db_result.iat[0, 0]
+
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+
+    return _plain(value)
+
+
+def _describe_car(row: pd.Series) -> str:
+
+    name    = " ".join(str(row[c]) for c in ('brand', 'model') if c in row and pd.notna(row[c]))
+    details = [str(row[c]) for c in ('color', 'category') if c in row and pd.notna(row[c])]
+
+    if 'license_plate' in row and pd.notna(row['license_plate']):
+        details.append(f"placa {row['license_plate']}")
+
+    return f"{name} ({', '.join(details)})" if details else name
+
+
+def _counts_cars(sql: str) -> bool:
+
+    # "N carros" só vale para COUNT(*): DISTINCT ou COUNT(coluna) contam outra coisa (modelos, valores não nulos).
+    text = _STRING_LITERAL.sub("''", sql)
+
+    return not _DISTINCT.search(text) and not _COUNT_NOT_STAR.search(text)
+
+
+def _render_count(db_result: pd.DataFrame, sql: str) -> Optional[str]:
+
+    # A coluna precisa confirmar a contagem de carros; COUNT(DISTINCT ...) fica com o LLM.
+    column = str(db_result.columns[0]).lower()
+    value  = _scalar(db_result)
+
+    if not any(word in column for word in ('count', 'total', 'quantidade')) or 'distinct' in column:
+        return None
+    if not _counts_cars(sql):
+        return None
+    if not isinstance(value, (int, float)):
+        return None
+    if value == 0:
+        return "Não foi encontrado nenhum carro que corresponda à pergunta."
+    if value == 1:
+        return "Foi encontrado 1 carro que corresponde à pergunta."
+
+    return f"Foram encontrados {format_number(value)} carros que correspondem à pergunta."
+
+
+def _render_aggregate(db_result: pd.DataFrame, intent: str) -> Optional[str]:
+
+    if db_result.shape != (1, 1):
+        return None
+
+    column  = str(db_result.columns[0]).lower()
+    value   = _scalar(db_result)
+    label   = _metric_label(column)
+    kind    = "média" if intent == 'CALC_AVG' else "soma"
+    other   = ('sum', 'soma') if intent == 'CALC_AVG' else ('avg', 'media', 'média')
+
+    if label is None or any(word in column for word in other):
+        return None
+    if value is None:
+        return f"Não há carros que correspondam à pergunta para calcular a {kind}."
+    if not isinstance(value, (int, float)):
+        return None
+
+    return f"A {kind} de {label} é {format_number(value)}."
+
+
+def _orders_by_metric(sql: str, column: str, direction: str) -> bool:
+
+    # O carro "de maior potência" só vale se o SQL ordenou (ou tirou MAX/MIN) pela métrica da intenção,
+    # no sentido dela: ORDER BY doors DESC em FIND_MAX não é o carro mais potente.
+    text  = _STRING_LITERAL.sub("''", sql)
+    order = _ORDER_BY.search(text)
+
+    if order:
+        return order.group(1).lower() == column and (order.group(2) or "ASC").upper() == direction
+
+    extreme = "MAX" if direction == "DESC" else "MIN"
+
+    return re.search(rf"\b{extreme}\s*\(\s*(?:\w+\.)?\"?{column}\"?\s*\)", text, re.IGNORECASE) is not None
+
+
+def _render_extreme(db_result: pd.DataFrame, intent: str, sql: str) -> Optional[str]:
+
+    if len(db_result) != 1 or not {'brand', 'model'} <= set(db_result.columns) or intent not in INTENT_METRICS:
+        return None
+
+    column, direction = INTENT_METRICS[intent]
+
+    if not _orders_by_metric(sql, column, direction):
+        return None
+
+    row     = db_result.iloc[0]
+    label   = METRIC_LABELS[column]
+    extreme = "maior" if intent.startswith('FIND_MAX') else "menor"
+    answer  = f"O carro com {extreme} {label} é o {_describe_car(row)}"
+
+    if column in row and pd.notna(row[column]):
+        answer += f", com {format_number(_plain(row[column]))}"
+        answer += " km rodados" if column == 'mileage' else " de potência"
+
+    return answer + "."
+
+
+def _render_group_count(db_result: pd.DataFrame, sql: str) -> Optional[str]:
+
+    if db_result.shape[1] != 2 or not 0 < len(db_result) <= MAX_LOCAL_GROUP_ROWS or not _counts_cars(sql):
+        return None
+
+    key_column, count_column = db_result.columns
+
+    if not pd.api.types.is_numeric_dtype(db_result[count_column]):
+        return None
+
+    label = COLUMN_LABELS.get(str(key_column), str(key_column))
+    parts = [f"{key}: {format_number(_plain(count))}" for key, count in db_result.itertuples(index=False)]
+
+    return f"Distribuição de carros por {label}: " + "; ".join(parts) + "."
+
+
+def _render_list(db_result: pd.DataFrame, total_rows: int) -> Optional[str]:
+
+    if not {'brand', 'model'} <= set(db_result.columns) or total_rows > MAX_LOCAL_LIST_ROWS:
+        return None
+
+    cars = [_describe_car(row) for _, row in db_result.iterrows()]
+
+    if len(cars) == 1:
+        return f"Foi encontrado 1 carro: {cars[0]}."
+
+    return f"Foram encontrados {len(cars)} carros: " + "; ".join(cars) + "."
+
+
+def _render_generic(db_result: pd.DataFrame, total_rows: int) -> str:
+
+    preview = db_result.head(MAX_LOCAL_LIST_ROWS).to_string(index=False)
+
+    return f"A consulta retornou {format_number(total_rows)} linhas. Primeiras linhas:\n{preview}"
+
+
+def render_answer(
+    intent: str,
+    db_result: pd.DataFrame | str,
+    policy: str                 = ANSWER_RENDER_POLICY,
+    total_rows: Optional[int]   = None,
+    sql: str                    = ""
+) -> Optional[str]:
+
+    # None significa "use o LLM": política 'llm', erro de execução ou resultado ambíguo.
+    if policy == "llm":
+        return None
+
+    if isinstance(db_result, str):
+        if policy == "local":
+            return "Não foi possível executar a consulta gerada para essa pergunta. Tente reformulá-la."
+        return None
+
+    if db_result.empty:
+        return "Nenhum resultado foi encontrado para essa pergunta."
+
+    # Com resultado truncado, o DataFrame traz só as primeiras linhas.
+    total_rows = len(db_result) if total_rows is None else total_rows
+
+    if intent == 'COUNT':
+        answer = _render_count(db_result, sql)
+    elif intent in ('CALC_AVG', 'CALC_SUM'):
+        answer = _render_aggregate(db_result, intent)
+    elif intent.startswith('FIND_'):
+        answer = _render_extreme(db_result, intent, sql)
+    elif intent == 'GROUP_COUNT':
+        answer = _render_group_count(db_result, sql)
+    elif intent == 'LIST_ALL':
+        answer = _render_list(db_result, total_rows)
+    else:
+        answer = None
+
+    if answer is None and policy == "local":
+        answer = _render_generic(db_result, total_rows)
+
+    return answer
@@ -0,0 +1,126 @@
+import  os
+import  sqlite3
+import  threading
+from    typing      import Dict, Iterable, Optional
+from    pathlib     import Path
+from    collections import OrderedDict
+
+
+PROJECT_ROOT        = Path(__file__).resolve().parent.parent.parent
+LEMMA_CACHE_SIZE    = int(os.getenv("LEMMA_CACHE_SIZE", "50000"))
+LEMMA_CACHE_PATH    = os.getenv("LEMMA_CACHE_PATH", str(PROJECT_ROOT / "data" / "lemma_cache.db"))
+
+
+class LemmaCache:
+
+    def __init__(self, model_key: str, max_entries: int = LEMMA_CACHE_SIZE, path: Optional[str] = LEMMA_CACHE_PATH):
+
+        # model_key (nome@versão do spaCy) separa entradas persistidas por modelos diferentes.
+        self.model_key                              = model_key
+        self.max_entries                            = max_entries
+        self.path                                   = Path(path) if path else None
+        self._entries: "OrderedDict[str, str]"      = OrderedDict()
+        self._lock                                  = threading.Lock()
+        self._conn: Optional[sqlite3.Connection]    = None
+        self.hits                                   = 0
+        self.misses                                 = 0
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+
+        if self.path is None or self._conn is not None:
+            return self._conn
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS lemmas (
+                model TEXT NOT NULL,
+                text TEXT NOT NULL,
+                lemmas TEXT NOT NULL,
+                PRIMARY KEY (model, text)
+            )
+            ''')
+            self._conn.commit()
+
+        except sqlite3.Error as e:
+            print(f"⚠️ Cache persistente de lemas desativado: {e}")
+            self.path = None
+
+        return self._conn
+
+    def _remember(self, text: str, lemmas: str):
+
+        self._entries[text] = lemmas
+        self._entries.move_to_end(text)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_many(self, texts: Iterable[str]) -> Dict[str, str]:
+
+        found   = {}
+        missing = []
+
+        with self._lock:
+            for text in texts:
+                if text in self._entries:
+                    self._entries.move_to_end(text)
+                    found[text] = self._entries[text]
+                else:
+                    missing.append(text)
+
+            conn = self._connection() if missing else None
+
+            # SQLite limita o número de parâmetros: a busca persistente vai em lotes.
+            for start in range(0, len(missing) if conn else 0, 500):
+                batch = missing[start:start + 500]
+                rows  = conn.execute(
+                    f"SELECT text, lemmas FROM lemmas WHERE model = ? AND text IN ({','.join('?' * len(batch))})",
+                    (self.model_key, *batch)
+                ).fetchall()
+
+                for text, lemmas in rows:
+                    self._remember(text, lemmas)
+                    found[text] = lemmas
+
+            self.hits   += len(found)
+            self.misses += sum(1 for text in missing if text not in found)
+
+        return found
+
+    def put_many(self, lemmas_by_text: Dict[str, str]):
+
+        if not lemmas_by_text:
+            return
+
+        with self._lock:
+            for text, lemmas in lemmas_by_text.items():
+                self._remember(text, lemmas)
+
+            conn = self._connection()
+
+            if conn is not None:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO lemmas (model, text, lemmas) VALUES (?, ?, ?)",
+                    [(self.model_key, text, lemmas) for text, lemmas in lemmas_by_text.items()]
+                )
+                conn.commit()
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+            self.hits   = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+
+        return {
+            "hits"      : self.hits,
+            "misses"    : self.misses,
+            "entradas"  : len(self._entries),
+        }
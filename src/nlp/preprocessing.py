@@ -1,55 +1,132 @@
+import os
 import re
-import spacy
 import string
+import threading
 import pandas as pd
 
-from sklearn.pipeline                   import Pipeline
-from sklearn.preprocessing              import FunctionTransformer
-from sklearn.feature_extraction.text    import TfidfVectorizer
+from importlib.metadata                 import version, PackageNotFoundError
+from src.nlp.lemma_cache                import LemmaCache
 
-try:
-    nlp = spacy.load("pt_core_news_sm")
-    
-except OSError:
-    
-    print("Modelo 'pt_core_news_sm' do spaCy não encontrado. Baixando...")
+SPACY_MODEL             = "pt_core_news_sm"
+# Só o lematizador e o que alimenta seu POS (tok2vec/morphologizer/attribute_ruler) são necessários.
+SPACY_EXCLUDE           = ["parser", "ner", "senter"]
+SPACY_BATCH_SIZE        = int(os.getenv("SPACY_BATCH_SIZE", "256"))
+SPACY_N_PROCESS         = int(os.getenv("SPACY_N_PROCESS", str(min(4, os.cpu_count() or 1))))
+SPACY_PARALLEL_MIN_DOCS = int(os.getenv("SPACY_PARALLEL_MIN_DOCS", "2000"))
+
+_nlp        = None
+_nlp_lock   = threading.Lock()
+
+
+def _model_version() -> str:
+
+    try:
+        return version(SPACY_MODEL)
+    except PackageNotFoundError:
+        return "desconhecida"
+
+
+# A chave sai dos metadados do pacote: o cache de lemas não obriga a carregar o spaCy.
+lemma_cache = LemmaCache(f"{SPACY_MODEL}@{_model_version()}")
+
+
+def get_nlp():
+
+    global _nlp
+
+    # spaCy e o modelo custam segundos: carregados só quando a primeira frase precisa de lematização.
+    with _nlp_lock:
+        if _nlp is not None:
+            return _nlp
+
+        import spacy
+
+        try:
+            _nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+            
+        except OSError:
+            
+            print(f"Modelo '{SPACY_MODEL}' do spaCy não encontrado. Baixando...")
+            
+            from spacy.cli import download
+            
+            download(SPACY_MODEL)
+            
+            _nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+
+        return _nlp
+
+
+PUNCTUATION_RE  = re.compile(f'[{re.escape(string.punctuation)}]')
+DIGITS_RE       = re.compile(r'\d+')
+SPACES_RE       = re.compile(r'\s+')
+
+
+def normalize_text(text: str, strip_digits: bool = True) -> str:
     
-    from spacy.cli import download
+    text = PUNCTUATION_RE.sub('', str(text).lower())
     
-    download("pt_core_news_sm")
+    if strip_digits:
+        text = DIGITS_RE.sub('', text)
     
-    nlp = spacy.load("pt_core_news_sm")
+    return SPACES_RE.sub(' ', text).strip()
 
 
-def text_processing_func(series: pd.Series) -> pd.Series:
+def normalize_series(series: pd.Series, strip_digits: bool = True) -> pd.Series:
     
-    series = series.astype(str)
+    # Regex compilada sobre a lista: os métodos .str do pandas custam mais que o cache de lemas numa só pergunta.
+    return pd.Series([normalize_text(text, strip_digits) for text in series.astype(str)], index=series.index)
 
-    series = series.str.lower()
-    
-    series = series.str.replace(f'[{re.escape(string.punctuation)}]', '', regex=True)
+
+def lemmatize_texts(texts: list) -> list:
+
+    # O cache é por frase normalizada: o lema de um token depende do POS, que depende da frase inteira.
+    unique  = list(dict.fromkeys(texts))
+    lemmas  = lemma_cache.get_many(unique)
+    missing = [text for text in unique if text not in lemmas]
+
+    if missing:
+        n_process = SPACY_N_PROCESS if len(missing) >= SPACY_PARALLEL_MIN_DOCS else 1
+        computed  = {}
+
+        for text, doc in zip(missing, get_nlp().pipe(missing, batch_size=SPACY_BATCH_SIZE, n_process=n_process)):
+            computed[text] = " ".join(token.lemma_ for token in doc if token.is_alpha and not token.is_stop)
+
+        lemma_cache.put_many(computed)
+        lemmas.update(computed)
+
+    return [lemmas[text] for text in texts]
+
+
+def text_processing_func(series: pd.Series) -> pd.Series:
     
-    series = series.str.replace(r'\d+', '', regex=True)
+    series = normalize_series(series)
     
-    series = series.str.replace(r'\s+', ' ', regex=True).str.strip()
+    return pd.Series(lemmatize_texts(series.tolist()), index=series.index)
 
-    processed_texts = []
-    
-    for doc in nlp.pipe(series, disable=["parser", "ner"]):
-        
-        lemmas = [token.lemma_ for token in doc if token.is_alpha and not token.is_stop]
+
+def build_preprocess_pipeline():
+
+    from sklearn.pipeline                   import Pipeline
+    from sklearn.preprocessing              import FunctionTransformer
+    from sklearn.feature_extraction.text    import TfidfVectorizer
+
+    return Pipeline([
+
+        ('text_processing', FunctionTransformer(text_processing_func)),
         
-        processed_texts.append(" ".join(lemmas))
-    
-    return pd.Series(processed_texts, index=series.index)
+        ('vectorizer', TfidfVectorizer(
+            max_features    =1000,  
+            ngram_range     =(1, 2)
+        ))
+    ])
 
 
-preprocess_pipeline = Pipeline([
+def __getattr__(name: str):
 
-    ('text_processing', FunctionTransformer(text_processing_func)),
-    
-    ('vectorizer', TfidfVectorizer(
-        max_features    =1000,  
-        ngram_range     =(1, 2)
-    ))
-])
+    # `from src.nlp.preprocessing import preprocess_pipeline` continua valendo, mas o sklearn só é importado aqui.
+    if name == "preprocess_pipeline":
+        globals()[name] = build_preprocess_pipeline()
+        return globals()[name]
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,347 @@
+import  os
+import  re
+import  unicodedata
+from    typing                  import Dict, List, Optional, Set, Tuple
+from    dataclasses             import dataclass
+from    src.database.vocabulary import (
+    brands,
+    models_by_brand,
+    colors,
+    categories,
+    fuel_types,
+    transmissions
+)
+
+
+TEMPLATE_MIN_CONFIDENCE = float(os.getenv("SQL_TEMPLATE_MIN_CONFIDENCE", "0.6"))
+MAX_PHRASE_TOKENS       = 3
+FILTER_COLUMNS          = ['brand', 'model', 'color', 'category', 'fuel_type', 'transmission']
+
+# Comparações montadas só com palavras "inofensivas"; qualquer uma delas exige o LLM.
+UNSUPPORTED_PHRASES = [
+    'mais de', 'menos de', 'mais que', 'menos que', 'maior que', 'menor que',
+    'pelo menos', 'no minimo', 'no maximo'
+]
+
+# Só se usa o template quando toda palavra da pergunta foi entendida: ou é valor de
+# filtro/métrica/agrupamento, ou está nesta lista. Qualquer outra ("luxo", "turbo",
+# "Peugeot", "ano", "sem") pode mudar o sentido da consulta e vai para o LLM.
+HARMLESS_WORDS = {
+    'a', 'o', 'as', 'os', 'um', 'uma', 'de', 'da', 'do', 'das', 'dos', 'e', 'em', 'no', 'na', 'com',
+    'que', 'para', 'por', 'cada', 'me', 'ja', 'aqui', 'atualmente', 'nosso', 'nossa',
+    'qual', 'quais', 'quantos', 'quantas', 'tem', 'temos', 'ha', 'existe', 'existem', 'sao', 'estao',
+    'mostre', 'mostrar', 'encontre', 'identifique', 'diga', 'informe', 'liste', 'exiba', 'calcule',
+    'conte', 'some', 'agrupe', 'movidos', 'movido',
+    'carro', 'carros', 'veiculo', 'veiculos', 'automovel', 'automoveis', 'motor', 'motores',
+    'estoque', 'patio', 'inventario', 'registro', 'registrada', 'registrado', 'disponivel', 'disponiveis',
+    'todos', 'todas', 'todo', 'total', 'soma', 'media', 'medio', 'contagem', 'quantidade', 'numero',
+    'distribuicao', 'valores', 'valor', 'tipo', 'tipos', 'marca', 'modelo', 'cor', 'categoria',
+    'combustivel', 'transmissao', 'cambio',
+    'mais', 'menos', 'maior', 'menor', 'alta', 'alto', 'baixa', 'baixo', 'maxima', 'maximo', 'minima',
+    'minimo', 'forte', 'fraco', 'forca', 'capacidade', 'especificacao', 'extensa', 'curta',
+    'marcacao', 'leitura', 'percorrida', 'percorrido',
+}
+
+METRIC_WORDS = {
+    'potencia'      : 'engine_power',
+    'potente'       : 'engine_power',
+    'potentes'      : 'engine_power',
+    'cavalos'       : 'engine_power',
+    'cavalaria'     : 'engine_power',
+    'quilometragem' : 'mileage',
+    'quilometros'   : 'mileage',
+    'km'            : 'mileage',
+    'rodado'        : 'mileage',
+    'rodados'       : 'mileage',
+    'rodou'         : 'mileage',
+    'odometro'      : 'mileage',
+    'distancia'     : 'mileage',
+    'viajou'        : 'mileage',
+    'viajado'       : 'mileage',
+    'porta'         : 'doors',
+    'portas'        : 'doors',
+    'assento'       : 'seats',
+    'assentos'      : 'seats',
+    'lugares'       : 'seats',
+}
+
+GROUP_WORDS = {
+    'marca'         : 'brand',
+    'marcas'        : 'brand',
+    'fabricante'    : 'brand',
+    'fabricantes'   : 'brand',
+    'modelo'        : 'model',
+    'modelos'       : 'model',
+    'cor'           : 'color',
+    'cores'         : 'color',
+    'categoria'     : 'category',
+    'categorias'    : 'category',
+    'combustivel'   : 'fuel_type',
+    'transmissao'   : 'transmission',
+    'cambio'        : 'transmission',
+    'direcao'       : 'steering',
+    'portas'        : 'doors',
+    'assentos'      : 'seats',
+    'lugares'       : 'seats',
+}
+GROUP_FILLER_WORDS = {'tipo', 'tipos', 'de', 'do', 'da', 'numero', 'quantidade'}
+
+EXTRA_SYNONYMS = {
+    'mercedes'      : ('brand', 'Mercedes-Benz'),
+    'vw'            : ('brand', 'Volkswagen'),
+    'volks'         : ('brand', 'Volkswagen'),
+    'chevy'         : ('brand', 'Chevrolet'),
+    'alcool'        : ('fuel_type', 'Etanol'),
+    'hatch'         : ('category', 'Hatchback'),
+    'hatches'       : ('category', 'Hatchback'),
+    'pickup'        : ('category', 'Picape'),
+    'pickups'       : ('category', 'Picape'),
+    'coupe'         : ('category', 'Cupê'),
+}
+
+INTENT_METRICS = {
+    'FIND_MAX'          : ('engine_power', 'DESC'),
+    'FIND_MIN'          : ('engine_power', 'ASC'),
+    'FIND_MAX_MILEAGE'  : ('mileage', 'DESC'),
+    'FIND_MIN_MILEAGE'  : ('mileage', 'ASC'),
+}
+SUPPORTED_INTENTS = {'COUNT', 'LIST_ALL', 'CALC_AVG', 'CALC_SUM', 'GROUP_COUNT', *INTENT_METRICS}
+
+# Palavras de sentido: uma que contradiz a ordenação da intenção ("menos potente" em FIND_MAX) vai para o LLM.
+DIRECTION_WORDS = {
+    'DESC'  : {'mais', 'maior', 'maxima', 'maximo', 'alta', 'alto', 'forte', 'extensa'},
+    'ASC'   : {'menos', 'menor', 'minima', 'minimo', 'baixa', 'baixo', 'fraco', 'curta'},
+}
+
+# O LOWER() do SQLite só dobra A-Z: o parâmetro é dobrado do mesmo jeito para casar com os índices em LOWER(col).
+_SQLITE_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+@dataclass(frozen=True)
+class TemplateSQL:
+    sql: str
+    params: Tuple[str, ...] = ()
+
+    @property
+    def rendered(self) -> str:
+
+        parts = self.sql.split("?")
+        out   = parts[0]
+
+        for value, part in zip(self.params, parts[1:]):
+            out += "'" + str(value).replace("'", "''") + "'" + part
+
+        return out
+
+
+def sqlite_lower(value: str) -> str:
+    return str(value).translate(_SQLITE_LOWER)
+
+
+def fold_text(text: str) -> str:
+
+    text = unicodedata.normalize("NFKD", str(text).lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+def inflections(word: str) -> Set[str]:
+
+    # Só a forma exata e o plural: trocar o gênero faria "pratos" casar com 'Prata'.
+    forms = {word, word + "s"}
+
+    if word.endswith("l"):
+        forms.add(word[:-1] + "is")
+    elif word.endswith("m"):
+        forms.add(word[:-1] + "ns")
+    elif word.endswith("r") or word.endswith("z"):
+        forms.add(word + "es")
+
+    return forms
+
+
+def _build_vocabulary_index() -> Dict[str, Tuple[str, str]]:
+
+    index: Dict[str, Tuple[str, str]] = {}
+
+    for brand in brands:
+        index[fold_text(brand)] = ('brand', brand)
+
+    for brand_models in models_by_brand.values():
+        for model in brand_models:
+            index[fold_text(model)] = ('model', model)
+
+    for column, values in (('color', colors), ('category', categories), ('fuel_type', fuel_types), ('transmission', transmissions)):
+        for value in values:
+            folded = fold_text(value)
+            forms  = inflections(folded) if " " not in folded else {folded}
+
+            for form in forms:
+                index.setdefault(form, (column, value))
+
+    index.update(EXTRA_SYNONYMS)
+
+    return index
+
+
+VOCABULARY_INDEX = _build_vocabulary_index()
+
+
+def _contains_phrase(text: str, phrases: List[str]) -> bool:
+    return any(re.search(rf"\b{re.escape(phrase)}\b", text) for phrase in phrases)
+
+
+def extract_filters(tokens: List[str]) -> Tuple[Dict[str, List[str]], Set[int]]:
+
+    filters: Dict[str, List[str]] = {}
+    used: Set[int]                = set()
+    i                             = 0
+
+    while i < len(tokens):
+        for size in range(MAX_PHRASE_TOKENS, 0, -1):
+            phrase = " ".join(tokens[i:i + size])
+
+            if len(tokens[i:i + size]) == size and phrase in VOCABULARY_INDEX:
+                column, value = VOCABULARY_INDEX[phrase]
+
+                if value not in filters.setdefault(column, []):
+                    filters[column].append(value)
+
+                used.update(range(i, i + size))
+                i += size
+                break
+        else:
+            i += 1
+
+    return filters, used
+
+
+def _find_group_column(tokens: List[str], used: Set[int]) -> Tuple[Optional[str], Set[int]]:
+
+    for i, token in enumerate(tokens):
+        if token not in ('por', 'cada'):
+            continue
+
+        j = i + 1
+
+        while j < len(tokens) and tokens[j] in GROUP_FILLER_WORDS:
+            j += 1
+
+        if j < len(tokens) and j not in used and tokens[j] in GROUP_WORDS:
+            return GROUP_WORDS[tokens[j]], {j}
+
+    return None, set()
+
+
+def _where_clause(filters: Dict[str, List[str]]) -> Tuple[str, Tuple[str, ...]]:
+
+    clauses: List[str] = []
+    params: List[str]  = []
+
+    for column in FILTER_COLUMNS:
+        values = filters.get(column)
+
+        if not values:
+            continue
+
+        if len(values) == 1:
+            clauses.append(f"LOWER({column}) = ?")
+        else:
+            clauses.append(f"LOWER({column}) IN ({', '.join('?' for _ in values)})")
+
+        params.extend(sqlite_lower(value) for value in values)
+
+    if not clauses:
+        return "", ()
+
+    return " WHERE " + " AND ".join(clauses), tuple(params)
+
+
+def build_template_sql(question: str, intent: str) -> Optional[TemplateSQL]:
+
+    if intent not in SUPPORTED_INTENTS:
+        return None
+
+    tokens = fold_text(question).split()
+
+    if _contains_phrase(" ".join(tokens), UNSUPPORTED_PHRASES):
+        return None
+
+    filters, used = extract_filters(tokens)
+
+    group_column, group_used = _find_group_column(tokens, used)
+
+    # "quantos carros por cor" classificado como COUNT: o agrupamento seria descartado em silêncio.
+    if intent != 'GROUP_COUNT' and group_column is not None:
+        return None
+
+    if intent in INTENT_METRICS:
+        opposite = 'ASC' if INTENT_METRICS[intent][1] == 'DESC' else 'DESC'
+
+        if any(token in DIRECTION_WORDS[opposite] for token in tokens):
+            return None
+
+    # "quantos carros tem o maior motor" (COUNT) ou "a menor média" (CALC_AVG): o template perderia o sentido.
+    elif any(token in DIRECTION_WORDS['ASC'] | DIRECTION_WORDS['DESC'] for token in tokens):
+        return None
+
+    # "qual a marca com mais carros" (FIND_MAX) pergunta por uma coluna, não por um carro ou uma métrica.
+    if intent in INTENT_METRICS or intent in ('CALC_AVG', 'CALC_SUM'):
+        if any(i not in used and token in GROUP_WORDS and token not in METRIC_WORDS for i, token in enumerate(tokens)):
+            return None
+
+    if intent == 'GROUP_COUNT':
+        if group_column is None:
+            return None
+
+        # Agrupamento em mais de um nível ("por cor e marca") fica com o LLM.
+        other_groups = {
+            GROUP_WORDS[token] for i, token in enumerate(tokens)
+            if i not in used and i not in group_used and token in GROUP_WORDS
+        }
+
+        if other_groups - {group_column}:
+            return None
+
+        used |= group_used
+
+    metrics = set()
+    for i, token in enumerate(tokens):
+        if i not in used and token in METRIC_WORDS:
+            metrics.add(METRIC_WORDS[token])
+            used.add(i)
+
+    for i, token in enumerate(tokens):
+        if i not in used and token not in HARMLESS_WORDS:
+            return None
+
+    where, params = _where_clause(filters)
+
+    if intent == 'COUNT' and not metrics:
+        return TemplateSQL(f"SELECT COUNT(*) AS total FROM automobiles{where};", params)
+
+    if intent == 'LIST_ALL' and not metrics:
+        return TemplateSQL(f"SELECT * FROM automobiles{where};", params)
+
+    if intent in ('CALC_AVG', 'CALC_SUM') and len(metrics) == 1:
+        (column,)   = metrics
+        aggregate   = "AVG" if intent == 'CALC_AVG' else "SUM"
+        alias       = ("media_" if intent == 'CALC_AVG' else "soma_") + column
+
+        return TemplateSQL(f"SELECT {aggregate}({column}) AS {alias} FROM automobiles{where};", params)
+
+    if intent in INTENT_METRICS:
+        column, direction = INTENT_METRICS[intent]
+
+        if metrics <= {column}:
+            return TemplateSQL(f"SELECT * FROM automobiles{where} ORDER BY {column} {direction} LIMIT 1;", params)
+
+    if intent == 'GROUP_COUNT' and metrics <= {group_column}:
+        return TemplateSQL(
+            f"SELECT {group_column}, COUNT(*) AS total FROM automobiles{where} "
+            f"GROUP BY {group_column} ORDER BY total DESC;",
+            params
+        )
+
+    return None
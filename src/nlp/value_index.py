@@ -0,0 +1,288 @@
+import  os
+import  sqlite3
+import  difflib
+import  threading
+from    typing                      import Dict, List, Optional, Set, Tuple
+from    pathlib                     import Path
+from    collections                 import Counter
+from    dataclasses                 import dataclass, field
+from    src.database.pool           import get_pool
+from    src.database.schema_catalog import file_identity
+from    src.nlp.sql_templates       import (
+    fold_text,
+    inflections,
+    sqlite_lower,
+    EXTRA_SYNONYMS,
+    HARMLESS_WORDS,
+    METRIC_WORDS,
+    GROUP_WORDS,
+    MAX_PHRASE_TOKENS
+)
+
+
+TABLE_NAME                  = "automobiles"
+VALUE_INDEX_MAX_DISTINCT    = int(os.getenv("VALUE_INDEX_MAX_DISTINCT", "1000"))
+VALUE_INDEX_MAX_UNIQUENESS  = 0.9
+VALUE_INDEX_MIN_SIMILARITY  = float(os.getenv("VALUE_INDEX_MIN_SIMILARITY", "0.8"))
+FUZZY_MIN_TOKEN_LENGTH      = 4
+FUZZY_CACHE_SIZE            = 10000
+
+# Palavras que o template já entende como métrica/agrupamento/ligação nunca são corrigidas para um valor.
+NON_VALUE_WORDS = HARMLESS_WORDS | set(METRIC_WORDS) | set(GROUP_WORDS)
+
+Match = Tuple[str, str]
+
+
+@dataclass
+class _IndexState:
+    values: Dict[str, Set[str]]                             = field(default_factory=dict)
+    exact: Dict[str, Set[Match]]                            = field(default_factory=dict)
+    trigrams: Dict[str, Set[str]]                           = field(default_factory=dict)
+    fuzzy_cache: Dict[str, Optional[Tuple[str, float]]]     = field(default_factory=dict)
+
+    def copy(self) -> "_IndexState":
+
+        # Cópia dos conjuntos: refresh() altera a cópia enquanto resolve() segue lendo o estado antigo.
+        return _IndexState(
+            dict(self.values),
+            {key: set(matches) for key, matches in self.exact.items()},
+            {gram: set(keys) for gram, keys in self.trigrams.items()},
+        )
+
+
+@dataclass(frozen=True)
+class ValueMatch:
+    column: str
+    value: str
+    termo: str
+    similaridade: float = 1.0
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ValueIndex:
+
+    def __init__(self, db_path: Path):
+
+        self.db_path            = Path(db_path)
+        self._lock              = threading.Lock()
+        self._identity          = None
+        self._state             = _IndexState()
+        self.rebuilds           = 0
+        self.columns_changed    = 0
+
+    def _categorical_values(self, conn: sqlite3.Connection) -> Dict[str, Set[str]]:
+
+        columns     = [row[1] for row in conn.execute(f"PRAGMA table_info({TABLE_NAME})") if row[2].upper() == "TEXT"]
+        (rows,)     = conn.execute(f"SELECT COUNT(*) FROM {TABLE_NAME}").fetchone()
+        values      = {}
+
+        for column in columns:
+            distinct = [
+                row[0] for row in conn.execute(
+                    f'SELECT DISTINCT "{column}" FROM {TABLE_NAME} WHERE "{column}" IS NOT NULL LIMIT ?',
+                    (VALUE_INDEX_MAX_DISTINCT + 1,)
+                )
+            ]
+
+            # Placas e outros identificadores (quase um valor por linha) não são categorias.
+            if len(distinct) > VALUE_INDEX_MAX_DISTINCT or (rows > 1 and len(distinct) > VALUE_INDEX_MAX_UNIQUENESS * rows):
+                continue
+
+            values[column] = {str(value) for value in distinct}
+
+        return values
+
+    def _keys_for(self, column: str, value: str, word_counts: Counter) -> Set[str]:
+
+        folded  = fold_text(value)
+        keys    = inflections(folded) if " " not in folded else {folded}
+
+        # "mercedes" -> 'Mercedes-Benz': cada palavra de um valor composto vale sozinha se não for ambígua.
+        if " " in folded:
+            for word in folded.split():
+                if len(word) >= FUZZY_MIN_TOKEN_LENGTH and word_counts[word] == 1 and word not in NON_VALUE_WORDS:
+                    keys.add(word)
+
+        keys |= {alias for alias, (alias_column, target) in EXTRA_SYNONYMS.items() if alias_column == column and target == value}
+
+        return keys
+
+    def _add(self, state: _IndexState, column: str, value: str, word_counts: Counter):
+
+        for key in self._keys_for(column, value, word_counts):
+            state.exact.setdefault(key, set()).add((column, value))
+
+            for gram in _trigrams(key):
+                state.trigrams.setdefault(gram, set()).add(key)
+
+    def _remove(self, state: _IndexState, column: str, value: str):
+
+        for key in [key for key, matches in state.exact.items() if (column, value) in matches]:
+            state.exact[key].discard((column, value))
+
+            if not state.exact[key]:
+                del state.exact[key]
+
+                for gram in _trigrams(key):
+                    state.trigrams.get(gram, set()).discard(key)
+
+    def refresh(self) -> bool:
+
+        identity = file_identity(self.db_path)
+
+        # Um stat por consulta: o índice só é tocado quando o arquivo do banco mudou.
+        if identity is None or identity == self._identity:
+            return False
+
+        with self._lock, get_pool(self.db_path).connection() as conn:
+            # Relida dentro do lock: outra thread pode ter acabado de reindexar a mesma versão do arquivo.
+            identity = file_identity(self.db_path)
+
+            if identity == self._identity:
+                return False
+
+            current = self._categorical_values(conn)
+            state   = self._state.copy()
+
+            # Incremental: só os valores que entraram ou saíram de cada coluna são reindexados.
+            for column in set(state.values) | set(current):
+                old, new = state.values.get(column, set()), current.get(column, set())
+
+                if old == new:
+                    continue
+
+                word_counts = Counter(word for value in new for word in set(fold_text(value).split()))
+
+                for value in old - new:
+                    self._remove(state, column, value)
+
+                # Um valor composto que entra ou sai muda a ambiguidade das palavras dos outros: a coluna é refeita.
+                if any(" " in fold_text(value) for value in old ^ new):
+                    for value in old & new:
+                        self._remove(state, column, value)
+                    for value in new:
+                        self._add(state, column, value, word_counts)
+                else:
+                    for value in new - old:
+                        self._add(state, column, value, word_counts)
+
+                self.columns_changed += 1
+
+            # Uma única atribuição troca o índice: resolve() nunca vê um estado pela metade.
+            state.values    = current
+            self._state     = state
+            self._identity  = identity
+            self.rebuilds  += 1
+
+            return True
+
+    def _fuzzy(self, state: _IndexState, token: str) -> Optional[Tuple[str, float]]:
+
+        if token in state.fuzzy_cache:
+            return state.fuzzy_cache[token]
+
+        candidates  = {}
+
+        # Só chaves de uma palavra: "classe" não pode virar 'Classe A' por semelhança.
+        for gram in _trigrams(token):
+            for key in state.trigrams.get(gram, ()):
+                if " " not in key:
+                    candidates[key] = candidates.get(key, 0) + 1
+
+        best, best_score = None, 0.0
+
+        # Só os candidatos que dividem mais trigramas passam pelo difflib.
+        for key, _ in sorted(candidates.items(), key=lambda item: -item[1])[:8]:
+            score = difflib.SequenceMatcher(None, token, key).ratio()
+
+            if score > best_score:
+                best, best_score = key, score
+
+        result = (best, best_score) if best_score >= VALUE_INDEX_MIN_SIMILARITY else None
+
+        if len(state.fuzzy_cache) >= FUZZY_CACHE_SIZE:
+            state.fuzzy_cache.clear()
+
+        state.fuzzy_cache[token] = result
+
+        return result
+
+    def resolve(self, question: str) -> List[ValueMatch]:
+
+        self.refresh()
+
+        state   = self._state
+        tokens  = fold_text(question).split()
+        matches = []
+        seen    = set()
+        i       = 0
+
+        while i < len(tokens):
+            for size in range(MAX_PHRASE_TOKENS, 0, -1):
+                phrase = " ".join(tokens[i:i + size])
+
+                if len(tokens[i:i + size]) == size and phrase in state.exact:
+                    found = [(column, value, phrase, 1.0) for column, value in sorted(state.exact[phrase])]
+                    i    += size
+                    break
+            else:
+                token = tokens[i]
+                found = []
+
+                if len(token) >= FUZZY_MIN_TOKEN_LENGTH and not token.isdigit() and token not in NON_VALUE_WORDS:
+                    fuzzy = self._fuzzy(state, token)
+
+                    if fuzzy:
+                        key, score = fuzzy
+                        found      = [(column, value, token, round(score, 3)) for column, value in sorted(state.exact[key])]
+
+                i += 1
+
+            for column, value, term, score in found:
+                if (column, value) not in seen:
+                    seen.add((column, value))
+                    matches.append(ValueMatch(column, value, term, score))
+
+        return matches
+
+    def stats(self) -> Dict[str, int]:
+
+        state = self._state
+
+        return {
+            "colunas"           : len(state.values),
+            "valores"           : sum(len(values) for values in state.values.values()),
+            "chaves"            : len(state.exact),
+            "reconstrucoes"     : self.rebuilds,
+            "colunas_alteradas" : self.columns_changed,
+        }
+
+
+def _sql_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def format_matches(matches: List[ValueMatch]) -> str:
+
+    # Vai para a mensagem do usuário já no formato da regra do LOWER(coluna): o LLM copia a comparação
+    # pronta em vez de adivinhar a grafia ou misturar 'Mercedes-Benz' com LOWER(brand).
+    return "; ".join(f"LOWER({m.column}) = {_sql_literal(sqlite_lower(m.value))} (\"{m.termo}\")" for m in matches)
+
+
+_indexes: Dict[str, ValueIndex] = {}
+_indexes_lock                   = threading.Lock()
+
+
+def get_value_index(db_path: Path) -> ValueIndex:
+
+    key = str(Path(db_path).resolve())
+
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = ValueIndex(Path(db_path))
+
+        return _indexes[key]
@@ -0,0 +1,60 @@
+
+import pandas as pd
+from src.nlp.answer_rendering import render_answer
+
+
+def test_render_answer_formats_scalars_and_small_results():
+
+    assert render_answer("COUNT", pd.DataFrame({"COUNT(*)": [1234]})) == \
+        "Foram encontrados 1.234 carros que correspondem à pergunta."
+    assert render_answer("CALC_AVG", pd.DataFrame({"AVG(engine_power)": [2.456]})) == \
+        "A média de potência do motor é 2,46."
+    assert render_answer(
+        "FIND_MAX_MILEAGE",
+        pd.DataFrame([{"brand": "Ford", "model": "Ka", "color": "Azul", "mileage": 199000}]),
+        sql="SELECT * FROM automobiles ORDER BY mileage DESC LIMIT 1;"
+    ) == \
+        "O carro com maior quilometragem é o Ford Ka (Azul), com 199.000 km rodados."
+    assert render_answer("GROUP_COUNT", pd.DataFrame({"color": ["Azul", "Preto"], "total": [3, 2]})) == \
+        "Distribuição de carros por cor: Azul: 3; Preto: 2."
+
+
+def test_render_answer_defers_ambiguous_results_to_llm():
+
+    big_list = pd.DataFrame({"brand": ["Ford"] * 50, "model": ["Ka"] * 50})
+
+    assert render_answer("COUNT", pd.DataFrame({"COUNT(DISTINCT model)": [5]})) is None
+    assert render_answer("CALC_AVG", pd.DataFrame({"SUM(mileage)": [10]})) is None
+    assert render_answer("LIST_ALL", big_list) is None
+    assert render_answer("COUNT", "Erro ao executar a consulta SQL: no such column") is None
+    assert render_answer("COUNT", pd.DataFrame({"COUNT(*)": [3]}), policy="llm") is None
+    assert render_answer("LIST_ALL", big_list, policy="local").startswith("A consulta retornou 50 linhas.")
+
+
+def test_render_answer_only_counts_cars_for_count_star():
+
+    total = pd.DataFrame({"total": [12]})
+
+    assert render_answer("COUNT", total, sql="SELECT COUNT(*) AS total FROM automobiles WHERE brand = 'Distinct'") == \
+        "Foram encontrados 12 carros que correspondem à pergunta."
+    assert render_answer("COUNT", total, sql="SELECT COUNT(DISTINCT model) AS total FROM automobiles") is None
+    assert render_answer("COUNT", total, sql="SELECT COUNT(color) AS total FROM automobiles") is None
+    assert render_answer(
+        "GROUP_COUNT",
+        pd.DataFrame({"brand": ["Ford"], "total": [4]}),
+        sql="SELECT brand, COUNT(DISTINCT model) AS total FROM automobiles GROUP BY brand"
+    ) is None
+
+
+def test_render_extreme_requires_sql_ordered_by_the_intent_metric():
+
+    car = pd.DataFrame([{"brand": "Ford", "model": "Ka", "engine_power": 1.0, "doors": 4}])
+
+    assert render_answer("FIND_MAX", car, sql="SELECT * FROM automobiles ORDER BY engine_power DESC LIMIT 1").startswith(
+        "O carro com maior potência do motor é o Ford Ka"
+    )
+    assert render_answer("FIND_MAX", car, sql="SELECT * FROM automobiles WHERE engine_power = (SELECT MAX(engine_power) FROM automobiles)") is not None
+    assert render_answer("FIND_MAX", car, sql="SELECT * FROM automobiles ORDER BY doors DESC LIMIT 1") is None
+    assert render_answer("FIND_MAX", car, sql="SELECT * FROM automobiles ORDER BY price DESC LIMIT 1") is None
+    assert render_answer("FIND_MAX", car, sql="SELECT * FROM automobiles ORDER BY engine_power LIMIT 1") is None
+    assert render_answer("FIND_MIN", car, sql="SELECT * FROM automobiles ORDER BY engine_power ASC LIMIT 1") is not None
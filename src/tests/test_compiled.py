@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from types                  import SimpleNamespace
+from sklearn.pipeline       import Pipeline
+from sklearn.linear_model   import LogisticRegression
+from sklearn.preprocessing  import LabelEncoder
+from src.nlp.preprocessing  import build_preprocess_pipeline
+from src.mlp.compiled       import export_compiled_model, CompiledIntentModel, _multi_class_mode
+
+
+QUESTIONS = pd.Series([
+    "quantos carros existem", "qual o total de carros da ford", "quantos carros pretos temos",
+    "liste todos os carros", "mostre os carros da fiat", "quais carros são vermelhos",
+    "qual a média de quilometragem", "média da potência dos carros", "qual a potência média da honda",
+])
+INTENTS = ["COUNT"] * 3 + ["LIST_ALL"] * 3 + ["CALC_AVG"] * 3
+
+
+# liblinear com 3+ classes é coberto pelo teste de um-contra-todos abaixo: o sklearn >= 1.8 não o treina mais.
+@pytest.mark.parametrize("n_classes, solver", [(3, "lbfgs"), (2, "lbfgs"), (2, "liblinear")])
+def test_compiled_model_matches_sklearn_pipeline(tmp_path, n_classes, solver):
+
+    rows            = len(QUESTIONS) if n_classes == 3 else 6
+    label_encoder   = LabelEncoder().fit(INTENTS[:rows])
+    pipeline        = Pipeline([
+        ('preprocessor', build_preprocess_pipeline()),
+        ('classifier', LogisticRegression(solver=solver, max_iter=1000))
+    ])
+
+    pipeline.fit(QUESTIONS[:rows], label_encoder.transform(INTENTS[:rows]))
+    export_compiled_model(pipeline, label_encoder, tmp_path)
+
+    compiled = CompiledIntentModel(tmp_path)
+    probe    = ["quantos carros da ford", "mostre os carros", "palavras desconhecidas"]
+
+    np.testing.assert_allclose(compiled.predict_proba(probe), pipeline.predict_proba(pd.Series(probe)), atol=1e-5)
+
+    intent, probability = compiled.top_k("quantos carros da ford", k=1)[0]
+    assert intent == "COUNT" and 0 < probability <= 1
+    assert list(compiled.labels.inverse_transform(compiled.classes_)) == list(label_encoder.classes_)
+
+
+def test_liblinear_multiclass_matches_one_vs_rest_probabilities(tmp_path):
+
+    label_encoder   = LabelEncoder().fit(INTENTS)
+    pipeline        = Pipeline([
+        ('preprocessor', build_preprocess_pipeline()),
+        ('classifier', LogisticRegression(max_iter=1000))
+    ])
+
+    pipeline.fit(QUESTIONS, label_encoder.transform(INTENTS))
+
+    # Mesmos coeficientes, lidos como um modelo liblinear: o sklearn antigo normalizava sigmoides (_predict_proba_lr).
+    classifier          = pipeline.named_steps['classifier']
+    classifier.solver   = "liblinear"
+    export_compiled_model(pipeline, label_encoder, tmp_path)
+
+    probe    = ["quantos carros da ford", "mostre os carros", "palavras desconhecidas"]
+    features = pipeline.named_steps['preprocessor'].transform(pd.Series(probe))
+
+    assert _multi_class_mode(classifier) == "ovr"
+    assert _multi_class_mode(SimpleNamespace(classes_=np.arange(2), solver="liblinear")) == "binary"
+    np.testing.assert_allclose(CompiledIntentModel(tmp_path).predict_proba(probe), classifier._predict_proba_lr(features), atol=1e-5)
@@ -0,0 +1,45 @@
+import asyncio
+import sqlite3
+import threading
+
+from src.core.tracing       import trace, span
+from src.database.pool      import ReadOnlyPool
+from src.database.executor  import SQLExecutor
+
+
+def test_workers_keep_their_own_connection_and_trace_context(tmp_path):
+
+    db_path = tmp_path / "executor.db"
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE automobiles (id INTEGER PRIMARY KEY, brand TEXT)")
+        conn.executemany("INSERT INTO automobiles (brand) VALUES (?)", [("Ford",), ("Fiat",)])
+
+    pool     = ReadOnlyPool(db_path, size=1)
+    executor = SQLExecutor(workers=2)
+    seen     = {}
+
+    def query(i):
+        with pool.connection() as conn:
+            seen.setdefault(threading.current_thread().name, set()).add(id(conn))
+            return conn.execute("SELECT COUNT(*) FROM automobiles WHERE id > ?", (i % 2,)).fetchone()[0]
+
+    async def run():
+        with trace("perguntar") as current:
+            with span("execucao") as execution:
+                counts = await asyncio.gather(*(executor.run(query, i) for i in range(20)))
+
+        return current, execution, counts
+
+    try:
+        current, execution, counts = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert counts == [2, 1] * 10
+    # Cada worker abriu uma conexão e a manteve; o limite de 1 do pool não serializou os workers.
+    assert pool.opened == len(seen) <= 2
+    assert all(len(connections) == 1 for connections in seen.values())
+    assert "espera_executor_ms" in execution.attributes
+    assert executor.stats()["concluidas"] == 20
+    assert (executor.stats()["na_fila"], executor.stats()["em_execucao"]) == (0, 0)
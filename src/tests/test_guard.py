@@ -0,0 +1,62 @@
+import time
+import sqlite3
+import pytest
+
+from src.database.pool  import ReadOnlyPool
+from src.database.guard import QueryRejected
+
+
+@pytest.fixture
+def pool(tmp_path):
+
+    db_path = tmp_path / "guard.db"
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE automobiles (id INTEGER PRIMARY KEY, brand TEXT)")
+        conn.executemany("INSERT INTO automobiles (brand) VALUES (?)", [(f"marca {i}",) for i in range(2000)])
+
+    return ReadOnlyPool(db_path, size=1)
+
+
+@pytest.mark.parametrize("sql, code", [
+    ("   ;",                                                     "vazia"),
+    ("SELECT * FROM automobiles WHERE brand = 'Ford",           "incompleta"),
+    ("SELECT 1; SELECT 2",                                      "multiplas_instrucoes"),
+    ("DELETE FROM automobiles",                                 "somente_leitura"),
+    ("PRAGMA query_only = OFF",                                 "somente_leitura"),
+    ("ATTACH DATABASE ':memory:' AS outro",                     "somente_leitura"),
+    ("SELECT modelo FROM automobiles",                          "invalida"),
+])
+def test_rejects_before_execution(pool, sql, code):
+
+    with pytest.raises(QueryRejected) as error:
+        pool.fetch(sql)
+
+    assert error.value.code == code
+    assert error.value.to_dict()["codigo"] == code
+
+
+def test_budget_aborts_runaway_queries_and_pool_recovers(pool):
+
+    cartesian = "SELECT COUNT(*) FROM automobiles a, automobiles b, automobiles c"
+    started   = time.perf_counter()
+
+    with pytest.raises(QueryRejected) as error:
+        pool.fetch(cartesian, timeout_s=0.2, max_steps=0)
+
+    assert error.value.code == "tempo_esgotado"
+    assert time.perf_counter() - started < 2
+
+    with pytest.raises(QueryRejected) as error:
+        pool.fetch(cartesian, timeout_s=0, max_steps=100000)
+
+    assert error.value.code == "passos_esgotados"
+
+    # A mesma conexão volta ao pool sem authorizer nem progress handler.
+    result = pool.fetch("SELECT brand FROM automobiles", max_rows=10)
+
+    assert (result.row_count, len(result.frame), result.truncated) == (2000, 10, True)
+    assert pool.opened == 1
+
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
@@ -0,0 +1,70 @@
+import sqlite3
+from src.database.query_log     import QueryLog, is_full_scan
+from src.database.pool          import get_pool
+from src.database.index_advisor import extract_candidates, advise
+
+
+COLUMNS = {"brand", "color", "engine_power", "doors"}
+
+
+def test_extract_candidates_finds_filters_groups_and_top_n():
+
+    sql = (
+        "SELECT color, COUNT(*) FROM automobiles "
+        "WHERE LOWER(brand) = 'ford' AND doors >= 4 AND LOWER(model) LIKE '%ka%' "
+        "GROUP BY color"
+    )
+
+    assert extract_candidates(sql, COLUMNS) == {("brand", True), ("doors", False), ("color", False)}
+    assert extract_candidates(
+        "SELECT brand FROM automobiles ORDER BY engine_power DESC LIMIT 1", COLUMNS
+    ) == {("engine_power", False)}
+    assert extract_candidates("SELECT * FROM automobiles WHERE color = 'brand = x'", COLUMNS) == {("color", False)}
+
+
+def test_advisor_proposes_and_creates_lower_index(tmp_path):
+
+    db_path = tmp_path / "advisor.db"
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE automobiles (id INTEGER PRIMARY KEY, brand TEXT, color TEXT)")
+        conn.executemany(
+            "INSERT INTO automobiles (brand, color) VALUES (?, ?)",
+            [(b, c) for b in ("Ford", "Fiat", "Honda") for c in ("Preto", "Prata")] * 50
+        )
+
+    log  = QueryLog(tmp_path / "query_log.db")
+    pool = get_pool(db_path)
+    sql  = "SELECT COUNT(*) FROM automobiles WHERE LOWER(brand) = 'ford'"
+
+    plan = pool.explain(sql)
+    assert is_full_scan(plan)
+    log.record(sql, (), 0.01, 1, plan, "llm")
+
+    report = advise(log, db_path, apply=True)
+
+    assert report["propostas"][0]["indice"] == "idx_automobiles_lower_brand"
+    assert "USING INDEX idx_automobiles_lower_brand" in report["tempos"][0]["plano"]
+    assert advise(log, db_path)["propostas"] == [], "Índices já criados não devem ser sugeridos de novo."
+
+    log.close()
+
+
+def test_query_log_batches_writes_and_keeps_only_recent_rows(tmp_path):
+
+    log = QueryLog(tmp_path / "query_log.db", max_rows=5, sample_rate=0.0, slow_ms=10, batch_size=4)
+
+    for i in range(3):
+        log.record(f"SELECT {i}", (), 0.001, 1, "SCAN automobiles")
+
+    with sqlite3.connect(tmp_path / "query_log.db") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM query_log").fetchone()[0] == 0, "Abaixo do lote nada vai ao disco."
+
+    for i in range(3, 12):
+        log.record(f"SELECT {i}", (), 0.001, 1, "SCAN automobiles")
+
+    assert log.stats() == {"consultas": 5, "full_scans": 5}
+    assert [entry["sql"] for entry in log.entries()] == [f"SELECT {i}" for i in range(11, 6, -1)]
+    assert log.sampled(0.02) and not log.sampled(0.001), "Lentas entram sempre; sem amostragem as rápidas ficam de fora."
+
+    log.close()
@@ -0,0 +1,111 @@
+import asyncio
+import numpy    as np
+import pandas   as pd
+
+from src.core.mcp_server    import ToolDispatcher, build_server, to_jsonable, _wrap_tool, _server_class
+from src.database.results   import QueryResult
+
+
+def test_dispatcher_queues_rejects_and_times_out():
+
+    async def run():
+        dispatcher  = ToolDispatcher(max_concurrency=2, max_queue=1, timeout_s=0.5)
+        release     = asyncio.Event()
+        peak        = 0
+
+        async def slow_call():
+            nonlocal peak
+            peak = max(peak, dispatcher.running)
+            await release.wait()
+            return "ok"
+
+        # 2 em execução + 1 na fila cabem; a quarta chamada é recusada na hora.
+        accepted = [asyncio.create_task(dispatcher.submit("perguntar", slow_call)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        rejected = await dispatcher.submit("perguntar", slow_call)
+
+        assert (dispatcher.running, dispatcher.waiting) == (2, 1)
+
+        release.set()
+        results = await asyncio.gather(*accepted)
+
+        async def stuck_call():
+            await asyncio.sleep(10)
+
+        expired = await dispatcher.submit("perguntar", stuck_call)
+        drained = await dispatcher.drain(timeout_s=1)
+        closed  = await dispatcher.submit("perguntar", slow_call)
+
+        return dispatcher, peak, results, rejected, expired, drained, closed
+
+    dispatcher, peak, results, rejected, expired, drained, closed = asyncio.run(run())
+
+    assert peak == 2
+    assert results == ["ok", "ok", "ok"]
+    assert "Servidor ocupado" in rejected
+    assert "tempo limite" in expired
+    assert drained and "encerramento" in closed
+    assert dispatcher.stats() == {
+        "em_execucao"       : 0,
+        "na_fila"           : 0,
+        "concluidas"        : 3,
+        "recusadas"         : 2,
+        "expiradas"         : 1,
+        "max_concorrencia"  : 2,
+        "max_fila"          : 1,
+    }
+
+
+def test_server_exposes_tools_without_callbacks():
+
+    tools  = {tool.name: tool for tool in asyncio.run(build_server().list_tools())}
+    ask    = tools["perguntar"]
+    schema = getattr(ask, "input_schema", None) or ask.inputSchema
+
+    assert {"perguntar", "perguntar_lote", "metricas", "estado_servidor"} <= set(tools)
+    assert set(schema["properties"]) == {"pergunta", "modo_resposta"}
+
+
+def test_async_generator_tools_stream_items_as_progress():
+
+    import mcp
+
+    async def batch(n: int):
+        for i in range(n):
+            yield {"pergunta": i}
+
+    async def run():
+        server   = _server_class()(name="teste")
+        progress = []
+
+        async def on_progress(value, total, message):
+            progress.append((value, message))
+
+        server.add_tool(_wrap_tool("perguntar_lote", batch, ToolDispatcher()), name="perguntar_lote")
+
+        async with mcp.Client(server) as client:
+            result = await client.call_tool("perguntar_lote", {"n": 3}, progress_callback=on_progress)
+
+        return progress, result
+
+    progress, result = asyncio.run(run())
+
+    # Cada item chega como notificação antes do fim do lote; a resposta final mantém a lista completa.
+    assert progress == [(1, '{"pergunta": 0}'), (2, '{"pergunta": 1}'), (3, '{"pergunta": 2}')]
+    assert len(result.content) == 3 and not result.is_error
+
+
+def test_query_results_become_json():
+
+    frame  = pd.DataFrame({"brand": ["ford", "fiat"], "total": np.array([3, 2], dtype=np.int64)})
+    result = QueryResult("SELECT 1", (), ["brand", "total"], frame, 2, False)
+
+    assert to_jsonable({"resultado": result, "confiança": np.float32(0.5)}) == {
+        "resultado" : {
+            "colunas"       : ["brand", "total"],
+            "total_linhas"  : 2,
+            "truncado"      : False,
+            "linhas"        : [{"brand": "ford", "total": 3}, {"brand": "fiat", "total": 2}],
+        },
+        "confiança" : 0.5,
+    }
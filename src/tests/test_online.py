@@ -0,0 +1,46 @@
+import pandas as pd
+from src.core.server    import AppContext
+from src.core.batch     import classify_questions
+from src.mlp.online     import train_incremental, append_feedback
+
+
+QUESTIONS = [
+    ("quantos carros existem", "COUNT"),
+    ("qual o total de carros da ford", "COUNT"),
+    ("quantos carros pretos temos", "COUNT"),
+    ("liste todos os carros", "LIST_ALL"),
+    ("mostre os carros da fiat", "LIST_ALL"),
+    ("quais carros são vermelhos", "LIST_ALL"),
+]
+
+
+def test_incremental_training_updates_and_hot_swaps(tmp_path):
+
+    dataset     = tmp_path / "questions.csv"
+    feedback    = tmp_path / "feedback.csv"
+    model       = tmp_path / "online.joblib"
+
+    pd.DataFrame(QUESTIONS, columns=["question", "intent"]).to_csv(dataset, index=False)
+
+    first = train_incremental(dataset, feedback, model)
+    assert first["modo"] == "bootstrap" and first["linhas_treinadas"] == len(QUESTIONS)
+
+    append_feedback("conte os carros automáticos", "COUNT", feedback)
+    second = train_incremental(dataset, feedback, model)
+    assert second["modo"] == "incremental" and second["linhas_treinadas"] == 1
+
+    # Intenção nunca vista não cabe no partial_fit: o modelo é refeito com todas as linhas.
+    append_feedback("qual a média de quilometragem", "CALC_AVG", feedback)
+    third = train_incremental(dataset, feedback, model)
+    assert third["modo"] == "bootstrap" and "CALC_AVG" in third["label_encoder"].classes_
+
+    ctx = AppContext()
+    ctx.swap_model(first["pipeline"], first["label_encoder"])
+    snapshot = ctx.model_snapshot()
+    ctx.swap_model(third["pipeline"], third["label_encoder"])
+
+    assert snapshot[0] is first["pipeline"], "Quem já pegou o snapshot continua com o modelo antigo."
+    assert ctx.model_snapshot()[0] is third["pipeline"]
+
+    intents, confidences = classify_questions(*ctx.model_snapshot(), ["quantos carros existem"])
+    assert intents[0] in third["label_encoder"].classes_ and 0 < confidences[0] <= 1
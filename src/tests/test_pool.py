@@ -0,0 +1,102 @@
+
+import os
+import sqlite3
+import pytest
+from src.database.pool    import ReadOnlyPool
+from src.database.results import summarize_for_prompt
+
+
+def _create_db(db_path, brand):
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE automobiles (id INTEGER PRIMARY KEY, brand TEXT)")
+        conn.execute("INSERT INTO automobiles (brand) VALUES (?)", (brand,))
+
+
+def test_pool_reuses_read_only_connections(tmp_path):
+
+    db_path = tmp_path / "pool.db"
+    _create_db(db_path, "Ford")
+
+    pool    = ReadOnlyPool(db_path, size=2)
+
+    for _ in range(5):
+        assert pool.read_dataframe("SELECT brand FROM automobiles WHERE brand = ?", ("Ford",)).iat[0, 0] == "Ford"
+
+    assert pool.opened == 1, "Consultas sequenciais deveriam reaproveitar a mesma conexão."
+
+    with pool.connection() as conn:
+        # Só leitura também no journal_mode: quem passa o banco para WAL é o popular_banco.
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO automobiles (brand) VALUES ('Fiat')")
+
+
+def test_pool_reopens_when_database_file_is_replaced(tmp_path):
+
+    db_path = tmp_path / "pool.db"
+    _create_db(db_path, "Ford")
+
+    pool    = ReadOnlyPool(db_path)
+
+    assert pool.read_dataframe("SELECT brand FROM automobiles").iat[0, 0] == "Ford"
+
+    replacement = tmp_path / "replacement.db"
+    _create_db(replacement, "Fiat")
+    os.replace(replacement, db_path)
+
+    assert pool.read_dataframe("SELECT brand FROM automobiles").iat[0, 0] == "Fiat"
+
+
+def test_pool_fetch_caps_rows_and_pages_full_result(tmp_path):
+
+    db_path = tmp_path / "pool.db"
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE automobiles (id INTEGER PRIMARY KEY, brand TEXT, license_plate TEXT, mileage INTEGER)")
+        conn.executemany(
+            "INSERT INTO automobiles (brand, license_plate, mileage) VALUES (?, ?, ?)",
+            [("Ford", f"AAA{i:04d}", i) for i in range(1000)]
+        )
+
+    pool    = ReadOnlyPool(db_path, size=1)
+    result  = pool.fetch("SELECT brand, license_plate, mileage FROM automobiles ORDER BY id", max_rows=100, chunk_size=30)
+    summary = summarize_for_prompt(result, token_budget=50)
+
+    assert len(result.frame) == 100
+    assert result.truncated
+    assert result.row_count == 1000
+    assert result.aggregates["mileage"]["max"] == 999
+    assert result.aggregates["brand"] == {"distintos": 1}
+    assert "license_plate" not in result.aggregates, "Identificadores únicos não entram nos agregados."
+
+    pages = result.pages(250)
+
+    assert len(next(pages)) == 250
+    # Pool de uma conexão: com o gerador aberto ela precisa estar livre para outra consulta.
+    assert pool.fetch("SELECT COUNT(*) FROM automobiles").frame.iat[0, 0] == 1000
+    assert [p["mileage"].iat[0] for p in pages] == [250, 500, 750]
+    assert sum(len(page) for page in result.pages(300)) == 1000
+    assert summary.startswith("Total de linhas: 1000")
+    assert len(summary) < 400, "O resumo deveria respeitar o orçamento de tokens."
+
+
+def test_bulk_generator_is_reproducible_and_indexed(tmp_path):
+
+    from src.database.populate_db import create_database, iter_chunks
+
+    serial   = [row for chunk in iter_chunks(250, 7, 100, workers=1) for row in chunk]
+    parallel = [row for chunk in iter_chunks(250, 7, 100, workers=2) for row in chunk]
+
+    assert serial == parallel, "A mesma semente deve gerar os mesmos dados com qualquer número de processos."
+
+    db_path = tmp_path / "bulk.db"
+    report  = create_database(250, seed=7, chunk_size=100, workers=1, db_path=db_path)
+
+    assert report["linhas"] == 250
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM automobiles").fetchone()[0] == 250
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert "idx_automobiles_lower_brand" in {row[1] for row in conn.execute("PRAGMA index_list(automobiles)")}
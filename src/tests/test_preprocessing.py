@@ -0,0 +1,32 @@
+import pandas as pd
+from src.nlp              import preprocessing
+from src.nlp.lemma_cache  import LemmaCache
+
+
+def test_lemmatization_is_memoized_and_deduplicated(monkeypatch, tmp_path):
+
+    monkeypatch.setattr(preprocessing, "lemma_cache", LemmaCache("teste", path=tmp_path / "lemmas.db"))
+
+    calls    = []
+    nlp      = preprocessing.get_nlp()
+    original = nlp.pipe
+
+    def counting_pipe(texts, **kwargs):
+        texts = list(texts)
+        calls.append(texts)
+        return original(texts, **kwargs)
+
+    monkeypatch.setattr(nlp, "pipe", counting_pipe)
+
+    questions = pd.Series(["Quantos carros Ford?", "quantos carros ford", "Qual a média de km?"], index=[5, 6, 7])
+    first     = preprocessing.text_processing_func(questions)
+    second    = preprocessing.text_processing_func(questions)
+
+    assert calls == [["quantos carros ford", "qual a média de km"]], "Frases repetidas devem passar uma vez pelo spaCy."
+    assert first.equals(second) and list(first.index) == [5, 6, 7]
+    assert first[5] == first[6]
+
+    # Um processo novo reaproveita os lemas persistidos.
+    monkeypatch.setattr(preprocessing, "lemma_cache", LemmaCache("teste", path=tmp_path / "lemmas.db"))
+    assert preprocessing.text_processing_func(questions).equals(first)
+    assert len(calls) == 1
@@ -0,0 +1,32 @@
+import pytest
+
+from src.llm.prompts import build_sql_prompt, count_message_tokens
+
+
+SCHEMA = "automobiles(id INTEGER PK, brand TEXT, color TEXT)\n\nValores:\ncolor: Preto|Branco|Prata"
+
+
+def test_static_prefix_is_shared_and_question_comes_last():
+
+    first   = build_sql_prompt("quantos carros da ford existem?", "COUNT", SCHEMA)
+    second  = build_sql_prompt("qual a média de potência dos carros pretos?", "CALC_AVG", SCHEMA)
+
+    # O system é idêntico entre perguntas: é o prefixo que o provedor consegue reaproveitar.
+    assert first.messages[0] == second.messages[0]
+    assert "brand TEXT" in first.messages[0]["content"] and "Preto|Branco" in first.messages[0]["content"]
+    assert first.messages[-1]["content"].endswith("Pergunta: quantos carros da ford existem?\nSQL:")
+    assert first.tokens == count_message_tokens(first.messages)
+    assert first.omitted == ()
+
+
+def test_budget_drops_optional_sections_then_fails():
+
+    full    = build_sql_prompt("quantos carros?", "COUNT", SCHEMA)
+    trimmed = build_sql_prompt("quantos carros?", "COUNT", SCHEMA, budget=full.tokens - 1)
+
+    assert trimmed.omitted == ("exemplos",)
+    assert trimmed.tokens < full.tokens
+    assert "Exemplos" not in trimmed.messages[0]["content"]
+
+    with pytest.raises(ValueError, match="orçamento"):
+        build_sql_prompt("quantos carros?", "COUNT", SCHEMA, budget=20)
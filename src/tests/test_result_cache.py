@@ -0,0 +1,76 @@
+import sqlite3
+
+from src.database.pool          import ReadOnlyPool
+from src.database.result_cache  import ResultCache, canonical_sql
+
+
+def _create(db_path, rows):
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS automobiles (id INTEGER PRIMARY KEY, brand TEXT, color TEXT, price REAL)")
+        conn.executemany("INSERT INTO automobiles (brand, color, price) VALUES (?, ?, ?)", rows)
+
+
+def test_canonical_sql_ignores_layout_but_not_literals():
+
+    assert canonical_sql("SELECT COUNT( * )\n FROM automobiles WHERE LOWER(brand) = 'audi';") == \
+           canonical_sql("select count(*) from automobiles where lower(brand)='audi'")
+    assert canonical_sql("SELECT * FROM automobiles WHERE brand = 'Audi A'") != \
+           canonical_sql("SELECT * FROM automobiles WHERE brand = 'audi  a'")
+    assert canonical_sql('SELECT * FROM automobiles WHERE brand = "Ford"') != \
+           canonical_sql('SELECT * FROM automobiles WHERE brand = "FORD"')
+    assert canonical_sql('SELECT "Brand" FROM automobiles') == canonical_sql('select  "Brand" from automobiles')
+
+
+def test_hits_roundtrip_and_invalidate_when_database_changes(tmp_path):
+
+    db_path = tmp_path / "cache.db"
+    _create(db_path, [("Ford", "Azul", 10.5), ("Ford", None, 20.0), ("Fiat", "Azul", 30.0)])
+
+    pool    = ReadOnlyPool(db_path)
+    cache   = ResultCache(db_path)
+
+    sql     = "SELECT brand, color, price FROM automobiles ORDER BY id"
+    key     = cache.key(sql)
+
+    assert cache.get(key) is None
+    assert cache.put(key, pool.fetch(sql))
+
+    cached  = cache.get(cache.key("select brand,color,price from automobiles order by id;"))
+
+    assert cached is not None
+    assert cached.frame.to_dict("list") == {"brand": ["Ford", "Ford", "Fiat"], "color": ["Azul", None, "Azul"], "price": [10.5, 20.0, 30.0]}
+    assert cached.row_count == 3 and cached.sql == sql
+
+    # popular_banco e qualquer escrita mudam a identidade do arquivo: a entrada antiga não volta.
+    _create(db_path, [("Audi", "Preto", 40.0)])
+
+    assert cache.get(cache.key(sql)) is None
+    assert cache.stats()["entradas"] == 0 and cache.stats()["invalidacoes"] == 1
+
+
+def test_eviction_keeps_memory_under_budget(tmp_path):
+
+    db_path = tmp_path / "cache.db"
+    _create(db_path, [(f"marca {i}", "Azul", float(i)) for i in range(200)])
+
+    pool    = ReadOnlyPool(db_path)
+    cache   = ResultCache(db_path, max_bytes=1000, max_entry_bytes=1000)
+
+    for limit in (10, 20, 30, 40, 50, 60):
+        sql = f"SELECT price FROM automobiles LIMIT {limit}"
+        key = cache.key(sql)
+
+        cache.get(key)
+        cache.put(key, pool.fetch(sql))
+
+    stats = cache.stats()
+
+    assert stats["bytes"] <= 1000 and stats["despejos"] > 0
+    assert cache.get(cache.key("SELECT price FROM automobiles LIMIT 60")) is not None
+    assert cache.get(cache.key("SELECT price FROM automobiles LIMIT 10")) is None
+
+    key = cache.key("SELECT brand FROM automobiles")
+    cache.get(key)
+
+    assert not cache.put(key, pool.fetch("SELECT brand FROM automobiles")), "Entrada maior que o orçamento não entra."
@@ -0,0 +1,29 @@
+
+import sqlite3
+from src.database.schema_catalog import SchemaCatalog
+
+
+def test_schema_catalog_hits_and_invalidates_on_write(tmp_path):
+
+    db_path = tmp_path / "catalog.db"
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE automobiles (id INTEGER PRIMARY KEY, brand TEXT)")
+
+    calls   = []
+    catalog = SchemaCatalog(lambda path: calls.append(path) or f"schema #{len(calls)}")
+
+    assert catalog.get(db_path) == "schema #1"
+    assert catalog.get(db_path) == "schema #1"
+    assert catalog.stats()["hits"] == 1
+    assert catalog.stats()["misses"] == 1
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("INSERT INTO automobiles (brand) VALUES ('Ford')")
+
+    assert catalog.get(db_path) == "schema #2", "A escrita no banco deveria invalidar o catálogo."
+
+    catalog.invalidate(db_path)
+
+    assert catalog.get(db_path) == "schema #3"
+    assert catalog.stats()["misses"] == 3
@@ -0,0 +1,44 @@
+import asyncio
+import pandas as pd
+
+from src.core.speculation   import speculate, speculation_candidates, matches_shape
+from src.database.results   import QueryResult
+
+
+def _result(sql, frame):
+    return QueryResult(sql, (), list(frame.columns), frame, len(frame), False)
+
+
+def test_only_low_margin_predictions_are_speculated():
+
+    assert speculation_candidates([("FIND_MAX", 0.9), ("FIND_MAX_MILEAGE", 0.05)], margin=0.15) == []
+    assert speculation_candidates([("COUNT", 0.95)], margin=0.15) == []
+    assert speculation_candidates([("COUNT", 0.48), ("GROUP_COUNT", 0.41)], margin=0.15) == [("COUNT", 0.48), ("GROUP_COUNT", 0.41)]
+
+
+def test_picks_candidate_with_rows_and_expected_shape():
+
+    sqls = {
+        "COUNT"       : "SELECT brand, COUNT(*) FROM automobiles GROUP BY brand",
+        "GROUP_COUNT" : "SELECT brand, COUNT(*) FROM automobiles GROUP BY brand",
+        "CALC_AVG"    : "SELECT 'ERRO: falha';",
+    }
+    group  = pd.DataFrame({"brand": ["Ford", "Fiat"], "total": [3, 2]})
+
+    async def generate(intent):
+        await asyncio.sleep(0.05)
+        return sqls[intent], "llm"
+
+    async def execute(sql):
+        return _result(sql, group)
+
+    speculation = asyncio.run(speculate([("COUNT", 0.45), ("GROUP_COUNT", 0.40), ("CALC_AVG", 0.10)], generate, execute))
+    report      = speculation.report()
+
+    # COUNT pede um escalar: o resultado agrupado casa com GROUP_COUNT, que vence apesar da probabilidade menor.
+    assert speculation.winner.intent == "GROUP_COUNT"
+    assert report["trocou_intencao"] is True
+    assert [c["erro"] is not None for c in report["candidatos"]] == [False, False, True]
+    # Os três candidatos rodaram em paralelo, não em sequência.
+    assert report["latencia_s"] < 0.14
+    assert matches_shape("COUNT", _result("", pd.DataFrame({"total": [5]})))
@@ -0,0 +1,43 @@
+
+import time
+from src.llm.sql_cache import SQLCache
+
+
+def test_sql_cache_normalizes_key_and_persists(tmp_path):
+
+    path  = tmp_path / "sql_cache.db"
+    cache = SQLCache(path)
+    key   = SQLCache.make_key("Quantos carros da Ford?", "COUNT", "abc")
+
+    assert key == SQLCache.make_key("quantos  carros da ford", "COUNT", "abc")
+    assert key != SQLCache.make_key("quantos carros da ford", "GROUP_COUNT", "abc")
+    assert key != SQLCache.make_key("quantos carros da ford", "COUNT", "def")
+    assert SQLCache.make_key("mostre os 5 carros", "LIST_ALL", "abc") != SQLCache.make_key("mostre os 10 carros", "LIST_ALL", "abc")
+
+    assert cache.get(key) is None
+    cache.put(key, "Quantos carros da Ford?", "COUNT", "abc", "SELECT 1;")
+    cache.close()
+
+    reopened = SQLCache(path)
+
+    assert reopened.get(key) == "SELECT 1;", "O cache deveria sobreviver à reabertura."
+    assert reopened.stats()["hits"] == 1
+
+
+def test_sql_cache_evicts_lru_and_expired(tmp_path):
+
+    cache = SQLCache(tmp_path / "sql_cache.db", max_entries=2, ttl_seconds=60)
+
+    cache.put("a", "a", "COUNT", "fp", "SELECT 'a';")
+    time.sleep(0.01)
+    cache.put("b", "b", "COUNT", "fp", "SELECT 'b';")
+    time.sleep(0.01)
+    cache.get("a")
+    cache.put("c", "c", "COUNT", "fp", "SELECT 'c';")
+
+    assert cache.get("b") is None, "A entrada menos usada recentemente deveria ser removida."
+    assert cache.get("a") == "SELECT 'a';"
+
+    cache.ttl_seconds = 0
+
+    assert cache.get("c") is None, "Entradas expiradas não devem ser retornadas."
@@ -0,0 +1,60 @@
+
+import pytest
+from src.nlp.sql_templates import build_template_sql
+
+
+@pytest.mark.parametrize("question, intent, expected_sql, expected_params", [
+    ("quantos carros da Ford existem?", "COUNT", "SELECT COUNT(*) AS total FROM automobiles WHERE LOWER(brand) = ?;", ("ford",)),
+    ("liste os carros pretos de transmissão automática", "LIST_ALL", "SELECT * FROM automobiles WHERE LOWER(color) = ? AND LOWER(transmission) = ?;", ("preto", "automática")),
+    ("qual a média de potência dos carros da Mercedes?", "CALC_AVG", "SELECT AVG(engine_power) AS media_engine_power FROM automobiles WHERE LOWER(brand) = ?;", ("mercedes-benz",)),
+    ("qual o carro com a maior quilometragem?", "FIND_MAX_MILEAGE", "SELECT * FROM automobiles ORDER BY mileage DESC LIMIT 1;", ()),
+    ("agrupe por cor e conte a quantidade de carros", "GROUP_COUNT", "SELECT color, COUNT(*) AS total FROM automobiles GROUP BY color ORDER BY total DESC;", ()),
+])
+def test_build_template_sql(question, intent, expected_sql, expected_params):
+
+    template = build_template_sql(question, intent)
+
+    assert template is not None
+    assert template.sql    == expected_sql
+    assert template.params == expected_params
+
+
+@pytest.mark.parametrize("question, intent", [
+    ("quantos carros da Peugeot existem?", "COUNT"),
+    ("quantos carros da Ford têm mais de 100000 km?", "COUNT"),
+    ("qual a média de potência dos carros de luxo?", "CALC_AVG"),
+    ("quais carros não são da Fiat?", "LIST_ALL"),
+    ("qual a contagem de carros por cor e marca?", "GROUP_COUNT"),
+    ("para cada marca, quantos modelos diferentes existem?", "GROUP_COUNT"),
+    # Agrupamento pedido sob outra intenção e sentido que contradiz a intenção.
+    ("quantos carros por cor", "COUNT"),
+    ("liste os carros de cada marca", "LIST_ALL"),
+    ("qual o carro menos potente?", "FIND_MAX"),
+    ("qual o carro com menor quilometragem", "FIND_MAX_MILEAGE"),
+    ("qual o carro com a maior potência?", "FIND_MIN"),
+    # Sentido ou coluna que o template descartaria, e valor que só casaria trocando o gênero.
+    ("quantos carros tem o maior motor", "COUNT"),
+    ("qual a marca com mais carros?", "FIND_MAX"),
+    ("qual a menor média de potência", "CALC_AVG"),
+    ("qual a média de potência da marca Ford", "CALC_AVG"),
+    ("quantos carros pratos existem", "COUNT"),
+    ("liste os carros de cor preta", "LIST_ALL"),
+])
+def test_build_template_sql_falls_back_to_llm(question, intent):
+
+    assert build_template_sql(question, intent) is None
+
+
+def test_template_filters_use_lowered_indexes(tmp_path):
+
+    from src.database.populate_db import create_database
+    from src.database.pool        import get_pool
+
+    db_path  = tmp_path / "templates.db"
+    create_database(n_rows=200, seed=1, db_path=db_path)
+
+    template = build_template_sql("quantos carros da Ford existem?", "COUNT")
+    plan     = get_pool(db_path).explain(template.sql, template.params)
+
+    assert "idx_automobiles_lower_brand" in plan and "SCAN automobiles" not in plan
+    assert template.rendered == "SELECT COUNT(*) AS total FROM automobiles WHERE LOWER(brand) = 'ford';"
@@ -0,0 +1,39 @@
+import pytest
+import asyncio
+
+from src.llm                import generator
+from src.core.tracing       import span
+from benchmarks.stub_openai import StubOpenAIServer, CANNED_SQL, CANNED_ANSWER
+
+
+@pytest.fixture
+def stub(monkeypatch):
+
+    with StubOpenAIServer(latency_s=0.0) as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        monkeypatch.setenv("OPENAI_API_KEY", "stub")
+        monkeypatch.setattr(generator, "_async_client", None)
+        monkeypatch.setattr(generator, "get_db_schema_and_values", lambda db_path: "Tabela 'automobiles'")
+        yield server
+
+    generator._async_client = None
+
+
+def test_async_generators_talk_to_openai_compatible_endpoint(stub):
+
+    async def run():
+        sql     = await generator.generate_sql_query_async("quantos carros suv existem?", "COUNT")
+        answer  = await generator.generate_natural_language_response_async("quantos carros suv existem?", "total: 3")
+
+        with span("resposta") as streamed_span:
+            tokens = [token async for token in generator.stream_natural_language_response_async("pergunta", "dados")]
+
+        return sql, answer, "".join(tokens), streamed_span.attributes
+
+    sql, answer, streamed, attributes = asyncio.run(run())
+
+    assert sql == CANNED_SQL["COUNT"]
+    assert answer == CANNED_ANSWER
+    assert streamed == CANNED_ANSWER
+    assert attributes["tokens_prompt"] > 0 and attributes["tokens_resposta"] > 0, "O uso do stream vem no último chunk."
+    assert stub.requests == 3
@@ -2,17 +2,69 @@
 import pytest
 import pytest_asyncio 
 import os
+import time
+import asyncio
 from unittest.mock      import patch
 from src.core.server    import mcp, AppContext
+from src.llm.sql_cache  import SQLCache
+from src.database.query_log import QueryLog
 
 pytestmark = pytest.mark.asyncio
 
 @pytest_asyncio.fixture(scope="module")
-async def client():
-  
-    await mcp.run_lifespan_startup()
-    yield mcp
-    await mcp.run_lifespan_shutdown()
+async def client(tmp_path_factory):
+
+    import src.core.server          as server
+    import src.mlp.train            as train
+    import src.mlp.online           as online
+    import src.mlp.compiled         as compiled
+    import src.llm.generator        as generator
+    import src.nlp.preprocessing    as preprocessing
+    from src.nlp.lemma_cache        import LemmaCache
+
+    tmp_path    = tmp_path_factory.mktemp("tools")
+    models_dir  = tmp_path / "models"
+    db_path     = tmp_path / "automobiles.db"
+    lemmas      = LemmaCache(preprocessing.lemma_cache.model_key, path=str(tmp_path / "lemma_cache.db"))
+
+    models_dir.mkdir()
+
+    class TmpSQLCache(SQLCache):
+        def __init__(self):
+            super().__init__(tmp_path / "sql_cache.db")
+
+    class TmpQueryLog(QueryLog):
+        def __init__(self):
+            super().__init__(tmp_path / "query_log.db")
+
+    # Nada sai do tmp_path: banco, modelos, relatório e caches. A chave é falsa porque o LLM é sempre mockado.
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("OPENAI_API_KEY", "teste")
+        mp.setattr(server,        "MODELS_DIR",            models_dir)
+        mp.setattr(server,        "SQLCache",              TmpSQLCache)
+        mp.setattr(server,        "QueryLog",              TmpQueryLog)
+        mp.setattr(server,        "lemma_cache",           lemmas)
+        mp.setattr(preprocessing, "lemma_cache",           lemmas)
+        mp.setattr(generator,     "DB_PATH",               db_path)
+        mp.setattr(train,         "PIPELINE_PATH",         models_dir / "intent_classification_pipeline.joblib")
+        mp.setattr(train,         "LABEL_ENCODER_PATH",    models_dir / "intent_label_encoder.joblib")
+        mp.setattr(train,         "CONFUSION_MATRIX_PATH", tmp_path / "confusion_matrix.png")
+        mp.setattr(train,         "COMPILED_MODEL_DIR",    models_dir / "intent_compiled")
+        mp.setattr(compiled,      "COMPILED_MODEL_DIR",    models_dir / "intent_compiled")
+        mp.setattr(online,        "ONLINE_MODEL_PATH",     models_dir / "intent_online_model.joblib")
+
+        await mcp.run_lifespan_startup()
+
+        ctx                         = mcp.get_context()
+        ctx.db_path                 = db_path
+        # O caminho por templates é exercitado no próprio teste; os demais cobrem o LLM.
+        ctx.template_min_confidence = 1.1
+        ctx.speculative_margin      = 0.0
+        ctx.answer_policy           = "llm"
+
+        yield mcp
+
+        await mcp.run_lifespan_shutdown()
 
 
 async def test_populate_database_tool(client):
@@ -39,8 +91,8 @@ async def test_train_model_tool(client):
     assert ctx.label_encoder is not None, "O LabelEncoder não foi carregado no contexto."
 
 
-@patch("src.core.server.generate_sql_query")
-@patch("src.core.server.generate_natural_language_response")
+@patch("src.core.server.generate_sql_query_async")
+@patch("src.core.server.generate_natural_language_response_async")
 async def test_ask_question_tool(mock_generate_nlp, mock_generate_sql, client):
 
     ctx: AppContext                = client.get_context()
@@ -61,4 +113,110 @@ async def test_ask_question_tool(mock_generate_nlp, mock_generate_sql, client):
     assert result["pergunta_original"]  == test_question
     assert result["sql_gerado_llm"]     == mocked_sql
     assert result["resposta_final"]     == mocked_nlp_response
+    assert result["origem_sql"]         == "llm"
     assert result["intenção_prevista_mlp"] is not None, "A intenção do MLP não foi prevista."
+
+
+@patch("src.core.server.generate_sql_query_async")
+@patch("src.core.server.generate_natural_language_response_async")
+async def test_ask_question_tool_reuses_cached_sql(mock_generate_nlp, mock_generate_sql, client):
+
+    mocked_sql                     = "SELECT COUNT(*) FROM automobiles WHERE LOWER(brand) = 'ford';"
+    mock_generate_sql.return_value = mocked_sql
+    mock_generate_nlp.return_value = "Existem carros da Ford."
+
+    first                          = await client._tools["perguntar"](pergunta="Quantos carros da Ford?")
+    second                         = await client._tools["perguntar"](pergunta="quantos carros da ford")
+
+    mock_generate_sql.assert_called_once()
+
+    assert first["origem_sql"]     == "llm"
+    assert second["origem_sql"]    == "cache"
+    assert second["sql_gerado_llm"] == mocked_sql
+
+
+@patch("src.core.server.generate_sql_query_async")
+@patch("src.core.server.generate_natural_language_response_async")
+async def test_ask_question_tool_runs_concurrently(mock_generate_nlp, mock_generate_sql, client):
+
+    async def slow_sql(question, intent, resolved_values=""):
+        await asyncio.sleep(0.5)
+        return "SELECT COUNT(*) FROM automobiles;"
+
+    async def slow_answer(question, db_result):
+        await asyncio.sleep(0.5)
+        return "Resposta."
+
+    mock_generate_sql.side_effect  = slow_sql
+    mock_generate_nlp.side_effect  = slow_answer
+    questions                      = [f"quantos carros existem na loja {i}?" for i in range(5)]
+
+    started                        = time.perf_counter()
+    results                        = await asyncio.gather(*(client._tools["perguntar"](pergunta=q) for q in questions))
+    elapsed                        = time.perf_counter() - started
+
+    assert all(r["resposta_final"] == "Resposta." for r in results)
+    assert elapsed < 2.5, f"As perguntas foram serializadas ({elapsed:.2f}s)."
+
+
+@patch("src.core.server.generate_sql_query_async")
+@patch("src.core.server.generate_natural_language_response_async")
+async def test_ask_questions_batch_tool(mock_generate_nlp, mock_generate_sql, client):
+
+    mock_generate_sql.return_value = "SELECT COUNT(*) FROM automobiles;"
+    mock_generate_nlp.return_value = "Resposta em lote."
+    questions                      = ["quantos carros da Audi existem?", "liste os carros da marca Fiat", "qual a média de portas?"]
+
+    items                          = [item async for item in client._tools["perguntar_lote"](perguntas=";".join(questions), concorrencia=2)]
+
+    assert sorted(item["indice"] for item in items) == [0, 1, 2]
+    assert {item["pergunta"] for item in items} == set(questions)
+    assert all(item["resultado"]["resposta_final"] == "Resposta em lote." for item in items)
+    assert mock_generate_sql.call_count == len(questions)
+
+
+@patch("src.core.server.generate_sql_query_async")
+@patch("src.core.server.stream_natural_language_response_async")
+async def test_ask_question_tool_streams_answer(mock_stream_nlp, mock_generate_sql, client):
+
+    async def fake_stream(question, db_result):
+        for token in ["Existem ", "10 ", "carros."]:
+            await asyncio.sleep(0.05)
+            yield token
+
+    mock_generate_sql.return_value = "SELECT COUNT(*) FROM automobiles;"
+    mock_stream_nlp.side_effect    = fake_stream
+    received                       = []
+
+    result                         = await client._tools["perguntar"](
+        pergunta ="quantos carros existem no estoque agora?",
+        stream   =True,
+        on_token =received.append
+    )
+
+    assert received                          == ["Existem ", "10 ", "carros."]
+    assert result["resposta_final"]          == "Existem 10 carros."
+    assert result["tempo_primeiro_token_s"]  is not None
+    assert result["tempo_total_resposta_s"]  >= result["tempo_primeiro_token_s"]
+
+
+@patch("src.core.server._classify_intent", return_value=("COUNT", 0.95, [("COUNT", 0.95)]))
+@patch("src.core.server.generate_sql_query_async")
+@patch("src.core.server.generate_natural_language_response_async")
+async def test_ask_question_tool_uses_sql_template(mock_generate_nlp, mock_generate_sql, mock_classify, client):
+
+    ctx: AppContext                = client.get_context()
+    ctx.template_min_confidence    = 0.6
+
+    try:
+        result                     = await client._tools["perguntar"](pergunta="quantos carros da Ford existem?", modo_resposta="auto")
+    finally:
+        ctx.template_min_confidence = 1.1
+
+    mock_generate_sql.assert_not_called()
+    mock_generate_nlp.assert_not_called()
+
+    assert result["origem_sql"]      == "template"
+    assert result["origem_resposta"] == "local"
+    assert "carro" in result["resposta_final"]
+    assert result["sql_gerado_llm"] == "SELECT COUNT(*) AS total FROM automobiles WHERE LOWER(brand) = 'ford';"
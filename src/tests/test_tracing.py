@@ -0,0 +1,72 @@
+import asyncio
+
+from types              import SimpleNamespace
+from src.core           import tracing
+from src.core.tracing   import Exporter, MetricsRegistry, span, trace, annotate, record_tokens
+
+
+class CollectingExporter(Exporter):
+
+    def __init__(self):
+        self.spans  = []
+        self.traces = []
+
+    def on_span_end(self, trace, span):
+        self.spans.append(span.name)
+
+    def on_trace_end(self, trace):
+        self.traces.append(trace)
+
+
+def test_spans_attach_to_trace_across_threads(monkeypatch):
+
+    monkeypatch.setattr(tracing, "registry", MetricsRegistry())
+    exporter = tracing.add_exporter(CollectingExporter())
+
+    def blocking_stage():
+        # Roda em outra thread: o contexto copiado pelo to_thread leva o span junto.
+        annotate(linhas=3)
+        record_tokens(SimpleNamespace(prompt_tokens=10, completion_tokens=4))
+
+    async def run():
+        with trace("perguntar") as current:
+            with span("classificacao"):
+                pass
+            with span("execucao") as execution:
+                await asyncio.to_thread(blocking_stage)
+
+        return current, execution
+
+    try:
+        current, execution = asyncio.run(run())
+    finally:
+        tracing.remove_exporter(exporter)
+
+    assert exporter.spans == ["classificacao", "execucao"]
+    assert exporter.traces == [current]
+    assert set(current.durations()) == {"classificacao", "execucao"}
+    assert execution.attributes == {"linhas": 3, "tokens_prompt": 10, "tokens_resposta": 4}
+
+    snapshot = tracing.registry.snapshot()
+
+    assert snapshot["etapas"]["execucao"]["chamadas"] == 1
+    assert snapshot["contadores"]["llm_tokens_total{tipo=prompt}"] == 10
+    assert snapshot["contadores"]["traces_total{trace=perguntar}"] == 1
+
+
+def test_prometheus_text_format():
+
+    registry = MetricsRegistry()
+    registry.observe("execucao", 0.02)
+    registry.observe("execucao", 3.0)
+    registry.inc("sql_origem_total", origem="llm")
+    registry.set_gauge("cache_consultas", 7, cache="sql", resultado="hits")
+
+    text = registry.to_prometheus()
+
+    assert 'text_to_sql_stage_duration_seconds_bucket{etapa="execucao",le="0.025"} 1' in text
+    assert 'text_to_sql_stage_duration_seconds_bucket{etapa="execucao",le="+Inf"} 2' in text
+    assert 'text_to_sql_stage_duration_seconds_count{etapa="execucao"} 2' in text
+    assert "# TYPE text_to_sql_sql_origem_total counter" in text
+    assert 'text_to_sql_sql_origem_total{origem="llm"} 1.0' in text
+    assert 'text_to_sql_cache_consultas{cache="sql",resultado="hits"} 7' in text
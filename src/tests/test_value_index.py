@@ -0,0 +1,56 @@
+import sqlite3
+
+from src.nlp.value_index import ValueIndex, format_matches
+from src.llm.prompts     import build_sql_prompt
+
+
+def _create(db_path, rows):
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS automobiles (id INTEGER PRIMARY KEY, brand TEXT, model TEXT, transmission TEXT, license_plate TEXT, mileage INTEGER)")
+        conn.executemany("INSERT INTO automobiles (brand, model, transmission, license_plate, mileage) VALUES (?, ?, ?, ?, ?)", rows)
+
+
+def test_resolves_accents_typos_and_partial_names(tmp_path):
+
+    db_path = tmp_path / "values.db"
+    _create(db_path, [
+        ("Mercedes-Benz",   "Classe C", "Automática",   "ABC1D23", 1000),
+        ("Toyota",          "Corolla",  "Manual",       "XYZ9K87", 2000),
+        ("Toyota",          "Corolla",  "Automática",   "QWE4R56", 3000),
+    ])
+
+    index   = ValueIndex(db_path)
+    matches = index.resolve("quantos toyta corola automaticas e quantos da mercedes?")
+
+    assert [(m.column, m.value) for m in matches] == [
+        ("brand",        "Toyota"),
+        ("model",        "Corolla"),
+        ("transmission", "Automática"),
+        ("brand",        "Mercedes-Benz"),
+    ]
+    assert matches[0].similaridade < 1.0 and matches[2].similaridade == 1.0
+    # Placas (um valor por linha) e colunas numéricas ficam fora do índice.
+    assert index.stats()["colunas"] == 3
+    assert index.resolve("carros com placa abc1d23") == []
+
+    prompt = build_sql_prompt("quantos carros da mercedes?", "COUNT", "automobiles(id INTEGER PK)", resolved_values=format_matches(matches[3:]))
+
+    assert "Valores reconhecidos: LOWER(brand) = 'mercedes-benz' (\"mercedes\")" in prompt.messages[-1]["content"]
+
+
+def test_refresh_only_reindexes_changed_columns(tmp_path):
+
+    db_path = tmp_path / "values.db"
+    _create(db_path, [("Ford", "Ka", "Manual", f"AAA0A0{i}", 10) for i in range(2)] + [("Fiat", "Uno", "Manual", f"BBB0B0{i}", 20) for i in range(2)])
+
+    index = ValueIndex(db_path)
+
+    assert index.resolve("carros da volkswagen") == []
+    assert index.refresh() is False, "Sem escrita no banco não há reconstrução."
+
+    _create(db_path, [("Volkswagen", "Polo", "Manual", f"CCC0C0{i}", 30) for i in range(2)])
+
+    assert [m.value for m in index.resolve("carros da volkswagen")] == ["Volkswagen"]
+    assert index.stats()["reconstrucoes"] == 2
+    assert index.stats()["colunas_alteradas"] == 3 + 2, "transmission não mudou e não é reindexada."